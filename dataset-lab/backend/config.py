@@ -16,12 +16,53 @@ if env_path.exists():
 class Settings:
     BASE_DIR = Path(__file__).parent.parent.parent
     PROJECTS_DIR = BASE_DIR / "projects"
+    CACHE_DIR = BASE_DIR / ".cache"
     
     # Engine Settings
     DEFAULT_CHUNK_SIZE = int(os.getenv("DEFAULT_CHUNK_SIZE", 800))
     DEFAULT_CHUNK_OVERLAP = int(os.getenv("DEFAULT_CHUNK_OVERLAP", 100))
     DEFAULT_SIMILARITY_THRESHOLD = float(os.getenv("DEFAULT_SIMILARITY_THRESHOLD", 0.92))
 
+    # Embedding Settings
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+    # Load the embedding model in the background at API startup instead of on first pipeline run
+    EMBEDDING_WARMUP = os.getenv("EMBEDDING_WARMUP", "true").lower() in ("1", "true", "yes")
+    # Where chunk embeddings are cached between runs: "project", "global" (shared) or "off"
+    EMBEDDING_CACHE = os.getenv("EMBEDDING_CACHE", "project").lower()
+    # "torch" (sentence-transformers default) or "onnx" (ONNX Runtime, CPU friendly)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    # ONNX weights inside the model repo; the int8-quantized variant is the fastest on CPU
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+    # Dedicated embedding processes shared by all projects (0 = run inference in the API process)
+    EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", 1))
+    # torch intra-op threads per embedding process (0 = torch default)
+    EMBEDDING_TORCH_THREADS = int(os.getenv("EMBEDDING_TORCH_THREADS", 0))
+    # Batches queued to the workers before callers block
+    EMBEDDING_MAX_PENDING_BATCHES = int(os.getenv("EMBEDDING_MAX_PENDING_BATCHES", 4))
+
+    # Scraping HTTP Settings (one connection pool shared by crawl, image and refinement jobs)
+    SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", 100))
+    SCRAPER_MAX_CONNECTIONS_PER_HOST = int(os.getenv("SCRAPER_MAX_CONNECTIONS_PER_HOST", 8))
+    # Seconds a resolved host address is reused, and an idle connection kept open
+    SCRAPER_DNS_CACHE_TTL = int(os.getenv("SCRAPER_DNS_CACHE_TTL", 300))
+    SCRAPER_KEEPALIVE_TIMEOUT = float(os.getenv("SCRAPER_KEEPALIVE_TIMEOUT", 30))
+    # Processes that parse and clean crawled pages off the event loop (0 = a thread in the API process)
+    SCRAPER_PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", 2))
+    # Pages handed to those processes at once before crawl workers wait (0 = twice the processes)
+    SCRAPER_PARSE_MAX_PENDING = int(os.getenv("SCRAPER_PARSE_MAX_PENDING", 0))
+    # Try <article>/<main> extraction before readability (plain-text responses always skip it)
+    SCRAPER_FAST_EXTRACTION = os.getenv("SCRAPER_FAST_EXTRACTION", "true").lower() in ("1", "true", "yes")
+    # Where fetched pages and images are cached for revalidation: "project", "global" (shared) or "off"
+    SCRAPER_HTTP_CACHE = os.getenv("SCRAPER_HTTP_CACHE", "project").lower()
+    # Crawls stream text into raw.txt (and the crawl graph into crawl_graph.jsonl) in buffered batches,
+    # flushed once this many characters are buffered or the oldest buffered entry is this many seconds old
+    SCRAPER_STREAM_FLUSH_BYTES = int(os.getenv("SCRAPER_STREAM_FLUSH_BYTES", 1024 * 1024))
+    SCRAPER_STREAM_FLUSH_SECONDS = float(os.getenv("SCRAPER_STREAM_FLUSH_SECONDS", 5))
+
+    # QA Dedup Settings
+    # Nearest-neighbour index for question dedup: "numpy" (LSH + blocked matrix) or "chroma" (HNSW)
+    QA_DEDUP_INDEX = os.getenv("QA_DEDUP_INDEX", "numpy").lower()
+
 settings = Settings()
 
 # Ensure projects directory exists
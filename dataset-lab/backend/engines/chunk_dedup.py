@@ -0,0 +1,105 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.engines.embedding_cache import EmbeddingCache
+from backend.engines.embedding_refiner import embedding_refiner
+from backend.engines.processing.deduplicator import get_text_hash
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+class ChunkDeduplicator:
+    """
+    Removes repeated passages before generation, where every chunk costs one
+    LLM call: exact duplicates by normalized text hash, then near-duplicates
+    by embedding cosine similarity against the chunks already kept.
+    """
+
+    # Rows of the similarity matrix computed per block (bounds memory to block x n)
+    BLOCK_SIZE = 512
+
+    def find_duplicates(self, chunks: List[Dict[str, Any]], threshold: float = 0.95,
+                        cache: Optional[EmbeddingCache] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        For each chunk, None if it is kept, otherwise
+        {"duplicate_of": chunk_id, "kind": "exact" | "near", "similarity": float}.
+        The first occurrence of a passage is always the one kept.
+        """
+        matches: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+
+        first_by_hash: Dict[str, int] = {}
+        for i, chunk in enumerate(chunks):
+            key = get_text_hash(WHITESPACE_RE.sub(' ', chunk['text']))
+            if key in first_by_hash:
+                matches[i] = {"duplicate_of": chunks[first_by_hash[key]]['chunk_id'], "kind": "exact", "similarity": 1.0}
+            else:
+                first_by_hash[key] = i
+
+        if threshold >= 1.0:
+            return matches
+        candidates = [i for i, m in enumerate(matches) if m is None]
+        if len(candidates) < 2:
+            return matches
+
+        vectors = embedding_refiner.embed([chunks[i]['text'] for i in candidates], cache=cache)
+        kept = np.zeros(len(candidates), dtype=bool)
+        for start in range(0, len(candidates), self.BLOCK_SIZE):
+            stop = min(start + self.BLOCK_SIZE, len(candidates))
+            # Similarity of this block against every earlier (and in-block) chunk
+            sims = vectors[start:stop] @ vectors[:stop].T
+            for row, i in enumerate(range(start, stop)):
+                earlier = sims[row, :i]
+                hits = np.flatnonzero((earlier >= threshold) & kept[:i])
+                if len(hits):
+                    best = hits[np.argmax(earlier[hits])]
+                    matches[candidates[i]] = {
+                        "duplicate_of": chunks[candidates[best]]['chunk_id'],
+                        "kind": "near",
+                        "similarity": round(float(earlier[best]), 4),
+                    }
+                else:
+                    kept[i] = True
+        return matches
+
+    def deduplicate(self, chunks: List[Dict[str, Any]], threshold: float = 0.95, mode: str = "drop",
+                    cache: Optional[EmbeddingCache] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        mode="drop" removes duplicates; mode="flag" keeps them with a
+        "duplicate_of" field, which generation skips. Chunk ids are preserved
+        so QA pairs still point at their source chunk.
+        Returns (chunks, report).
+        """
+        matches = self.find_duplicates(chunks, threshold, cache)
+        result, removed = [], []
+        for chunk, match in zip(chunks, matches):
+            if match is None:
+                result.append(chunk)
+                continue
+            removed.append({
+                "chunk_id": chunk['chunk_id'],
+                **match,
+                "token_count": chunk.get('token_count', 0),
+                "preview": chunk['text'][:200],
+            })
+            if mode == "flag":
+                result.append({**chunk, "duplicate_of": match["duplicate_of"]})
+
+        report = {
+            "mode": mode,
+            "threshold": threshold,
+            "chunks_in": len(chunks),
+            "chunks_to_generate": len(chunks) - len(removed),
+            "exact_duplicates": sum(1 for r in removed if r["kind"] == "exact"),
+            "near_duplicates": sum(1 for r in removed if r["kind"] == "near"),
+            # Generation makes one LLM call per chunk
+            "llm_calls_saved": len(removed),
+            "tokens_saved": sum(r["token_count"] for r in removed),
+            "removed": removed,
+        }
+        return result, report
+
+chunk_deduplicator = ChunkDeduplicator()
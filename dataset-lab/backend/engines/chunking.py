@@ -1,9 +1,15 @@
 import logging
+import re
+import numpy as np
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+from backend.engines.embedding_refiner import embedding_refiner
 
 logger = logging.getLogger(__name__)
 
+# Sentence boundaries: whitespace after terminal punctuation, or line breaks
+SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[.!?])\s+|\n+')
+
 class ChunkingEngine:
     def __init__(self):
         self.encoder = None
@@ -42,4 +48,66 @@ class ChunkingEngine:
             
         return chunks
 
+    def _sentence_spans(self, text: str, max_tokens: int) -> List[Tuple[int, int, int]]:
+        """(start, end, token_count) of each sentence; over-long sentences are split by the recursive splitter."""
+        spans = []
+        start = 0
+        for match in list(SENTENCE_BOUNDARY_RE.finditer(text)) + [None]:
+            end = match.start() if match else len(text)
+            if text[start:end].strip():
+                tokens = self.count_tokens(text[start:end])
+                if tokens <= max_tokens:
+                    spans.append((start, end, tokens))
+                else:
+                    offset = start
+                    for piece in self.chunk(text[start:end], chunk_size=max_tokens, chunk_overlap=0):
+                        piece_start = text.find(piece['text'], offset, end)
+                        if piece_start == -1:
+                            piece_start = offset
+                        offset = piece_start + len(piece['text'])
+                        spans.append((piece_start, offset, piece['token_count']))
+            if match:
+                start = match.end()
+        return spans
+
+    def semantic_chunk(self, text: str, min_tokens: int = 200, max_tokens: int = 800,
+                       breakpoint_percentile: float = 10.0) -> List[Dict[str, Any]]:
+        """
+        One-pass semantic chunking: embed sentences in batches, cut where the
+        similarity between neighbouring sentences falls into the lowest
+        breakpoint_percentile (a topic shift), and keep every chunk within
+        [min_tokens, max_tokens] where the text allows. Replaces chunk + refine.
+        Sentence vectors are not written to the project's chunk embedding
+        cache: they are only needed once and would bloat it by a row per sentence.
+        """
+        spans = self._sentence_spans(text, max_tokens)
+        if not spans:
+            return []
+
+        vectors = embedding_refiner.embed([text[a:b] for a, b, _ in spans])
+        similarity = np.einsum('ij,ij->i', vectors[:-1], vectors[1:]) if len(spans) > 1 else np.zeros(0)
+        cutoff = float(np.percentile(similarity, breakpoint_percentile)) if len(similarity) else 0.0
+
+        groups = []
+        group_start, group_tokens = 0, spans[0][2]
+        for i in range(1, len(spans)):
+            tokens = spans[i][2]
+            topic_shift = similarity[i - 1] <= cutoff and group_tokens >= min_tokens
+            if topic_shift or group_tokens + tokens > max_tokens:
+                groups.append((group_start, i))
+                group_start, group_tokens = i, 0
+            group_tokens += tokens
+        groups.append((group_start, len(spans)))
+
+        chunks = []
+        for i, (first, last) in enumerate(groups):
+            chunk_text = text[spans[first][0]:spans[last - 1][1]].strip()
+            chunks.append({
+                "chunk_id": i,
+                "text": chunk_text,
+                "token_count": self.count_tokens(chunk_text)
+            })
+        logger.info(f"[Chunking] Semantic chunking: {len(spans)} sentences -> {len(chunks)} chunks (cutoff={cutoff:.3f})")
+        return chunks
+
 chunking_engine = ChunkingEngine()
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def text_key(text: str) -> str:
+    """Content hash used as the cache key for a text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """
+    Append-only on-disk store of normalized embeddings for one model.
+
+    Layout under <root>/<model-slug>/:
+      vectors.f32  raw float32 matrix (rows x dim), read through np.memmap
+      index.json   {"model", "dim", "keys"}; keys[i] is the content hash of row i
+
+    Rows are appended to vectors.f32 first and the index is replaced
+    atomically afterwards, so a crash can only leave unreferenced trailing
+    rows, which are overwritten by the next append.
+    """
+
+    def __init__(self, root: Path, model_name: str):
+        self.model_name = model_name
+        self.dir = Path(root) / re.sub(r'[^A-Za-z0-9_.@-]+', '_', model_name)
+        self.vectors_path = self.dir / "vectors.f32"
+        self.index_path = self.dir / "index.json"
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._vectors: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.index_path.exists():
+            return
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"[EmbeddingCache] Ignoring unreadable index {self.index_path}: {e}")
+            return
+        if index.get("model") != self.model_name:
+            return
+        self.dim = index.get("dim")
+        self._keys = index.get("keys", [])
+        self._rows = {k: i for i, k in enumerate(self._keys)}
+
+    def _matrix(self) -> np.ndarray:
+        if not self._keys:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        if self._vectors is None or self._vectors.shape[0] != len(self._keys):
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                      shape=(len(self._keys), self.dim))
+        return self._vectors
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def get(self, keys: List[str]) -> Tuple[Optional[np.ndarray], List[int]]:
+        """
+        Returns (vectors, missing) where vectors has one row per key (zeros for
+        misses) and missing lists the positions of keys not in the cache.
+        """
+        with self._lock:
+            missing = [i for i, k in enumerate(keys) if k not in self._rows]
+            if self.dim is None:
+                return None, missing
+            out = np.zeros((len(keys), self.dim), dtype=np.float32)
+            hits = [i for i, k in enumerate(keys) if k in self._rows]
+            if hits:
+                rows = [self._rows[keys[i]] for i in hits]
+                out[hits] = self._matrix()[rows]
+            return out, missing
+
+    def add(self, keys: List[str], vectors: np.ndarray):
+        """Append vectors for keys that are not stored yet."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dim {vectors.shape[1]} does not match cache dim {self.dim}")
+
+            new_rows, new_keys, pending = [], [], set()
+            for key, vec in zip(keys, vectors):
+                if key in self._rows or key in pending:
+                    continue
+                pending.add(key)
+                new_keys.append(key)
+                new_rows.append(vec)
+            if not new_keys:
+                return
+
+            self.dir.mkdir(parents=True, exist_ok=True)
+            # Drop the read-only map before resizing the file (required on Windows)
+            self._vectors = None
+            offset = len(self._keys) * self.dim * 4
+            with open(self.vectors_path, 'r+b' if self.vectors_path.exists() else 'wb') as f:
+                f.truncate(offset)
+                f.seek(offset)
+                f.write(np.ascontiguousarray(new_rows, dtype=np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            for key in new_keys:
+                self._rows[key] = len(self._keys)
+                self._keys.append(key)
+            self._vectors = None
+
+            tmp_path = self.index_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"model": self.model_name, "dim": self.dim, "keys": self._keys}, f)
+            tmp_path.replace(self.index_path)
+
+_caches: Dict[Path, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+def get_embedding_cache(root: Path, model_name: str) -> EmbeddingCache:
+    """Shared cache instance per directory, so concurrent pipelines append through one lock."""
+    key = Path(root).resolve() / model_name
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(root, model_name)
+        return _caches[key]
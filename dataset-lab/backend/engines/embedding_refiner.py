@@ -1,47 +1,241 @@
+import json
+import logging
+import threading
+import time
 import tiktoken
-from sentence_transformers import SentenceTransformer, util
-from typing import List, Dict, Any
+import numpy as np
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from backend.config import settings
+from backend.engines.embedding_cache import EmbeddingCache, get_embedding_cache, text_key
+from backend.engines.embedding_worker import EmbeddingWorkerPool, describe_model, encode_texts, load_embedding_model
+
+logger = logging.getLogger(__name__)
 
 class EmbeddingRefiner:
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
-        # Initialize model
-        # This will download the model if not present, which might take time on first run
-        self.model = SentenceTransformer(model_name)
-        self.encoder = tiktoken.get_encoding("cl100k_base")
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', backend: Optional[str] = None,
+                 workers: Optional[int] = None):
+        # The model is loaded on first use (or by warmup()) so importing this
+        # module does not block API startup on torch and a possible download.
+        self.model_name = model_name
+        self.requested_backend = backend or settings.EMBEDDING_BACKEND
+        # 0 = encode inside the API process, N = encode in N dedicated worker processes
+        self.workers = settings.EMBEDDING_WORKERS if workers is None else workers
+        # Backend actually in use, known once the model is loaded
+        self.backend: Optional[str] = None
+        self.dimension: Optional[int] = None
+        self.load_error: Optional[str] = None
+        self._model = None
+        self._pool: Optional[EmbeddingWorkerPool] = None
+        self._encoder = None
+        self._load_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.backend is not None
+
+    def _load_model(self):
+        return load_embedding_model(
+            self.model_name, self.requested_backend, settings.EMBEDDING_ONNX_FILE, settings.EMBEDDING_TORCH_THREADS
+        )
+
+    def _ensure_loaded(self):
+        if self.backend is not None:
+            return
+        with self._load_lock:
+            if self.backend is not None:
+                return
+            # This will download the model if not present, which might take time on first run
+            start = time.perf_counter()
+            try:
+                if self.workers > 0:
+                    self._pool = EmbeddingWorkerPool(
+                        self.model_name, self.requested_backend, settings.EMBEDDING_ONNX_FILE,
+                        processes=self.workers,
+                        torch_threads=settings.EMBEDDING_TORCH_THREADS,
+                        max_pending=settings.EMBEDDING_MAX_PENDING_BATCHES,
+                    )
+                    info = self._pool.describe()
+                else:
+                    self._model, backend = self._load_model()
+                    info = describe_model(self._model, backend)
+            except Exception as e:
+                self.load_error = str(e)
+                raise
+            self.load_error = None
+            self.dimension = info["dim"]
+            self.backend = info["backend"]
+            where = f"{self.workers} worker process(es)" if self.workers > 0 else "the API process"
+            logger.info(
+                f"[Refiner] Loaded '{self.model_name}' ({self.backend}) in {where} "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+    @property
+    def model(self):
+        """In-process SentenceTransformer. Not available when encoding runs in worker processes."""
+        if self.workers > 0:
+            # A second copy of the model in the API process would defeat the pool
+            raise RuntimeError("The embedding model runs in worker processes (EMBEDDING_WORKERS > 0); use embed()")
+        self._ensure_loaded()
+        return self._model
+
+    @property
+    def embedding_id(self) -> str:
+        """Model identity used to key cached vectors; quantized ONNX vectors differ slightly from PyTorch ones."""
+        self._ensure_loaded()
+        return self.model_name if self.backend == "torch" else f"{self.model_name}@{self.backend}"
+
+    def produces(self, embedding_id: str) -> bool:
+        """Whether vectors keyed by embedding_id match this refiner's model, without loading it."""
+        if self.is_ready:
+            return embedding_id == self.embedding_id
+        expected = {self.model_name}
+        if self.requested_backend == "onnx":
+            # The ONNX backend falls back to PyTorch when it is unavailable
+            expected.add(f"{self.model_name}@onnx")
+        return embedding_id in expected
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = tiktoken.get_encoding("cl100k_base")
+        return self._encoder
 
-    def refine(self, chunks: List[Dict[str, Any]], threshold: float = 0.92) -> List[Dict[str, Any]]:
+    def warmup(self) -> threading.Thread:
+        """Load the model on a daemon thread so the first pipeline run does not pay for it."""
+        if self._warmup_thread is None or not self._warmup_thread.is_alive():
+            def _load():
+                try:
+                    self._ensure_loaded()
+                    self.encoder
+                except Exception as e:
+                    logger.error(f"[Refiner] Background model warmup failed: {e}")
+
+            self._warmup_thread = threading.Thread(target=_load, name="embedding-warmup", daemon=True)
+            self._warmup_thread.start()
+        return self._warmup_thread
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def get_cache(self, project_path: Path, embedding_id: Optional[str] = None) -> Optional[EmbeddingCache]:
+        """
+        Embedding cache for a project according to EMBEDDING_CACHE (project, global or off).
+        Passing the embedding_id of stored vectors avoids loading the model just to key the cache.
+        """
+        scope = settings.EMBEDDING_CACHE
+        if scope == "off":
+            return None
+        embedding_id = embedding_id or self.embedding_id
+        if scope == "project":
+            return get_embedding_cache(project_path / "embeddings", embedding_id)
+        if scope == "global":
+            return get_embedding_cache(settings.CACHE_DIR / "embeddings", embedding_id)
+        return None
+
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        self._ensure_loaded()
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        if self._pool is not None:
+            return self._pool.encode(texts, batch_size)
+        return encode_texts(self._model, texts, batch_size)
+
+    def embed(self, texts: List[str], batch_size: Optional[int] = None,
+              cache: Optional[EmbeddingCache] = None) -> np.ndarray:
+        """
+        Encode texts in batches. Rows are L2-normalized so cosine similarity is a dot product.
+        With a cache, only texts whose content hash is not stored yet are sent to the model.
+        """
+        if cache is None:
+            if not texts:
+                self._ensure_loaded()
+                return np.zeros((0, self.dimension), dtype=np.float32)
+            return self._encode(texts, batch_size)
+
+        keys = [text_key(t) for t in texts]
+        vectors, missing = cache.get(keys)
+        if missing:
+            # Encode each distinct missing text once
+            todo = list(dict.fromkeys(keys[i] for i in missing))
+            by_key = {keys[i]: texts[i] for i in missing}
+            encoded = self._encode([by_key[k] for k in todo], batch_size)
+            cache.add(todo, encoded)
+            rows = {k: j for j, k in enumerate(todo)}
+            if vectors is None:
+                vectors = np.zeros((len(texts), encoded.shape[1]), dtype=np.float32)
+            for i in missing:
+                vectors[i] = encoded[rows[keys[i]]]
+            logger.info(f"[Refiner] Embedded {len(todo)} new texts, {len(texts) - len(missing)} served from cache")
+        if vectors is None:
+            vectors = np.zeros((0, 0), dtype=np.float32)
+        return vectors
+
+    def count_tokens(self, chunk: Dict[str, Any]) -> int:
+        if 'token_count' in chunk:
+            return chunk['token_count']
+        return len(self.encoder.encode(chunk['text']))
+
+    def refine(self, chunks: List[Dict[str, Any]], threshold: float = 0.92,
+               batch_size: Optional[int] = None, merge_mode: str = "exact",
+               max_merged_tokens: Optional[int] = None,
+               cache: Optional[EmbeddingCache] = None) -> List[Dict[str, Any]]:
         """
         Merge adjacent chunks if their cosine similarity is above the threshold.
+
+        merge_mode="exact" re-encodes the merged buffer after every merge.
+        merge_mode="incremental" never re-encodes: the buffer embedding is the
+        token-weighted mean of its normalized chunk embeddings, so a run of n
+        similar chunks costs n encodes instead of O(n^2) tokens of inference.
+        A merge is skipped when the buffer would grow past max_merged_tokens.
+        Passing a cache makes re-runs (e.g. a new threshold) skip encoding known chunks.
         """
+        if merge_mode not in ("exact", "incremental"):
+            raise ValueError(f"Unsupported merge mode: '{merge_mode}'. Available: ['exact', 'incremental']")
         if not chunks:
             return []
             
         refined_chunks = []
+
+        # Embed every chunk up front so the model sees full batches instead of one text per call
+        chunk_embs = self.embed([c['text'] for c in chunks], batch_size=batch_size, cache=cache)
         
         # Initialize buffer with the first chunk
         buffer_chunk = chunks[0].copy()
+        buffer_tokens = self.count_tokens(buffer_chunk)
         
         # We need to maintain the buffer's embedding
-        buffer_emb = self.model.encode(buffer_chunk['text'], convert_to_tensor=True)
+        buffer_emb = chunk_embs[0]
         
         i = 1
         while i < len(chunks):
             next_chunk = chunks[i]
-            next_emb = self.model.encode(next_chunk['text'], convert_to_tensor=True)
+            next_emb = chunk_embs[i]
+            next_tokens = self.count_tokens(next_chunk)
             
-            # Compute cosine similarity
-            sim = util.pytorch_cos_sim(buffer_emb, next_emb).item()
+            # Compute cosine similarity (embeddings are normalized)
+            sim = float(np.dot(buffer_emb, next_emb))
+            fits = max_merged_tokens is None or buffer_tokens + next_tokens <= max_merged_tokens
             
-            if sim > threshold:
+            if sim > threshold and fits:
                 # Merge: Append next chunk text to buffer
                 buffer_chunk['text'] += " " + next_chunk['text']
-                # Re-compute buffer embedding (merging changes meaning)
-                buffer_emb = self.model.encode(buffer_chunk['text'], convert_to_tensor=True)
+                if merge_mode == "incremental":
+                    # Token-weighted mean of normalized vectors, re-normalized
+                    merged = buffer_emb * buffer_tokens + next_emb * next_tokens
+                    buffer_emb = merged / max(float(np.linalg.norm(merged)), 1e-12)
+                else:
+                    # Re-compute buffer embedding (merging changes meaning)
+                    buffer_emb = self.embed([buffer_chunk['text']])[0]
+                buffer_tokens += next_tokens
             else:
                 # No merge: Commit buffer and start new buffer
                 refined_chunks.append(buffer_chunk)
                 buffer_chunk = next_chunk.copy()
                 buffer_emb = next_emb
+                buffer_tokens = next_tokens
             
             i += 1
             
@@ -57,4 +251,79 @@ class EmbeddingRefiner:
             
         return final_chunks
 
+    def save_similarity_profile(self, project_path: Path, chunks: List[Dict[str, Any]],
+                                cache: EmbeddingCache, max_merged_tokens: Optional[int] = None,
+                                merge_mode: str = "exact") -> Dict[str, Any]:
+        """
+        Persist what a threshold sweep needs for the pre-refine chunks: their
+        content hashes (to look vectors up in the cache), token counts, the
+        cosine similarity of each adjacent pair and the merge cap and mode the run used.
+        """
+        vectors = self.embed([c['text'] for c in chunks], cache=cache)
+        adjacent = np.einsum('ij,ij->i', vectors[:-1], vectors[1:]) if len(chunks) > 1 else np.zeros(0)
+        profile = {
+            "model": self.embedding_id,
+            "keys": [text_key(c['text']) for c in chunks],
+            "token_counts": [self.count_tokens(c) for c in chunks],
+            "adjacent_similarity": [round(float(x), 6) for x in adjacent],
+            "max_merged_tokens": max_merged_tokens,
+            "merge_mode": merge_mode,
+        }
+        tmp_path = project_path / "similarity.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f)
+        tmp_path.replace(project_path / "similarity.json")
+        return profile
+
+    def sweep_thresholds(self, vectors: np.ndarray, token_counts: List[int], thresholds: List[float],
+                         max_merged_tokens: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Replay incremental-mode merging for many thresholds at once.
+
+        One buffer embedding is kept per threshold, so every step is a single
+        (thresholds x dim) matrix-vector product. Results match
+        refine(merge_mode="incremental"); for exact mode they are an estimate.
+        """
+        th = np.asarray(thresholds, dtype=np.float64)
+        n = len(token_counts)
+        sizes: List[List[int]] = [[] for _ in thresholds]
+        if n == 0:
+            return [{"threshold": float(t), "chunk_count": 0, "tokens": None} for t in th]
+
+        buffers = np.repeat(vectors[:1].astype(np.float32), len(th), axis=0)
+        buffer_tokens = np.full(len(th), token_counts[0], dtype=np.int64)
+        for i in range(1, n):
+            next_emb = vectors[i]
+            next_tokens = token_counts[i]
+            merge = (buffers @ next_emb) > th
+            if max_merged_tokens is not None:
+                merge &= buffer_tokens + next_tokens <= max_merged_tokens
+            if merge.any():
+                weights = buffer_tokens[merge].astype(np.float32)[:, None]
+                merged = buffers[merge] * weights + next_emb * np.float32(next_tokens)
+                norms = np.maximum(np.linalg.norm(merged, axis=1, keepdims=True), 1e-12)
+                buffers[merge] = merged / norms
+                buffer_tokens[merge] += next_tokens
+            split = np.flatnonzero(~merge)
+            for j in split:
+                sizes[j].append(int(buffer_tokens[j]))
+            buffers[split] = next_emb
+            buffer_tokens[split] = next_tokens
+
+        results = []
+        for j, t in enumerate(th):
+            tokens = np.asarray(sizes[j] + [int(buffer_tokens[j])])
+            results.append({
+                "threshold": round(float(t), 4),
+                "chunk_count": int(len(tokens)),
+                "tokens": {
+                    "min": int(tokens.min()),
+                    "mean": round(float(tokens.mean()), 1),
+                    "p50": int(np.percentile(tokens, 50)),
+                    "p90": int(np.percentile(tokens, 90)),
+                    "max": int(tokens.max()),
+                },
+            })
+        return results
+
 embedding_refiner = EmbeddingRefiner()
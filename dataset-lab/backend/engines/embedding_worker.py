@@ -0,0 +1,133 @@
+import logging
+import multiprocessing
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+def load_embedding_model(model_name: str, backend: str = "torch", onnx_file: Optional[str] = None,
+                         torch_threads: int = 0):
+    """
+    Returns (model, backend_used). backend="onnx" runs the model through ONNX
+    Runtime (e.g. int8-quantized weights via onnx_file) and falls back to the
+    PyTorch backend when optimum/onnxruntime or the ONNX file is unavailable.
+    """
+    from sentence_transformers import SentenceTransformer
+    if torch_threads > 0:
+        import torch
+        torch.set_num_threads(torch_threads)
+    if backend == "onnx":
+        try:
+            model_kwargs = {"file_name": onnx_file} if onnx_file else None
+            return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs), "onnx"
+        except Exception as e:
+            logger.warning(f"[Embedding] ONNX backend unavailable ({e}); falling back to sentence-transformers on PyTorch.")
+    elif backend != "torch":
+        raise ValueError(f"Unsupported embedding backend: '{backend}'. Available: ['torch', 'onnx']")
+    return SentenceTransformer(model_name), "torch"
+
+def encode_texts(model, texts: List[str], batch_size: int) -> np.ndarray:
+    """L2-normalized float32 embeddings, so cosine similarity is a dot product."""
+    return model.encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    ).astype(np.float32, copy=False)
+
+def describe_model(model, backend: str) -> Dict[str, Any]:
+    return {
+        "backend": backend,
+        "dim": model.get_sentence_embedding_dimension(),
+        "max_seq_length": getattr(model, "max_seq_length", None),
+    }
+
+# ── Worker process side ───────────────────────────────────────────────────────
+# Each worker process loads the model once in its initializer and keeps it here.
+_worker_model = None
+_worker_backend: Optional[str] = None
+
+def _init_worker(model_name: str, backend: str, onnx_file: Optional[str], torch_threads: int):
+    global _worker_model, _worker_backend
+    _worker_model, _worker_backend = load_embedding_model(model_name, backend, onnx_file, torch_threads)
+
+def _worker_describe() -> Dict[str, Any]:
+    return describe_model(_worker_model, _worker_backend)
+
+def _worker_encode(texts: List[str], batch_size: int) -> np.ndarray:
+    return encode_texts(_worker_model, texts, batch_size)
+
+# ── API process side ──────────────────────────────────────────────────────────
+class EmbeddingWorkerPool:
+    """
+    Runs embedding inference in dedicated processes so torch never competes
+    with request handling for the GIL. One pool is shared by every project.
+
+    Work is submitted in batch-sized tasks; at most max_pending tasks are in
+    flight, and callers block (backpressure) until a slot frees up.
+    """
+
+    def __init__(self, model_name: str, backend: str, onnx_file: Optional[str],
+                 processes: int = 1, torch_threads: int = 0, max_pending: int = 4):
+        self._initargs = (model_name, backend, onnx_file, torch_threads)
+        self._processes = processes
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._processes,
+                    # spawn: never fork a process that already holds threads and sockets
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=self._initargs,
+                )
+            return self._executor
+
+    def _submit(self, fn, *args):
+        self._slots.acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _reset_if_broken(self, error: Exception):
+        if isinstance(error, BrokenProcessPool):
+            logger.error("[Embedding] Worker process died; it will be restarted on the next request.")
+            with self._lock:
+                self._executor = None
+
+    def describe(self) -> Dict[str, Any]:
+        """Starts the workers (loading the model) and returns backend, dim and max_seq_length."""
+        try:
+            return self._submit(_worker_describe).result()
+        except Exception as e:
+            self._reset_if_broken(e)
+            raise
+
+    def encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        futures = [
+            self._submit(_worker_encode, texts[i:i + batch_size], batch_size)
+            for i in range(0, len(texts), batch_size)
+        ]
+        try:
+            return np.concatenate([f.result() for f in futures], axis=0)
+        except Exception as e:
+            self._reset_if_broken(e)
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
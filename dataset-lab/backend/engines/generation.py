@@ -139,6 +139,10 @@ class GenerationEngine:
                 self._write_progress(project_path, i, total, "stopped")
                 return qa_results
 
+            # Flagged by chunk dedup: its passage is already covered by an earlier chunk
+            if chunk.get('duplicate_of') is not None:
+                continue
+
             text = chunk['text']
 
             token_count = chunk.get('token_count', len(text))
@@ -1,6 +1,16 @@
+import logging
 import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
 from urllib.parse import urlparse
 
+from backend.engines.processing.rules import (
+    CLEANING_RULES_FILE, RulePipeline,
+    build_pipeline, load_project_rules, load_rule_names,
+)
+
+logger = logging.getLogger(__name__)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Boilerplate Phrase Fragments (substring match, case-insensitive)
 # These are patterns that commonly appear in navigational/UI noise.
@@ -46,7 +56,8 @@ BOILERPLATE_FRAGMENTS = [
 # Regex Patterns for Structural Noise
 # ─────────────────────────────────────────────────────────────────────────────
 # Lines that are just a bunch of nav links separated by pipes or bullets
-NAV_SEPARATOR_RE = re.compile(r'^[\w\s\-]+(\s*[\|›•·]\s*[\w\s\-]+){2,}$')
+# (the lookahead requires two separators up front, avoiding heavy backtracking on ordinary prose)
+NAV_SEPARATOR_RE = re.compile(r'^(?=(?:[^|›•·]*[|›•·]){2})[\w\s\-]+(\s*[\|›•·]\s*[\w\s\-]+){2,}$')
 
 # Lines that look like counters or stats (e.g., "5 min read", "1.2K views")
 COUNTER_RE = re.compile(r'^\d+[\.,]?\d*\s*(min read|views?|comments?|shares?|likes?|claps?|reactions?|reads?)$', re.IGNORECASE)
@@ -54,12 +65,6 @@ COUNTER_RE = re.compile(r'^\d+[\.,]?\d*\s*(min read|views?|comments?|shares?|lik
 # Lines with excessive punctuation or symbols (usually broken encoding / ads)
 SYMBOL_HEAVY_RE = re.compile(r'^[^a-zA-Z0-9\s]{4,}$')
 
-# Leftover HTML entities
-HTML_ENTITY_RE = re.compile(r'&[a-z]{2,8};|&#\d{1,6};', re.IGNORECASE)
-
-# Leftover HTML tags that slipped through
-HTML_TAG_RE = re.compile(r'<[^>]+>')
-
 # URL-looking strings on their own line
 STANDALONE_URL_RE = re.compile(r'^https?://\S+$')
 
@@ -70,115 +75,173 @@ TRIVIAL_LINE_RE = re.compile(r'^\W{0,2}$|^\d{1,4}\W{0,2}$')
 HORIZONTAL_RULE_RE = re.compile(r'^[-=_*]{3,}$')
 
 
-def _is_boilerplate_line(line: str) -> bool:
-    """Returns True if the line is known boilerplate/navigation noise."""
-    lower = line.lower().strip()
-    for fragment in BOILERPLATE_FRAGMENTS:
-        if fragment in lower:
-            return True
-    return False
+# Structural noise rules, applied to stripped lines with re.match
+NOISE_PATTERNS = [
+    NAV_SEPARATOR_RE,
+    COUNTER_RE,
+    SYMBOL_HEAVY_RE,
+    STANDALONE_URL_RE,
+    TRIVIAL_LINE_RE,
+    HORIZONTAL_RULE_RE,
+]
+
+# Default rule pipeline for scraped text (see rules.py); lines are rejoined as paragraphs
+SCRAPE_RULES = [
+    "html_tags",
+    "html_entities",
+    "collapse_spaces",
+    "collapse_blank_lines",
+    "noise_lines",
+    "dedupe_paragraphs",
+    "strip_lines",
+    "strip",
+]
 
 
-def _score_line(line: str) -> bool:
+def _fragment_trie_pattern(fragments: Iterable[str]) -> str:
     """
-    Returns True if this line should be KEPT.
-    A line is dropped if it matches any structural noise pattern.
+    Compile literal fragments into one regex shaped like a trie, so a line is
+    scanned once with shared prefixes instead of once per fragment. Branches
+    below a complete fragment are pruned: the shorter match already decides.
     """
-    stripped = line.strip()
-    
-    if not stripped:
-        return False
-    
-    # Drop very short lines (< 15 chars) — these are usually menu items or labels
-    if len(stripped) < 15:
-        return False
-    
-    # Drop nav separators (Home | About | Contact | ...)
-    if NAV_SEPARATOR_RE.match(stripped):
-        return False
-    
-    # Drop counter lines (e.g. "3 min read")
-    if COUNTER_RE.match(stripped):
-        return False
-    
-    # Drop symbol-only lines
-    if SYMBOL_HEAVY_RE.match(stripped):
-        return False
-    
-    # Drop standalone URLs
-    if STANDALONE_URL_RE.match(stripped):
-        return False
-    
-    # Drop trivial lines (just numbers, punctuation, etc.)
-    if TRIVIAL_LINE_RE.match(stripped):
-        return False
-    
-    # Drop horizontal rules
-    if HORIZONTAL_RULE_RE.match(stripped):
-        return False
-    
-    # Drop known boilerplate phrases
-    if _is_boilerplate_line(stripped):
-        return False
-    
-    return True
+    trie: dict = {}
+    for fragment in fragments:
+        node = trie
+        for ch in fragment:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node: dict) -> str:
+        if '' in node:
+            return ''
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items())]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:' + '|'.join(alternatives) + ')'
+
+    # A pattern that can never match when there are no fragments
+    return build(trie) if trie else r'(?!)'
+
+
+def _inline_pattern(pattern) -> str:
+    """Wrap a pattern as a group, keeping IGNORECASE as a scoped inline flag."""
+    if isinstance(pattern, str):
+        return f'(?:{pattern})'
+    if pattern.flags & re.IGNORECASE:
+        return f'(?i:{pattern.pattern})'
+    return f'(?:{pattern.pattern})'
+
+
+class BoilerplateMatcher:
+    """
+    Precompiled line classifier: one trie regex for every boilerplate fragment
+    (case-insensitive substring match) and one alternation for every
+    structural noise pattern (anchored match on the stripped line).
+    """
+
+    def __init__(self, fragments: Iterable[str], noise_patterns: Iterable):
+        self.fragments = tuple(dict.fromkeys(f.lower() for f in fragments if f))
+        self.fragment_re = re.compile(_fragment_trie_pattern(self.fragments))
+        self.noise_re = re.compile('|'.join(_inline_pattern(p) for p in noise_patterns) or r'(?!)')
 
+    def is_boilerplate(self, line: str) -> bool:
+        return self.fragment_re.search(line.lower().strip()) is not None
 
-def _collapse_whitespace(text: str) -> str:
-    """Normalize whitespace without destroying paragraph structure."""
-    # Remove HTML leftovers
-    text = HTML_TAG_RE.sub(' ', text)
-    text = HTML_ENTITY_RE.sub(' ', text)
-    # Normalize spaces within lines (but keep newlines)
-    text = re.sub(r'[ \t]+', ' ', text)
-    # Collapse more than 2 consecutive newlines into a paragraph break
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    return text
+    def is_noise(self, stripped: str) -> bool:
+        return self.noise_re.match(stripped) is not None
 
+    def keep_line(self, line: str) -> bool:
+        """
+        Returns True if this line should be KEPT.
+        A line is dropped if it matches any structural noise pattern.
+        """
+        stripped = line.strip()
 
-def _deduplicate_paragraphs(paragraphs: list[str]) -> list[str]:
+        if not stripped:
+            return False
+
+        # Drop very short lines (< 15 chars) — these are usually menu items or labels
+        if len(stripped) < 15:
+            return False
+
+        # Drop nav separators, counters, symbol-only lines, standalone URLs,
+        # trivial lines and horizontal rules (plus any project-specific patterns)
+        if self.is_noise(stripped):
+            return False
+
+        # Drop known boilerplate phrases
+        return not self.is_boilerplate(stripped)
+
+
+@lru_cache(maxsize=32)
+def _compile_matcher(fragments: Tuple[str, ...], noise_patterns: Tuple[str, ...]) -> BoilerplateMatcher:
+    return BoilerplateMatcher(fragments, NOISE_PATTERNS + list(noise_patterns))
+
+
+DEFAULT_MATCHER = _compile_matcher(tuple(BOILERPLATE_FRAGMENTS), ())
+
+
+def load_boilerplate_matcher(project_dir) -> BoilerplateMatcher:
+    """
+    Matcher for a project. <project>/cleaning_rules.json may contain:
+      "boilerplate_fragments":       replaces the default fragment list
+      "extra_boilerplate_fragments": appended to the fragment list
+      "noise_patterns":              extra regexes matched against stripped lines
     """
-    Remove duplicate or near-duplicate adjacent lines.
-    Useful when scrapers collect the same headline text multiple times.
+    rules = load_project_rules(project_dir)
+    if not rules:
+        return DEFAULT_MATCHER
+    try:
+        fragments = list(rules.get("boilerplate_fragments", BOILERPLATE_FRAGMENTS))
+        fragments += rules.get("extra_boilerplate_fragments", [])
+        return _compile_matcher(tuple(fragments), tuple(rules.get("noise_patterns", [])))
+    except Exception as e:
+        logger.warning(f"Ignoring invalid boilerplate rules in {project_dir}/{CLEANING_RULES_FILE}: {e}")
+        return DEFAULT_MATCHER
+
+
+def load_scrape_pipeline(project_dir=None) -> RulePipeline:
     """
-    seen = set()
-    result = []
-    for p in paragraphs:
-        key = re.sub(r'\W+', '', p.lower())[:80]  # normalised key for comparison
-        if key not in seen:
-            seen.add(key)
-            result.append(p)
-    return result
+    Rule pipeline for a project's scraped text. <project>/cleaning_rules.json
+    may set "scrape_rules" (ordered rule names) and "disabled_rules".
+    """
+    names = load_rule_names(project_dir, "scrape_rules", SCRAPE_RULES)
+    matcher = load_boilerplate_matcher(project_dir) if project_dir is not None else DEFAULT_MATCHER
+    return build_pipeline(names, joiner='\n\n', matcher=matcher)
+
+
+DEFAULT_SCRAPE_PIPELINE = build_pipeline(SCRAPE_RULES, joiner='\n\n', matcher=DEFAULT_MATCHER)
+
+
+def _is_boilerplate_line(line: str, matcher: BoilerplateMatcher = DEFAULT_MATCHER) -> bool:
+    """Returns True if the line is known boilerplate/navigation noise."""
+    return matcher.is_boilerplate(line)
+
+
+def _score_line(line: str, matcher: BoilerplateMatcher = DEFAULT_MATCHER) -> bool:
+    """Returns True if this line should be KEPT."""
+    return matcher.keep_line(line)
 
 
-def clean_text_content(text: str) -> str:
+def clean_text_content(text: str, pipeline: Optional[RulePipeline] = None) -> str:
     """
     Multi-stage heuristic cleaner for scraped web text.
     
-    Pipeline:
+    Default pipeline (SCRAPE_RULES):
       1. Strip leftover HTML tags and entities
       2. Normalize whitespace
-      3. Filter lines through structural noise rules
-      4. Remove boilerplate fragments
-      5. Deduplicate repeated content
-      6. Final paragraph assembly
+      3. Filter lines through structural noise rules and boilerplate fragments
+      4. Deduplicate repeated content
+      5. Final paragraph assembly
     """
-    if not text:
-        return ""
-
-    # Stage 1 & 2: HTML cleanup + whitespace normalization
-    text = _collapse_whitespace(text)
-
-    # Stage 3 & 4: Line-level filtering
-    lines = text.split('\n')
-    filtered = [line for line in lines if _score_line(line)]
+    return clean_text_with_report(text, pipeline, profile=False)[0]
 
-    # Stage 5: Deduplicate
-    filtered = _deduplicate_paragraphs(filtered)
 
-    # Stage 6: Rejoin and trim
-    cleaned = '\n\n'.join(line.strip() for line in filtered)
-    return cleaned.strip()
+def clean_text_with_report(text: str, pipeline: Optional[RulePipeline] = None,
+                           profile: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """clean_text_content plus the pipeline's per-rule profile."""
+    pipeline = pipeline or DEFAULT_SCRAPE_PIPELINE
+    return pipeline.run_with_profile(text or "", profile)
 
 
 def sanitize_url(url: str) -> str:
@@ -0,0 +1,296 @@
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.engines.processing.deduplicator import BKTree, MinHashLSH, get_image_phash_from_bytes, get_text_hash
+
+logger = logging.getLogger(__name__)
+
+DEDUP_STORE_FILE = "dedup_index.npz"
+IMAGE_INDEX_FILE = "image_hashes.json"
+
+def _atomic_write(path: Path, write, mode: str = "wb"):
+    """Write via write(file) to a temp file in the same directory, fsync, then rename over path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}_", suffix=path.suffix)
+    try:
+        with os.fdopen(fd, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class DedupStore:
+    """
+    Per-project memory of every scraped document: exact content hashes plus
+    the MinHash sketches (signature and shingle set) used for near-duplicate
+    lookups. Persisted next to scraped/text as a compacted base file,
+    scraped/dedup_index.npz, plus append-only segments
+    (dedup_index.000001.npz, ...) that each hold one batch of new documents.
+    A crawl writes only its new documents, in segments, and compacts
+    everything into the base file once at the end. Every file is written
+    atomically (temp file + rename), so a crash never leaves one half-written.
+    """
+
+    def __init__(self, scraped_dir, threshold: float = 0.8):
+        self.path = Path(scraped_dir) / DEDUP_STORE_FILE
+        self.hashes = set()
+        self.lsh = MinHashLSH(threshold=threshold)
+        # Added since the last segment was taken
+        self._new_hashes: List[str] = []
+        self._new_sketches: List[Tuple[str, np.ndarray, np.ndarray]] = []
+        self._next_segment = 1
+
+    @classmethod
+    def load(cls, scraped_dir, threshold: float = 0.8) -> "DedupStore":
+        store = cls(scraped_dir, threshold)
+        if store.path.exists() or store._segments():
+            try:
+                store._read()
+                return store
+            except Exception as e:
+                logger.warning(f"Rebuilding unreadable dedup index at {store.path}: {e}")
+                store = cls(scraped_dir, threshold)
+        store._bootstrap(Path(scraped_dir) / "text")
+        return store
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    @property
+    def _dirty(self) -> int:
+        return len(self._new_hashes)
+
+    def _segment_path(self, number: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{number:06d}{self.path.suffix}")
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        """(number, path) of every segment on disk, oldest first."""
+        segments = []
+        for path in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"):
+            number = path.name[len(self.path.stem) + 1:-len(self.path.suffix)]
+            if number.isdigit():
+                segments.append((int(number), path))
+        return sorted(segments)
+
+    def _read(self):
+        segments = self._segments()
+        for path in ([self.path] if self.path.exists() else []) + [path for _, path in segments]:
+            self._read_file(path)
+        if segments:
+            self._next_segment = segments[-1][0] + 1
+
+    def _read_file(self, path: Path):
+        with np.load(path, allow_pickle=False) as data:
+            num_perm, shingle_size = (int(v) for v in data["params"])
+            if (num_perm, shingle_size) != (self.lsh.num_perm, self.lsh.shingle_size):
+                raise ValueError(f"index built with num_perm={num_perm}, shingle_size={shingle_size}")
+            self.hashes.update(data["hashes"].tolist())
+            ids = data["sketch_ids"].tolist()
+            signatures = data["signatures"]
+            shingles = data["shingles"].astype(np.uint64)
+            offsets = data["offsets"]
+        for i, doc_id in enumerate(ids):
+            # A crash between compaction and segment cleanup leaves documents in both
+            if doc_id not in self.lsh:
+                self.lsh.add(doc_id, signatures[i], shingles[offsets[i]:offsets[i + 1]])
+
+    def _arrays(self, hashes, sketches) -> Dict[str, np.ndarray]:
+        ids, signatures, shingles = [], [], []
+        for doc_id, signature, doc_shingles in sketches:
+            ids.append(doc_id)
+            signatures.append(signature)
+            shingles.append(doc_shingles.astype(np.uint32))
+        offsets = np.zeros(len(shingles) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in shingles], out=offsets[1:])
+        return {
+            "params": np.array([self.lsh.num_perm, self.lsh.shingle_size]),
+            "hashes": np.array(hashes, dtype="U64"),
+            "sketch_ids": np.array(ids, dtype="U64"),
+            "signatures": np.array(signatures, dtype=np.uint32).reshape(len(ids), self.lsh.num_perm),
+            "shingles": np.concatenate(shingles) if shingles else np.empty(0, dtype=np.uint32),
+            "offsets": offsets,
+        }
+
+    def _bootstrap(self, text_dir: Path):
+        """One-time migration for projects scraped before the index existed."""
+        doc_paths = sorted(text_dir.glob("doc_*.json")) if text_dir.is_dir() else []
+        for doc_path in doc_paths:
+            try:
+                with open(doc_path, "r", encoding="utf-8") as f:
+                    text = json.load(f).get("cleaned_text", "")
+            except Exception:
+                continue
+            if text:
+                self.add(get_text_hash(text), text)
+        if self.hashes:
+            logger.info(f"Indexed {len(self.hashes)} existing scraped documents into {self.path}")
+        # Written even when empty: documents saved later are indexed through segments, and a
+        # resumed crawl must not index documents whose pages it still has to re-crawl
+        self.save()
+
+    def check(self, text_hash: str, text: str,
+              sketch: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[str, Optional[str]]:
+        """
+        Returns ("duplicate", hash), ("near_duplicate", hash) or ("new", None).
+        New documents are added to the store. sketch is text's MinHash
+        (signature, shingles) when computed elsewhere, see MinHashLSH.sketch.
+        """
+        if text_hash in self.hashes:
+            return "duplicate", text_hash
+        signature, shingles = sketch if sketch is not None else self.lsh.sketch(text)
+        match = self.lsh.check_and_add(text_hash, text, (signature, shingles))
+        if match is not None:
+            return "near_duplicate", match[0]
+        self.hashes.add(text_hash)
+        self._new_hashes.append(text_hash)
+        self._new_sketches.append((text_hash, signature, shingles))
+        return "new", None
+
+    def add(self, text_hash: str, text: str):
+        if text_hash not in self.lsh:
+            signature, shingles = self.lsh.sketch(text)
+            self.lsh.add(text_hash, signature, shingles)
+            self._new_sketches.append((text_hash, signature, shingles))
+        if text_hash not in self.hashes:
+            self.hashes.add(text_hash)
+            self._new_hashes.append(text_hash)
+
+    def save_if_dirty(self, every: int = 1):
+        """Compacts the store into the base file when documents were added or segments are on disk."""
+        if self._dirty >= every or self._segments():
+            self.save()
+
+    def snapshot_if_dirty(self, every: int = 1) -> Optional[Callable[[], None]]:
+        """
+        Takes the documents added since the last snapshot and returns a
+        function that writes them as a new segment, so the write runs in a
+        thread while the crawl keeps mutating the store. None when fewer than
+        `every` documents are pending.
+        """
+        return self.snapshot() if self._dirty >= every else None
+
+    def snapshot(self) -> Callable[[], None]:
+        hashes, sketches = self._new_hashes, self._new_sketches
+        self._new_hashes, self._new_sketches = [], []
+        path = self._segment_path(self._next_segment)
+        self._next_segment += 1
+
+        def write():
+            try:
+                # Arrays are built in the writer, off the caller's thread
+                _atomic_write(path, lambda f: np.savez(f, **self._arrays(hashes, sketches)))
+            except BaseException:
+                # Pending again, so the next segment or the final save still writes them
+                self._new_hashes[:0] = hashes
+                self._new_sketches[:0] = sketches
+                raise
+        return write
+
+    def save(self):
+        """
+        Rewrites the base file with every document and removes the segments
+        it replaces. Not for use while another thread mutates the store.
+        """
+        segments = self._segments()
+        arrays = self._arrays(sorted(self.hashes), self.lsh.items())
+        _atomic_write(self.path, lambda f: np.savez(f, **arrays))
+        self._new_hashes, self._new_sketches = [], []
+        for _, path in segments:
+            path.unlink(missing_ok=True)
+        self._next_segment = 1
+
+
+class ImageHashIndex:
+    """
+    Per-project perceptual hashes of every downloaded image, in a BK-tree so a
+    new image is matched against all of them by Hamming distance in roughly
+    logarithmic time. Persisted as scraped/image_hashes.json in insertion
+    order, which rebuilds the identical tree on load.
+    """
+
+    def __init__(self, scraped_dir, max_distance: int = 6):
+        self.path = Path(scraped_dir) / IMAGE_INDEX_FILE
+        self.max_distance = max_distance
+        self.tree = BKTree()
+        self.entries = []
+        self.duplicates = 0
+        self._dirty = 0
+
+    @classmethod
+    def load(cls, scraped_dir, max_distance: int = 6) -> "ImageHashIndex":
+        index = cls(scraped_dir, max_distance)
+        if index.path.exists():
+            try:
+                with open(index.path, "r", encoding="utf-8") as f:
+                    for hex_hash, filename in json.load(f)["hashes"]:
+                        index._add(int(hex_hash, 16), filename)
+                return index
+            except Exception as e:
+                logger.warning(f"Rebuilding unreadable image index at {index.path}: {e}")
+                index = cls(scraped_dir, max_distance)
+        index._bootstrap(Path(scraped_dir) / "images")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _add(self, hash_value: int, filename: str):
+        self.tree.add(hash_value, filename)
+        self.entries.append((hash_value, filename))
+
+    def _bootstrap(self, image_dir: Path):
+        """One-time migration for projects scraped before the index existed."""
+        if not image_dir.is_dir():
+            return
+        for image_path in sorted(p for p in image_dir.iterdir() if p.is_file()):
+            hash_value = get_image_phash_from_bytes(image_path.read_bytes())
+            if hash_value is not None and self.tree.find(hash_value, 0) is None:
+                self._add(hash_value, image_path.name)
+                self._dirty += 1
+        if self.entries:
+            logger.info(f"Indexed {len(self.entries)} existing images into {self.path}")
+            self.save()
+
+    def check(self, hash_value: int) -> Optional[Tuple[str, int]]:
+        """(filename, distance) of a stored near-identical image, counted as a duplicate, or None."""
+        match = self.tree.find(hash_value, self.max_distance)
+        if match is not None:
+            self.duplicates += 1
+        return match
+
+    def add(self, hash_value: int, filename: str):
+        self._add(hash_value, filename)
+        self._dirty += 1
+
+    def save_if_dirty(self, every: int = 1):
+        if self._dirty >= every:
+            self.save()
+
+    def snapshot_if_dirty(self, every: int = 1) -> Optional[Callable[[], None]]:
+        """See DedupStore.snapshot_if_dirty."""
+        return self.snapshot() if self._dirty >= every else None
+
+    def save(self):
+        self.snapshot()()
+
+    def snapshot(self) -> Callable[[], None]:
+        payload = {"hashes": [[f"{h:016x}", name] for h, name in self.entries]}
+        dirty, self._dirty = self._dirty, 0
+
+        def write():
+            try:
+                _atomic_write(self.path, lambda f: json.dump(payload, f), mode="w")
+            except BaseException:
+                self._dirty += dirty
+                raise
+        return write
+
@@ -1,10 +1,18 @@
 import hashlib
 import imagehash
+import io
 import math
 import re
+import zlib
 from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
 from PIL import Image
 
+WORD_RE = re.compile(r'\w+')
+
 def get_text_hash(text: str) -> str:
     """
     Creates a SHA-256 hash of string to find exact duplicates.
@@ -13,7 +21,7 @@ def get_text_hash(text: str) -> str:
     return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
 
 def text_to_vector(text: str) -> Counter:
-    words = re.compile(r'\w+').findall(text.lower())
+    words = WORD_RE.findall(text.lower())
     return Counter(words)
 
 def get_cosine(vec1: Counter, vec2: Counter) -> float:
@@ -39,6 +47,148 @@ def is_near_duplicate(text: str, seen_vectors: list[Counter], threshold: float =
     seen_vectors.append(vec1)
     return False
 
+# ── MinHash + LSH ─────────────────────────────────────────────────────────────
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SHIFT = np.uint64(32)
+
+def shingle_hashes(text: str, size: int = 3) -> np.ndarray:
+    """Sorted unique crc32 hashes of the text's word n-grams (stable across processes)."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < size:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams)))
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    """Exact Jaccard similarity of two sorted unique shingle arrays."""
+    if not len(a) and not len(b):
+        return 1.0
+    inter = len(np.intersect1d(a, b, assume_unique=True))
+    return inter / (len(a) + len(b) - inter)
+
+@lru_cache(maxsize=None)
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Bands and rows per band minimizing the false positive and false negative
+    areas of the LSH S-curve 1 - (1 - s^r)^b around the threshold. Candidates
+    are verified exactly, so a missed duplicate costs more than an extra
+    candidate and false negatives are weighted 4:1.
+    """
+    best, best_err = (1, num_perm), float('inf')
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    for b in range(1, num_perm + 1):
+        for r in range(1, num_perm // b + 1):
+            fp = np.mean(1 - (1 - below ** r) ** b) * threshold
+            fn = np.mean((1 - above ** r) ** b) * (1.0 - threshold)
+            err = 0.2 * fp + 0.8 * fn
+            if err < best_err:
+                best, best_err = (b, r), err
+    return best
+
+class MinHashLSH:
+    """
+    Near-duplicate index over word-shingle sets. Each document gets a MinHash
+    signature split into bands; documents sharing any band bucket become
+    candidates, and candidates are confirmed with exact Jaccard similarity
+    when verify=True. Lookups touch only the matching buckets, not every
+    previously seen document.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3,
+                 seed: int = 1, verify: bool = True):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.verify = verify
+        self.bands, self.rows = _lsh_params(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hashing: random odd 64-bit multipliers, keep the high 32 bits
+        self._a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._shingles: Dict[Hashable, np.ndarray] = {}
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._signatures
+
+    def signature(self, shingles: np.ndarray) -> np.ndarray:
+        if not len(shingles):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        # uint64 products wrap around, which is what multiply-shift relies on
+        with np.errstate(over='ignore'):
+            permuted = (shingles[:, None] * self._a + self._b) >> _SHIFT
+        return permuted.min(axis=0)
+
+    def sketch(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (signature, shingles) of text. Depends only on num_perm, shingle_size
+        and seed, so any index built with the same values (e.g. in a worker
+        process) computes the same sketch.
+        """
+        shingles = shingle_hashes(text, self.shingle_size)
+        return self.signature(shingles), shingles
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        signature = signature.astype(np.uint32, copy=False)
+        r = self.rows
+        return [signature[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def _find(self, shingles: np.ndarray, band_keys: List[bytes]) -> Optional[Tuple[Hashable, float]]:
+        seen = set()
+        for band, key in zip(self._buckets, band_keys):
+            for doc_id in band.get(key, ()):
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if not self.verify:
+                    return doc_id, 1.0
+                score = jaccard(shingles, self._shingles[doc_id])
+                if score >= self.threshold:
+                    return doc_id, score
+        return None
+
+    def query(self, text: str) -> Optional[Tuple[Hashable, float]]:
+        """(doc_id, jaccard) of an indexed near-duplicate of text, or None."""
+        shingles = shingle_hashes(text, self.shingle_size)
+        return self._find(shingles, self._band_keys(self.signature(shingles)))
+
+    def insert(self, doc_id: Hashable, text: str):
+        shingles = shingle_hashes(text, self.shingle_size)
+        self.add(doc_id, self.signature(shingles), shingles)
+
+    def add(self, doc_id: Hashable, signature: np.ndarray, shingles: np.ndarray):
+        """Index a precomputed signature (e.g. one loaded from a DedupStore)."""
+        signature = signature.astype(np.uint32, copy=False)
+        self._signatures[doc_id] = signature
+        self._shingles[doc_id] = shingles if self.verify else np.empty(0, dtype=np.uint64)
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(key, []).append(doc_id)
+
+    def items(self):
+        """(doc_id, signature, shingles) for every indexed document, in insertion order."""
+        for doc_id, signature in self._signatures.items():
+            yield doc_id, signature, self._shingles[doc_id]
+
+    def check_and_add(self, doc_id: Hashable, text: str,
+                      sketch: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Optional[Tuple[Hashable, float]]:
+        """
+        Returns the near-duplicate match for text, or None after indexing it
+        under doc_id (the drop-in replacement for is_near_duplicate).
+        sketch is text's precomputed (signature, shingles), if available.
+        """
+        signature, shingles = sketch if sketch is not None else self.sketch(text)
+        match = self._find(shingles, self._band_keys(signature))
+        if match is None:
+            self.add(doc_id, signature, shingles)
+        return match
+
 def get_image_hash(filepath: str) -> str | None:
     """
     Uses perceptual hashing to find visually similar images.
@@ -49,3 +199,66 @@ def get_image_hash(filepath: str) -> str | None:
             return str(imagehash.phash(img))
     except Exception:
         return None
+
+def get_image_phash(image: Image.Image) -> int:
+    """64-bit perceptual hash of an opened image, as an int for Hamming distance."""
+    return int(str(imagehash.phash(image)), 16)
+
+def get_image_phash_from_bytes(content: bytes) -> Optional[int]:
+    """Perceptual hash of in-memory image bytes (None if they cannot be decoded)."""
+    try:
+        with Image.open(io.BytesIO(content)) as img:
+            return get_image_phash(img)
+    except Exception:
+        return None
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit perceptual hashes. Children are keyed by
+    their Hamming distance to the parent, so by the triangle inequality a
+    radius-r lookup only descends into children keyed d-r..d+r.
+    """
+
+    def __init__(self):
+        # Node: [hash, item, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, hash_value: int, item: Any):
+        self._size += 1
+        if self._root is None:
+            self._root = [hash_value, item, {}]
+            return
+        node = self._root
+        while True:
+            d = hamming_distance(hash_value, node[0])
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [hash_value, item, {}]
+                return
+            node = child
+
+    def find(self, hash_value: int, max_distance: int) -> Optional[Tuple[Any, int]]:
+        """(item, distance) of the closest indexed hash within max_distance, or None."""
+        if self._root is None:
+            return None
+        best = None
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            d = hamming_distance(hash_value, node[0])
+            if d <= max_distance and (best is None or d < best[1]):
+                best = (node[1], d)
+                if d == 0:
+                    break
+            for child_d, child in node[2].items():
+                if d - max_distance <= child_d <= d + max_distance:
+                    stack.append(child)
+        return best
+
@@ -0,0 +1,395 @@
+"""
+Declarative cleaning rule pipeline shared by uploaded text (CleaningEngine)
+and scraped text (clean_text_content).
+
+A pipeline is an ordered list of rule names. Each rule works at one level:
+  text  - rewrites the whole document string (normalizers)
+  line  - maps one line to a new line, or None to drop it (line filters)
+  lines - rewrites the full list of lines (document filters that need context)
+Consecutive line rules are fused into a single pass over the lines, and a
+rule whose can_apply() precheck fails for a document is skipped entirely.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Standalone page numbers: optional whitespace, one or more digits, optional whitespace
+PAGE_NUMBER_RE = re.compile(r'^\s*\d+\s*$')
+BULLET_RE = re.compile(r'^[•\-\*]\s+')
+BULLET_CHARS = '•-*'
+ALNUM_RE = re.compile(r'[a-zA-Z0-9]')
+SPACES_RE = re.compile(r'[ \t]+')
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+NON_WORD_RE = re.compile(r'\W+')
+
+# Leftover HTML entities
+HTML_ENTITY_RE = re.compile(r'&[a-z]{2,8};|&#\d{1,6};', re.IGNORECASE)
+
+# Leftover HTML tags that slipped through
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Per-project overrides live next to the project's data
+CLEANING_RULES_FILE = "cleaning_rules.json"
+
+
+class _NonPrintableTable(dict):
+    """str.translate table that deletes non-printable characters, filled lazily per code point."""
+    def __missing__(self, codepoint: int):
+        value = codepoint if chr(codepoint).isprintable() else None
+        self[codepoint] = value
+        return value
+
+NON_PRINTABLE_TABLE = _NonPrintableTable()
+
+
+# ── Rule types ────────────────────────────────────────────────────────────────
+
+class Rule:
+    name = "rule"
+    level = "text"
+
+    def __init__(self, **context):
+        pass
+
+    def can_apply(self, text: str) -> bool:
+        """Cheap whole-document precheck; False means the rule cannot change this document."""
+        return True
+
+class TextRule(Rule):
+    level = "text"
+
+    def apply(self, text: str) -> str:
+        raise NotImplementedError
+
+class LineRule(Rule):
+    level = "line"
+
+    def apply(self, line: str) -> Optional[str]:
+        raise NotImplementedError
+
+class LinesRule(Rule):
+    level = "lines"
+
+    def apply(self, lines: List[str]) -> List[str]:
+        raise NotImplementedError
+
+
+RULE_REGISTRY: Dict[str, Callable[..., Rule]] = {}
+
+def register_rule(cls):
+    RULE_REGISTRY[cls.name] = cls
+    return cls
+
+
+# ── Normalizers ──────────────────────────────────────────────────────────────
+
+@register_rule
+class NormalizeNewlines(TextRule):
+    name = "normalize_newlines"
+
+    def can_apply(self, text):
+        return '\r' in text
+
+    def apply(self, text):
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+@register_rule
+class StripHtmlTags(TextRule):
+    name = "html_tags"
+
+    def can_apply(self, text):
+        return '<' in text
+
+    def apply(self, text):
+        return HTML_TAG_RE.sub(' ', text)
+
+@register_rule
+class StripHtmlEntities(TextRule):
+    name = "html_entities"
+
+    def can_apply(self, text):
+        return '&' in text
+
+    def apply(self, text):
+        return HTML_ENTITY_RE.sub(' ', text)
+
+@register_rule
+class CollapseSpaces(TextRule):
+    name = "collapse_spaces"
+
+    def can_apply(self, text):
+        return '  ' in text or '\t' in text
+
+    def apply(self, text):
+        return SPACES_RE.sub(' ', text)
+
+@register_rule
+class CollapseBlankLines(TextRule):
+    name = "collapse_blank_lines"
+
+    def can_apply(self, text):
+        return '\n\n\n' in text
+
+    def apply(self, text):
+        return BLANK_LINES_RE.sub('\n\n', text)
+
+@register_rule
+class StripDocument(TextRule):
+    name = "strip"
+
+    def apply(self, text):
+        return text.strip()
+
+
+# ── Line filters ──────────────────────────────────────────────────────────────
+
+@register_rule
+class DropPageNumbers(LineRule):
+    name = "page_numbers"
+
+    def can_apply(self, text):
+        return any(ch.isdigit() for ch in text)
+
+    def apply(self, line):
+        return None if PAGE_NUMBER_RE.match(line) else line
+
+@register_rule
+class StripLines(LineRule):
+    name = "strip_lines"
+
+    def apply(self, line):
+        return line.strip()
+
+@register_rule
+class RemoveNonPrintable(LineRule):
+    name = "non_printable"
+
+    def can_apply(self, text):
+        return not text.replace('\n', '').isprintable()
+
+    def apply(self, line):
+        return line if line.isprintable() else line.translate(NON_PRINTABLE_TABLE)
+
+@register_rule
+class NormalizeBullets(LineRule):
+    name = "bullets"
+
+    def can_apply(self, text):
+        return any(ch in text for ch in BULLET_CHARS)
+
+    def apply(self, line):
+        if line and line[0] in BULLET_CHARS:
+            return BULLET_RE.sub('* ', line, count=1)
+        return line
+
+@register_rule
+class DropNoiseLines(LineRule):
+    """Structural noise and boilerplate phrases, via the project's BoilerplateMatcher."""
+    name = "noise_lines"
+
+    def __init__(self, matcher=None, **context):
+        if matcher is None:
+            from backend.engines.processing.cleaner import DEFAULT_MATCHER
+            matcher = DEFAULT_MATCHER
+        self.matcher = matcher
+
+    def apply(self, line):
+        return line if self.matcher.keep_line(line) else None
+
+
+# ── Document filters ──────────────────────────────────────────────────────────
+
+@register_rule
+class DropRepeatedHeaders(LinesRule):
+    """Short lines (< 10 words) repeated more than 3 times are headers/footers."""
+    name = "repeated_headers"
+
+    def apply(self, lines):
+        line_counts = Counter(stripped for stripped in (l.strip() for l in lines) if stripped)
+        repeated = {line for line, count in line_counts.items() if count > 3 and len(line.split()) < 10}
+        if not repeated:
+            return lines
+        return [line for line in lines if line.strip() not in repeated]
+
+@register_rule
+class MergeShortLines(LinesRule):
+    """
+    Instead of dropping < 3 word lines (which deletes headings), buffer them if
+    they contain alphanumeric content and prepend them to the next valid line.
+    """
+    name = "short_lines"
+
+    def apply(self, lines):
+        merged = []
+        short_line_buffer = []
+        for line in lines:
+            if len(line.split()) < 3:
+                if ALNUM_RE.search(line):
+                    short_line_buffer.append(line)
+                continue
+            if short_line_buffer:
+                line = " ".join(short_line_buffer) + " " + line
+                short_line_buffer = []
+            merged.append(line)
+        if short_line_buffer:
+            if merged:
+                merged[-1] += " " + " ".join(short_line_buffer)
+            else:
+                merged.append(" ".join(short_line_buffer))
+        return merged
+
+@register_rule
+class DedupeParagraphs(LinesRule):
+    """Drop repeated lines (same normalized 80-char key), e.g. headlines collected twice."""
+    name = "dedupe_paragraphs"
+
+    def apply(self, lines):
+        seen = set()
+        result = []
+        for p in lines:
+            key = NON_WORD_RE.sub('', p.lower())[:80]
+            if key not in seen:
+                seen.add(key)
+                result.append(p)
+        return result
+
+
+# ── Pipeline ──────────────────────────────────────────────────────────────────
+
+def _new_profile(rules: Sequence[Rule]) -> Dict[str, Any]:
+    return {
+        "documents": 0,
+        "lines_in": 0,
+        "lines_out": 0,
+        "seconds": 0.0,
+        "rules": {r.name: {"seconds": 0.0, "lines_removed": 0, "skipped": 0} for r in rules},
+    }
+
+def merge_profiles(total: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    for key in ("documents", "lines_in", "lines_out", "seconds"):
+        total[key] = total.get(key, 0) + profile[key]
+    rules = total.setdefault("rules", {})
+    for name, stats in profile["rules"].items():
+        agg = rules.setdefault(name, {"seconds": 0.0, "lines_removed": 0, "skipped": 0})
+        for key, value in stats.items():
+            agg[key] += value
+    return total
+
+class RulePipeline:
+    def __init__(self, rules: Sequence[Rule], joiner: str = '\n'):
+        self.rules = list(rules)
+        self.joiner = joiner
+        # Group consecutive line rules so they share one pass over the lines
+        self._steps: List[Tuple[str, List[Rule]]] = []
+        for rule in self.rules:
+            if rule.level == "line" and self._steps and self._steps[-1][0] == "line":
+                self._steps[-1][1].append(rule)
+            else:
+                self._steps.append((rule.level, [rule]))
+
+    @property
+    def names(self) -> List[str]:
+        return [r.name for r in self.rules]
+
+    def run(self, text: str) -> str:
+        return self.run_with_profile(text, profile=False)[0]
+
+    def run_with_profile(self, text: str, profile: bool = True) -> Tuple[str, Dict[str, Any]]:
+        # Timing is only paid for when profiling; int() is a near-free stand-in clock
+        clock = time.perf_counter if profile else int
+        report = _new_profile(self.rules)
+        stats = report["rules"]
+        started = clock()
+        lines: Optional[List[str]] = None
+
+        for level, rules in self._steps:
+            if level == "text":
+                if lines is not None:
+                    text = self.joiner.join(lines)
+                    report["lines_out"] = len(lines)
+                    lines = None
+                rule = rules[0]
+                if not rule.can_apply(text):
+                    stats[rule.name]["skipped"] += 1
+                    continue
+                t = clock()
+                text = rule.apply(text)
+                stats[rule.name]["seconds"] += clock() - t
+                continue
+
+            if lines is None:
+                lines = text.split('\n')
+                if not report["lines_in"]:
+                    report["lines_in"] = len(lines)
+
+            if level == "lines":
+                rule = rules[0]
+                t = clock()
+                before = len(lines)
+                lines = rule.apply(lines)
+                stats[rule.name]["seconds"] += clock() - t
+                stats[rule.name]["lines_removed"] += before - len(lines)
+                continue
+
+            # Fused pass: every active line rule runs on a line before the next line
+            active = []
+            for rule in rules:
+                if rule.can_apply(text):
+                    active.append((rule.apply, stats[rule.name]))
+                else:
+                    stats[rule.name]["skipped"] += 1
+            if not active:
+                continue
+            kept = []
+            for line in lines:
+                for apply, rule_stats in active:
+                    t = clock()
+                    line = apply(line)
+                    rule_stats["seconds"] += clock() - t
+                    if line is None:
+                        rule_stats["lines_removed"] += 1
+                        break
+                else:
+                    kept.append(line)
+            lines = kept
+
+        if lines is not None:
+            text = self.joiner.join(lines)
+            report["lines_out"] = len(lines)
+        report["documents"] = 1
+        report["seconds"] = clock() - started
+        return text, report
+
+
+def build_pipeline(names: Sequence[str], joiner: str = '\n', **context) -> RulePipeline:
+    unknown = [n for n in names if n not in RULE_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown cleaning rules: {unknown}. Available: {sorted(RULE_REGISTRY)}")
+    return RulePipeline([RULE_REGISTRY[n](**context) for n in names], joiner=joiner)
+
+def load_project_rules(project_dir) -> Dict[str, Any]:
+    """Contents of <project>/cleaning_rules.json, or {} when absent or invalid."""
+    if project_dir is None:
+        return {}
+    rules_path = Path(project_dir) / CLEANING_RULES_FILE
+    if not rules_path.exists():
+        return {}
+    try:
+        rules = json.loads(rules_path.read_text(encoding="utf-8"))
+        return rules if isinstance(rules, dict) else {}
+    except Exception as e:
+        logger.warning(f"Ignoring invalid cleaning rules at {rules_path}: {e}")
+        return {}
+
+def load_rule_names(project_dir, key: str, default: Sequence[str]) -> List[str]:
+    """Rule list for a project: '<key>' replaces the default list, 'disabled_rules' removes entries."""
+    rules = load_project_rules(project_dir)
+    names = list(rules.get(key, default))
+    disabled = set(rules.get("disabled_rules", []))
+    return [n for n in names if n not in disabled]
@@ -0,0 +1,207 @@
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from backend.config import settings
+from backend.models import QA_DEDUP_THRESHOLD
+from backend.engines.embedding_refiner import embedding_refiner
+
+logger = logging.getLogger(__name__)
+
+def qa_question(qa: Dict[str, Any]) -> str:
+    """Question text of a QA pair (prompt output uses "question", older datasets "instruction")."""
+    return str(qa.get("question") or qa.get("instruction") or "")
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = np.arange(n, dtype=np.int64)
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return int(root)
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            # The earliest pair in the dataset becomes the cluster representative
+            if ri < rj:
+                self.parent[rj] = ri
+            else:
+                self.parent[ri] = rj
+
+class QADeduplicator:
+    """
+    Post-generation semantic dedup of QA pairs by question embedding.
+
+    Questions are embedded in batches into an on-disk memmap, then candidate
+    neighbours come from an approximate nearest-neighbour index:
+      numpy  - random-hyperplane LSH: questions sharing a sign-bit bucket in
+               any table are compared exactly with blocked matrix products
+      chroma - a temporary chromadb HNSW collection queried for k neighbours
+    Pairs above the threshold are merged into clusters (union-find) whose
+    first pair is the representative. Memory stays bounded by the block size
+    rather than the dataset size, apart from the JSON records themselves.
+    """
+
+    EMBED_BATCH = 4096
+    BLOCK_SIZE = 2048
+    # Hyperplane LSH sizing: average bucket size and target pair recall at the threshold
+    LSH_BUCKET_SIZE = 256
+    LSH_RECALL = 0.97
+    CHROMA_NEIGHBOURS = 10
+
+    # ── Embedding ─────────────────────────────────────────────────────────────
+    def _embed_to_memmap(self, questions: List[str], path: Path) -> np.memmap:
+        vectors = None
+        for start in range(0, len(questions), self.EMBED_BATCH):
+            batch = embedding_refiner.embed(questions[start:start + self.EMBED_BATCH])
+            if vectors is None:
+                vectors = np.memmap(path, dtype=np.float32, mode="w+", shape=(len(questions), batch.shape[1]))
+            vectors[start:start + len(batch)] = batch
+        vectors.flush()
+        return vectors
+
+    # ── Candidate search ──────────────────────────────────────────────────────
+    def _compare_group(self, vectors: np.ndarray, idx: np.ndarray, threshold: float) -> Iterator[Tuple[int, int, float]]:
+        """Exact pairs within a group of row indices, one BLOCK_SIZE x group product at a time."""
+        idx = np.sort(idx)
+        group = vectors[idx]
+        for start in range(0, len(idx), self.BLOCK_SIZE):
+            sims = group[start:start + self.BLOCK_SIZE] @ group.T
+            rows, cols = np.nonzero(sims >= threshold)
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                i, j = idx[start + r], idx[c]
+                if i < j:
+                    yield int(i), int(j), float(sims[r, c])
+
+    def _lsh_params(self, n: int, threshold: float) -> Tuple[int, int]:
+        """
+        (bits, tables): enough sign bits for ~LSH_BUCKET_SIZE rows per bucket,
+        and enough tables that a pair at the threshold shares at least one
+        bucket with probability LSH_RECALL. A random hyperplane separates two
+        vectors with probability angle / pi.
+        """
+        bits = int(np.clip(np.ceil(np.log2(n / self.LSH_BUCKET_SIZE)), 1, 30))
+        p_table = (1.0 - np.arccos(np.clip(threshold, -1.0, 1.0)) / np.pi) ** bits
+        tables = int(np.ceil(np.log(1.0 - self.LSH_RECALL) / np.log(1.0 - p_table))) if p_table < 1.0 else 1
+        return bits, max(1, tables)
+
+    def _numpy_pairs(self, vectors: np.ndarray, threshold: float, seed: int = 0) -> Iterator[Tuple[int, int, float]]:
+        n, dim = vectors.shape
+        if n <= self.BLOCK_SIZE:
+            yield from self._compare_group(vectors, np.arange(n), threshold)
+            return
+        bits, tables = self._lsh_params(n, threshold)
+        rng = np.random.RandomState(seed)
+        weights = 1 << np.arange(bits, dtype=np.int64)
+        for _ in range(tables):
+            planes = rng.standard_normal((dim, bits)).astype(np.float32)
+            keys = np.empty(n, dtype=np.int64)
+            for start in range(0, n, self.EMBED_BATCH):
+                keys[start:start + self.EMBED_BATCH] = ((vectors[start:start + self.EMBED_BATCH] @ planes) > 0) @ weights
+            order = np.argsort(keys, kind="stable")
+            bounds = np.flatnonzero(np.diff(keys[order])) + 1
+            for group in np.split(order, bounds):
+                if len(group) > 1:
+                    yield from self._compare_group(vectors, group, threshold)
+
+    def _chroma_pairs(self, vectors: np.ndarray, threshold: float, work_dir: Path) -> Iterator[Tuple[int, int, float]]:
+        import chromadb
+        client = chromadb.PersistentClient(path=str(work_dir / "chroma"))
+        collection = client.create_collection("qa_dedup", metadata={"hnsw:space": "cosine"})
+        n = len(vectors)
+        for start in range(0, n, self.EMBED_BATCH):
+            stop = min(start + self.EMBED_BATCH, n)
+            collection.add(ids=[str(i) for i in range(start, stop)], embeddings=vectors[start:stop].tolist())
+        k = min(self.CHROMA_NEIGHBOURS + 1, n)
+        for start in range(0, n, self.EMBED_BATCH):
+            stop = min(start + self.EMBED_BATCH, n)
+            result = collection.query(query_embeddings=vectors[start:stop].tolist(), n_results=k, include=["distances"])
+            for i, (ids, distances) in enumerate(zip(result["ids"], result["distances"]), start=start):
+                for other, distance in zip(ids, distances):
+                    j, sim = int(other), 1.0 - float(distance)
+                    if j != i and sim >= threshold:
+                        yield min(i, j), max(i, j), sim
+
+    def cluster_vectors(self, vectors: np.ndarray, threshold: float = QA_DEDUP_THRESHOLD, index: Optional[str] = None,
+                        work_dir: Optional[Path] = None) -> np.ndarray:
+        """Representative row for every (L2-normalized) vector row, itself when it is unique."""
+        index = index or settings.QA_DEDUP_INDEX
+        if index not in ("numpy", "chroma"):
+            raise ValueError(f"Unsupported QA dedup index: '{index}'. Available: ['numpy', 'chroma']")
+        if index == "chroma":
+            try:
+                import chromadb  # noqa: F401
+            except ImportError:
+                logger.warning("[QA Dedup] chromadb is not installed; using the NumPy index.")
+                index = "numpy"
+
+        clusters = _UnionFind(len(vectors))
+        if index == "chroma":
+            tmp_dir = Path(tempfile.mkdtemp(prefix=".qa_dedup_", dir=work_dir))
+            try:
+                pairs = list(self._chroma_pairs(vectors, threshold, tmp_dir))
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            pairs = self._numpy_pairs(vectors, threshold)
+        for i, j, _ in pairs:
+            clusters.union(i, j)
+        return np.array([clusters.find(i) for i in range(len(vectors))], dtype=np.int64)
+
+    def find_clusters(self, questions: List[str], threshold: float = QA_DEDUP_THRESHOLD,
+                      index: Optional[str] = None, work_dir: Optional[Path] = None) -> np.ndarray:
+        """Representative row for every question, itself when it is unique."""
+        if len(questions) < 2:
+            return np.arange(len(questions), dtype=np.int64)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".qa_dedup_", dir=work_dir))
+        try:
+            vectors = self._embed_to_memmap(questions, tmp_dir / "vectors.f32")
+            roots = self.cluster_vectors(vectors, threshold, index, tmp_dir)
+            del vectors
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return roots
+
+    def deduplicate(self, qa_pairs: List[Dict[str, Any]], threshold: float = QA_DEDUP_THRESHOLD, mode: str = "drop",
+                    index: Optional[str] = None, work_dir: Optional[Path] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        mode="drop" keeps one pair per cluster; mode="cluster" keeps every pair
+        and tags duplicates with "duplicate_cluster" (the representative's index).
+        Returns (qa_pairs, report).
+        """
+        roots = self.find_clusters([qa_question(qa) for qa in qa_pairs], threshold, index, work_dir)
+        result, examples = [], []
+        removed = 0
+        for i, (qa, root) in enumerate(zip(qa_pairs, roots.tolist())):
+            if root == i:
+                result.append(qa)
+                continue
+            removed += 1
+            if len(examples) < 50:
+                examples.append({"question": qa_question(qa), "duplicate_of": qa_question(qa_pairs[root])})
+            if mode == "cluster":
+                result.append({**qa, "duplicate_cluster": root})
+
+        report = {
+            "mode": mode,
+            "threshold": threshold,
+            "index": index or settings.QA_DEDUP_INDEX,
+            "pairs_in": len(qa_pairs),
+            "pairs_out": len(result),
+            "duplicates": removed,
+            "clusters_with_duplicates": len(set(roots[roots != np.arange(len(roots))].tolist())),
+            "examples": examples,
+        }
+        return result, report
+
+qa_deduplicator = QADeduplicator()
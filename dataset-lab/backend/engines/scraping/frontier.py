@@ -0,0 +1,262 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CRAWL_STATE_FILE = "crawl_state.db"
+CRAWL_GRAPH_FILE = "crawl_graph.jsonl"
+
+# Page outcomes that count towards max_pages (and appear in the crawl graph)
+COUNTED_STATUSES = ("scraped", "duplicate", "dropped")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawl (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    priority REAL NOT NULL,
+    depth INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS frontier_pending ON frontier (done, priority);
+CREATE TABLE IF NOT EXISTS pages (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    depth INTEGER NOT NULL,
+    score REAL,
+    status TEXT NOT NULL,
+    -- Saved doc JSON whose text is not in raw.txt yet
+    raw_text_doc TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_unwritten ON pages (raw_text_doc) WHERE raw_text_doc IS NOT NULL;
+"""
+
+class CrawlFrontier:
+    """
+    Per-project crawl state in scraped/crawl_state.db (SQLite): the request
+    and seeds of the last crawl, every URL queued with its best priority,
+    and the outcome of every URL crawled, so an interrupted crawl can resume
+    where it stopped.
+
+    enqueue() and finish() only buffer; snapshot_if_dirty() hands the batch
+    to a writer that commits it in one transaction (the same protocol as
+    DedupStore, so the crawl writes it through its persist() helper). A
+    crash loses at most the last batch, whose pages are simply re-crawled:
+    a URL counts as visited only once its outcome is committed. Each
+    committed batch also appends its counted pages to scraped/crawl_graph.jsonl.
+    Saved documents stay listed until text_written() confirms their text
+    reached raw.txt, committed together with raw.txt's size at that point.
+    A resumed crawl cuts raw.txt back to that size and re-appends the listed
+    documents, so each document's text ends up in raw.txt exactly once.
+    """
+
+    def __init__(self, scraped_dir, flush_interval: float = 5.0):
+        self.path = Path(scraped_dir) / CRAWL_STATE_FILE
+        self.graph_path = Path(scraped_dir) / CRAWL_GRAPH_FILE
+        # A batch is also written once its oldest outcome is this many seconds old
+        self.flush_interval = flush_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Writers run in worker threads, one at a time
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        self._queued: List[Tuple[str, float, int]] = []
+        self._finished: List[Tuple[str, int, Optional[float], str, Optional[str]]] = []
+        self._written: List[str] = []
+        self._raw_txt: Optional[Tuple[int, str]] = None
+        self._since = 0.0
+        # Set once this instance owns the crawl state (begin or restore)
+        self._active = False
+
+    @staticmethod
+    def saved_crawl(scraped_dir) -> Optional[Dict[str, Any]]:
+        """Request, status and progress of the project's last crawl, or None if there is none."""
+        path = Path(scraped_dir) / CRAWL_STATE_FILE
+        if not path.exists():
+            return None
+        conn = sqlite3.connect(path)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM crawl"))
+            if "request" not in meta:
+                return None
+            placeholders = ",".join("?" * len(COUNTED_STATUSES))
+            return {
+                "request": json.loads(meta["request"]),
+                "status": meta.get("status", "running"),
+                "started_at": meta.get("started_at"),
+                "updated_at": meta.get("updated_at"),
+                "pages_done": conn.execute(
+                    f"SELECT COUNT(*) FROM pages WHERE status IN ({placeholders})", COUNTED_STATUSES
+                ).fetchone()[0],
+                "pending_urls": conn.execute("SELECT COUNT(*) FROM frontier WHERE done = 0").fetchone()[0],
+            }
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"Unreadable crawl state at {path}: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def _set(self, **values):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO crawl (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()],
+        )
+
+    def begin(self, request: Dict[str, Any], seeds: List[str], raw_txt: Tuple[int, str]):
+        """
+        Starts a new crawl, replacing any earlier crawl state of the project.
+        raw_txt is the size and fingerprint of raw.txt (TextAppender.mark())
+        before the crawl appends to it.
+        """
+        now = datetime.utcnow().isoformat()
+        with self._lock, self._conn:
+            for table in ("crawl", "frontier", "pages"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._set(request=json.dumps(request), seeds=json.dumps(seeds), status="running",
+                      started_at=now, updated_at=now,
+                      raw_txt_size=raw_txt[0], raw_txt_fingerprint=raw_txt[1])
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, priority, depth) VALUES (?, 0.0, 0)",
+                [(url,) for url in seeds],
+            )
+        self.graph_path.unlink(missing_ok=True)
+        self._queued, self._finished, self._written = [], [], []
+        self._raw_txt = None
+        self._active = True
+
+    def restore(self) -> Dict[str, Any]:
+        """
+        State of the saved crawl: seeds, visited URLs, the number of pages
+        counted so far, the pending frontier as (priority, depth, url) queue
+        items, saved documents whose text is not in raw.txt yet and the size
+        and fingerprint raw.txt had when the others were confirmed written
+        (None for state saved before they were recorded). Marks the crawl as
+        running again.
+        """
+        with self._lock, self._conn:
+            meta = dict(self._conn.execute("SELECT key, value FROM crawl"))
+            visited = {url for (url,) in self._conn.execute("SELECT url FROM frontier WHERE done = 1")}
+            pending = [(priority, depth, url) for url, priority, depth in self._conn.execute(
+                "SELECT url, priority, depth FROM frontier WHERE done = 0 ORDER BY priority"
+            )]
+            placeholders = ",".join("?" * len(COUNTED_STATUSES))
+            pages_done = self._conn.execute(
+                f"SELECT COUNT(*) FROM pages WHERE status IN ({placeholders})", COUNTED_STATUSES
+            ).fetchone()[0]
+            unwritten = [doc for (doc,) in self._conn.execute(
+                "SELECT raw_text_doc FROM pages WHERE raw_text_doc IS NOT NULL ORDER BY seq"
+            )]
+            self._set(status="running", updated_at=datetime.utcnow().isoformat())
+        self._active = True
+        return {
+            "seeds": json.loads(meta.get("seeds", "[]")),
+            "visited": visited,
+            "pending": pending,
+            "pages_done": pages_done,
+            "unwritten_docs": unwritten,
+            "raw_txt_size": int(meta["raw_txt_size"]) if "raw_txt_size" in meta else None,
+            "raw_txt_fingerprint": meta.get("raw_txt_fingerprint"),
+        }
+
+    def enqueue(self, priority: float, depth: int, url: str):
+        self._queued.append((url, priority, depth))
+
+    def finish(self, url: str, depth: int, score: Optional[float], status: str, doc: Optional[str] = None):
+        """
+        Records a crawled URL's outcome, and the doc JSON it was saved as;
+        the URL counts as visited once committed.
+        """
+        if not self._finished:
+            self._since = time.monotonic()
+        self._finished.append((url, depth, score, status, doc))
+
+    def text_written(self, docs: List[str], raw_txt: Tuple[int, str]):
+        """
+        Marks saved documents whose text is now flushed to raw.txt, with the
+        size and fingerprint raw.txt has after them (committed with the next batch).
+        """
+        self._written.extend(docs)
+        self._raw_txt = raw_txt
+
+    def snapshot_if_dirty(self, every: int = 1) -> Optional[Callable[[], None]]:
+        """
+        Takes the buffered changes and returns a function that commits them,
+        so the write can run in a thread while the crawl goes on. None when
+        fewer than `every` URLs finished since the last batch and the oldest
+        of them is not yet flush_interval seconds old.
+        """
+        if len(self._finished) >= every or (self._finished and time.monotonic() - self._since >= self.flush_interval):
+            return self.snapshot()
+        return None
+
+    def _take(self):
+        batch = (self._queued, self._finished, self._written, self._raw_txt)
+        self._queued, self._finished, self._written, self._raw_txt = [], [], [], None
+        return batch
+
+    def snapshot(self) -> Callable[[], None]:
+        batch = self._take()
+        return lambda: self._write(*batch)
+
+    def _write(self, queued, finished, written, raw_txt, status: Optional[str] = None):
+        with self._lock:
+            with self._conn:
+                # A URL found again keeps its best (lowest) priority until crawled
+                self._conn.executemany(
+                    "INSERT INTO frontier (url, priority, depth) VALUES (?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET priority = excluded.priority, depth = excluded.depth "
+                    "WHERE frontier.done = 0 AND excluded.priority < frontier.priority",
+                    queued,
+                )
+                self._conn.executemany(
+                    "INSERT INTO frontier (url, priority, depth, done) VALUES (?, 0.0, ?, 1) "
+                    "ON CONFLICT(url) DO UPDATE SET done = 1",
+                    [(url, depth) for url, depth, _, _, _ in finished],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pages (url, depth, score, status, raw_text_doc) VALUES (?, ?, ?, ?, ?)",
+                    finished,
+                )
+                self._conn.executemany(
+                    "UPDATE pages SET raw_text_doc = NULL WHERE raw_text_doc = ?",
+                    [(doc,) for doc in written],
+                )
+                values = {"updated_at": datetime.utcnow().isoformat()}
+                if raw_txt is not None:
+                    values["raw_txt_size"], values["raw_txt_fingerprint"] = raw_txt
+                if status is not None:
+                    values["status"] = status
+                self._set(**values)
+            # Appended after the commit: a crash in between can lose graph lines, never duplicate them
+            edges = [
+                json.dumps({"url": url, "depth": depth, "score": score, "status": page_status})
+                for url, depth, score, page_status, _ in finished if page_status in COUNTED_STATUSES
+            ]
+            if edges:
+                with open(self.graph_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(edges) + "\n")
+
+    def close(self, status: str):
+        """
+        Commits what is still buffered, records the crawl's final status and
+        closes the database. Only the status of a crawl this instance began
+        or restored is touched.
+        """
+        batch = self._take()
+        try:
+            if self._active:
+                self._write(*batch, status=status)
+        finally:
+            with self._lock:
+                self._conn.close()
@@ -0,0 +1,221 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Response headers kept with a cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Expires")
+# Only text-like bodies are gzipped; images are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/xhtml", "application/xml", "application/json", "image/svg")
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+def freshness_deadline(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """
+    When a response stops being fresh: max-age (less Age), else Expires,
+    else `now`, i.e. revalidate on every use. None for no-store.
+    """
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return now
+    if directives.get("max-age"):
+        try:
+            age = float(headers.get("Age") or 0)
+            return now + float(directives["max-age"]) - age
+        except ValueError:
+            return now
+    expires = _http_date(headers.get("Expires"))
+    if expires is not None:
+        # Relative to the origin's clock
+        date = _http_date(headers.get("Date")) or now
+        return now + (expires - date)
+    return now
+
+class CacheEntry:
+    def __init__(self, key: str, meta: Dict[str, Any]):
+        self.key = key
+        self.meta = meta
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.meta["fresh_until"]
+
+    @property
+    def content_type(self) -> str:
+        return self.meta["headers"].get("Content-Type", "").lower()
+
+    @property
+    def charset(self) -> str:
+        return self.meta.get("charset") or "utf-8"
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers; empty when the entry cannot be revalidated."""
+        headers = {}
+        if self.meta["headers"].get("ETag"):
+            headers["If-None-Match"] = self.meta["headers"]["ETag"]
+        if self.meta["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = self.meta["headers"]["Last-Modified"]
+        return headers
+
+class HttpCache:
+    """
+    On-disk cache of scraped responses, keyed by URL.
+
+    Layout under <root>/<key[:2]>/:
+      <key>.body  response body (gzipped for text-like content types)
+      <key>.json  URL, stored headers, resolved charset and freshness deadline
+
+    Fresh entries (Cache-Control max-age / Expires) are served without a
+    request; stale ones are revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a 304 instead of its body.
+    The body is written before its metadata, so a crash never leaves an
+    entry pointing at a partial body.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.stats = {"hits": 0, "not_modified": 0, "misses": 0, "bytes_saved": 0}
+
+    def _paths(self, key: str):
+        base = self.root / key[:2] / key
+        return base.with_suffix(".json"), base.with_suffix(".body")
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _replace(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not body_path.exists():
+            return None
+        return CacheEntry(key, meta)
+
+    def _read_body(self, entry: CacheEntry) -> bytes:
+        with open(self._paths(entry.key)[1], "rb") as f:
+            data = f.read()
+        return gzip.decompress(data) if entry.meta.get("gzip") else data
+
+    def _discard(self, entry: CacheEntry):
+        # Metadata first: without it the entry is not found, whatever happens to the body
+        for path in self._paths(entry.key):
+            path.unlink(missing_ok=True)
+
+    async def read(self, entry: CacheEntry, not_modified: bool = False) -> Optional[bytes]:
+        """
+        Body of a fresh entry (a hit) or one the server just confirmed with a
+        304. None when the stored body is unreadable; the entry is deleted.
+        """
+        try:
+            body = await asyncio.to_thread(self._read_body, entry)
+        except (OSError, EOFError, gzip.BadGzipFile, zlib.error) as e:
+            logger.warning(f"Dropping unreadable cache entry for {entry.meta.get('url')}: {e}")
+            try:
+                await asyncio.to_thread(self._discard, entry)
+            except OSError as discard_error:
+                logger.warning(f"Could not delete cache entry for {entry.meta.get('url')}: {discard_error}")
+            return None
+        self.stats["not_modified" if not_modified else "hits"] += 1
+        self.stats["bytes_saved"] += len(body)
+        return body
+
+    def _write(self, url: str, headers: Mapping[str, str], charset: Optional[str], body: Optional[bytes],
+               body_file: Optional[str]) -> bool:
+        now = time.time()
+        fresh_until = freshness_deadline(headers, now)
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        if fresh_until is None:
+            # no-store: also forget an older copy
+            meta_path.unlink(missing_ok=True)
+            return False
+        stored = {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        compress = stored.get("Content-Type", "").lower().startswith(COMPRESSIBLE_TYPES)
+        if body is None:
+            with open(body_file, "rb") as f:
+                body = f.read()
+        self._replace(body_path, gzip.compress(body, compresslevel=6) if compress else body)
+        meta = {"url": url, "headers": stored, "charset": charset, "gzip": compress,
+                "stored_at": now, "fresh_until": fresh_until}
+        self._replace(meta_path, json.dumps(meta).encode("utf-8"))
+        return True
+
+    async def store(self, url: str, headers: Mapping[str, str], body: Optional[bytes] = None,
+                    charset: Optional[str] = None, body_file: Optional[str] = None):
+        """Caches a full 200 response (body in memory or already on disk), counted as a miss."""
+        self.stats["misses"] += 1
+        try:
+            await asyncio.to_thread(self._write, url, headers, charset, body, body_file)
+        except OSError as e:
+            logger.warning(f"Could not cache response for {url}: {e}")
+
+    def _refresh(self, entry: CacheEntry, headers: Mapping[str, str]):
+        # A 304 carries updated validators and freshness for the stored body
+        merged = {**entry.meta["headers"], **{name: headers[name] for name in STORED_HEADERS
+                                              if name != "Content-Type" and headers.get(name)}}
+        now = time.time()
+        fresh_until = freshness_deadline(merged, now)
+        meta = {**entry.meta, "headers": merged, "stored_at": now,
+                "fresh_until": now if fresh_until is None else fresh_until}
+        self._replace(self._paths(entry.key)[0], json.dumps(meta).encode("utf-8"))
+        entry.meta = meta
+
+    async def revalidated(self, entry: CacheEntry, headers: Mapping[str, str]) -> Optional[bytes]:
+        """Handles a 304 for entry: refreshes its metadata and returns the stored body."""
+        try:
+            await asyncio.to_thread(self._refresh, entry, headers)
+        except OSError as e:
+            logger.warning(f"Could not refresh cache entry for {entry.meta.get('url')}: {e}")
+        return await self.read(entry, not_modified=True)
+
+def open_http_cache(project_path: Path) -> Optional[HttpCache]:
+    """HTTP cache for a project's scrapes according to SCRAPER_HTTP_CACHE (project, global or off)."""
+    scope = settings.SCRAPER_HTTP_CACHE
+    if scope == "project":
+        return HttpCache(Path(project_path) / "scraped" / "http_cache")
+    if scope == "global":
+        return HttpCache(settings.CACHE_DIR / "http")
+    return None
@@ -1,12 +1,20 @@
 import aiohttp
+import asyncio
 import os
 import aiofiles
 import mimetypes
 import logging
-import ssl
-from bs4 import BeautifulSoup
+from lxml.html import HtmlElement
 from urllib.parse import urljoin, urlparse
 import io
+import tempfile
+from typing import AsyncIterator
+
+from backend.engines.processing.dedup_store import ImageHashIndex
+from backend.engines.processing.deduplicator import get_image_phash
+from backend.engines.scraping.http_cache import HttpCache
+from backend.engines.scraping.http_client import SCRAPER_SSL_CONTEXT
+from backend.engines.scraping.text_scraper import node_text, parse_html
 
 try:
     from PIL import Image
@@ -17,6 +25,10 @@ logger = logging.getLogger(__name__)
 
 ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
 MIN_IMAGE_SIZE = (150, 150)
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+STREAM_CHUNK_SIZE = 64 * 1024
+# Leading bytes kept for the early type / dimension check; larger headers are checked after download
+HEADER_SNIFF_BYTES = 64 * 1024
 
 def is_valid_image_url(url: str) -> bool:
     if url.startswith('data:image'):
@@ -29,14 +41,17 @@ def is_valid_image_url(url: str) -> bool:
         return False
     return True
 
-def extract_image_urls(html_content: str, base_url: str) -> list[dict]:
+def extract_image_urls(page: str | HtmlElement, base_url: str) -> list[dict]:
     """
     Extracts images and their surrounding context (alt text, parent text).
+    page is raw HTML or the tree from parse_html.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
+    tree = parse_html(page) if isinstance(page, str) else page
+    if tree is None:
+        return []
     images = []
     
-    for img in soup.find_all('img'):
+    for img in tree.iter('img'):
         src = img.get('src')
         if not src:
             continue
@@ -50,7 +65,8 @@ def extract_image_urls(html_content: str, base_url: str) -> list[dict]:
         filename = os.path.basename(urlparse(full_url).path)
         
         # Try to find a caption or surrounding text
-        parent_text = img.parent.get_text(separator=" ", strip=True)[:200]
+        parent = img.getparent()
+        parent_text = node_text(parent, " ")[:200] if parent is not None else ""
         
         # Heuristic Context Construction string
         context_parts = []
@@ -77,7 +93,96 @@ def extract_image_urls(html_content: str, base_url: str) -> list[dict]:
         
     return images
 
-async def download_image(url: str, save_dir: str, session: aiohttp.ClientSession) -> str | None:
+def sniff_image_type(head: bytes, content_type: str) -> str | None:
+    """Image type from the Content-Type header, else from the magic number in the first bytes."""
+    if "image/" in content_type:
+        return content_type.split("/")[-1].split(";")[0]
+    # Fallback standard magic numbers if headers lie (like imghdr used to do)
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'GIF87a') or head.startswith(b'GIF89a'):
+        return 'gif'
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+def is_allowed_image_type(img_type: str | None) -> bool:
+    return bool(img_type) and (img_type in ALLOWED_EXTENSIONS or img_type in ['jpeg', 'jpg', 'png', 'webp', 'avif', 'gif', 'svg'])
+
+def read_image_size(head: bytes) -> tuple[int, int] | None:
+    """Dimensions parsed from the leading bytes only (PIL reads headers lazily), or None if not there yet."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(head)) as img:
+            return img.size
+    except Exception:
+        return None
+
+def is_too_small(size: tuple[int, int]) -> bool:
+    return size[0] < MIN_IMAGE_SIZE[0] or size[1] < MIN_IMAGE_SIZE[1]
+
+def _inspect_image_file(path: str, with_hash: bool) -> tuple[tuple[int, int], int | None]:
+    """(dimensions, perceptual hash or None) of a downloaded image file; decodes pixels only for the hash."""
+    with Image.open(path) as img:
+        return img.size, (get_image_phash(img) if with_hash else None)
+
+async def _iter_bytes(data: bytes) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), STREAM_CHUNK_SIZE):
+        yield data[start:start + STREAM_CHUNK_SIZE]
+
+async def _stream_image(chunks: AsyncIterator[bytes], content_type: str, path: str,
+                        max_bytes: int, url: str) -> str | None:
+    """
+    Writes chunks to path, checking type and dimensions from the leading
+    bytes as they arrive. Returns the image type, or None as soon as the
+    body is rejected (the caller then abandons the transfer).
+    """
+    img_type = None
+    size = None
+    head = b""
+    received = 0
+    async with aiofiles.open(path, 'wb') as f:
+        async for chunk in chunks:
+            received += len(chunk)
+            if received > max_bytes:
+                logger.debug(f"Aborting image over {max_bytes} bytes: {url}")
+                return None
+            if size is None and len(head) < HEADER_SNIFF_BYTES:
+                head += chunk
+                if img_type is None and ("image/" in content_type or len(head) >= 12):
+                    img_type = sniff_image_type(head, content_type)
+                    if not is_allowed_image_type(img_type):
+                        logger.debug(f"Skipping invalid image type: {img_type} for {url}")
+                        return None
+                size = read_image_size(head)
+                if size is not None and is_too_small(size):
+                    logger.debug(f"Skipping small object ({size[0]}x{size[1]}): {url}")
+                    return None
+            await f.write(chunk)
+
+    # Bodies shorter than a magic number
+    if img_type is None:
+        img_type = sniff_image_type(head, content_type)
+    if not is_allowed_image_type(img_type):
+        logger.debug(f"Skipping invalid image type: {img_type} for {url}")
+        return None
+    return img_type
+
+async def download_image(url: str, save_dir: str, session: aiohttp.ClientSession,
+                         image_index: ImageHashIndex | None = None,
+                         max_bytes: int = MAX_IMAGE_BYTES,
+                         cache: HttpCache | None = None) -> str | None:
+    """
+    Streams an image to disk and returns its saved path, or None when it is
+    invalid, too small, larger than max_bytes, or (with image_index)
+    perceptually identical to a stored image. Type and dimensions are read
+    from the first bytes, so rejected images are abandoned mid-transfer.
+    With a cache, fresh copies skip the request and stale ones are revalidated.
+    """
+    tmp_path = None
     try:
         os.makedirs(save_dir, exist_ok=True)
         filename = os.path.basename(urlparse(url).path)
@@ -91,57 +196,77 @@ async def download_image(url: str, save_dir: str, session: aiohttp.ClientSession
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
             "Connection": "keep-alive"
         }
-        
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        async with session.get(url, headers=headers, timeout=15, ssl=ssl_context) as response:
-            if response.status == 200:
-                # Need to read content and verify headers
-                content = await response.read()
-                
-                # Determine image type
-                content_type = response.headers.get("Content-Type", "").lower()
-                img_type = None
-
-                if "image/" in content_type:
-                    img_type = content_type.split("/")[-1].split(";")[0]
+
+        # Unique temp name: concurrent downloads may share a filename
+        fd, tmp_path = tempfile.mkstemp(dir=save_dir, prefix=".", suffix=".part")
+        os.close(fd)
+
+        cached = cache.lookup(url) if cache is not None else None
+        body = None
+        if cached is not None and cached.fresh:
+            body = await cache.read(cached)
+            if body is None:
+                # Unreadable and deleted: download the image in full
+                cached = None
+        response_headers = None
+        if body is None:
+            if cached is not None:
+                headers.update(cached.validators())
+            async with session.get(url, headers=headers, timeout=15, ssl=SCRAPER_SSL_CONTEXT) as response:
+                if response.status == 304 and cached is not None:
+                    body = await cache.revalidated(cached, response.headers)
+                    if body is None:
+                        return None
+                elif response.status != 200:
+                    return None
                 else:
-                    # Fallback standard magic numbers if headers lie (like imghdr used to do)
-                    if content.startswith(b'\xff\xd8\xff'):
-                        img_type = 'jpeg'
-                    elif content.startswith(b'\x89PNG\r\n\x1a\n'):
-                        img_type = 'png'
-                    elif content.startswith(b'GIF87a') or content.startswith(b'GIF89a'):
-                        img_type = 'gif'
-                    elif content.startswith(b'RIFF') and content[8:12] == b'WEBP':
-                        img_type = 'webp'
-                    
-                if not img_type or (img_type not in ALLOWED_EXTENSIONS and img_type not in ['jpeg', 'jpg', 'png', 'webp', 'avif', 'gif', 'svg']):
-                    logger.debug(f"Skipping invalid image type: {img_type} for {url}")
+                    if response.content_length is not None and response.content_length > max_bytes:
+                        logger.debug(f"Skipping oversized image ({response.content_length} bytes): {url}")
+                        return None
+                    content_type = response.headers.get("Content-Type", "").lower()
+                    img_type = await _stream_image(response.content.iter_chunked(STREAM_CHUNK_SIZE),
+                                                   content_type, tmp_path, max_bytes, url)
+                    response_headers = response.headers
+        if body is not None:
+            img_type = await _stream_image(_iter_bytes(body), cached.content_type, tmp_path, max_bytes, url)
+        if img_type is None:
+            return None
+        if response_headers is not None and cache is not None:
+            # Cached once fully downloaded and of a valid type, so a re-crawl revalidates it
+            await cache.store(url, response_headers, body_file=tmp_path)
+
+        # Strict 150x150 dimension check using PIL (pillow), for headers beyond the sniffed bytes
+        image_hash = None
+        if Image:
+            try:
+                # Off the event loop: the perceptual hash decodes pixels
+                size, image_hash = await asyncio.to_thread(_inspect_image_file, tmp_path, image_index is not None)
+                if is_too_small(size):
+                    logger.debug(f"Skipping small object ({size[0]}x{size[1]}): {url}")
                     return None
-                    
-                # Strict 150x150 dimension check using PIL (pillow)
-                if Image:
-                    try:
-                        pil_img = Image.open(io.BytesIO(content))
-                        if pil_img.width < MIN_IMAGE_SIZE[0] or pil_img.height < MIN_IMAGE_SIZE[1]:
-                            logger.debug(f"Skipping small object ({pil_img.width}x{pil_img.height}): {url}")
-                            return None
-                    except Exception as e:
-                        logger.debug(f"Failed to read image dimensions for {url}: {e}")
-                
-                # If the filename didn't have an extension, add it
-                if not os.path.splitext(save_path)[1]:
-                    save_path += f".{img_type}"
-                    
-                async with aiofiles.open(save_path, 'wb') as f:
-                    await f.write(content)
-                    
-                return save_path
-            else:
+            except Exception as e:
+                logger.debug(f"Failed to read image dimensions for {url}: {e}")
+        
+        # If the filename didn't have an extension, add it
+        if not os.path.splitext(save_path)[1]:
+            save_path += f".{img_type}"
+
+        if image_hash is not None:
+            match = image_index.check(image_hash)
+            if match is not None:
+                logger.debug(f"Skipping near-identical image of {match[0]} (distance {match[1]}): {url}")
                 return None
+            
+        os.replace(tmp_path, save_path)
+        tmp_path = None
+        if image_hash is not None:
+            # Indexed only once the file exists. There is no await between the check and
+            # here, so concurrent downloads of the same image still see this one
+            image_index.add(image_hash, os.path.basename(save_path))
+        return save_path
     except Exception as e:
         logger.error(f"Error downloading image {url}: {e}")
         return None
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
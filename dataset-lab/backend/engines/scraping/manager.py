@@ -4,26 +4,36 @@ import logging
 import os
 import json
 import aiohttp
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from ddgs import DDGS
 from urllib.parse import urlparse
 
 from backend.utils.security import is_safe_url
-from backend.engines.scraping.text_scraper import fetch_html, extract_article, extract_links, compute_relevance_score
-from backend.engines.scraping.image_scraper import extract_image_urls, download_image
-from backend.engines.processing.cleaner import clean_text_content, sanitize_url
-from backend.engines.processing.deduplicator import get_text_hash, is_near_duplicate
+from backend.engines.scraping.text_scraper import fetch_html, EXTRACTION_TIERS
+from backend.engines.scraping.image_scraper import download_image, MAX_IMAGE_BYTES
+from backend.engines.scraping.politeness import HostLimiter
+from backend.engines.scraping.http_client import http_client, new_connection_stats, track_connections
+from backend.engines.scraping.http_cache import open_http_cache
+from backend.engines.scraping.page_worker import page_worker_pool
+from backend.engines.scraping.frontier import CrawlFrontier
+from backend.engines.processing.cleaner import sanitize_url, load_scrape_pipeline
+from backend.engines.processing.rules import merge_profiles
+from backend.engines.processing.deduplicator import get_text_hash
+from backend.engines.processing.dedup_store import DedupStore, ImageHashIndex
 from backend.engines.labeling.auto_labeler import auto_label_content
 from backend.engines.scraping.refinement import refine_text_with_llm
-from backend.utils.filesystem import save_raw_text, get_project_path
+from backend.utils.filesystem import save_raw_text, get_project_path, TextAppender
+from backend.config import settings
 
 logger = logging.getLogger(__name__)
 
 # State of all scraping jobs
 # Key: task_id, Value: status details
 active_scraping_jobs: Dict[str, Dict[str, Any]] = {}
+# Projects with a crawl task alive, from start_job until its final saves are done
+crawling_projects: Set[str] = set()
 
 class LLMConfig(BaseModel):
     provider: str = 'local'
@@ -40,8 +50,19 @@ class ScrapeRequest(BaseModel):
     max_pages: int = 50
     domain_restricted: bool = True
     relevance_threshold: float = 0.0
+    # Word-shingle Jaccard similarity above which a page counts as a near-duplicate
+    near_duplicate_threshold: float = Field(0.8, gt=0.0, le=1.0)
+    # Perceptual-hash Hamming distance (of 64 bits) within which images count as duplicates
+    image_duplicate_distance: int = Field(6, ge=0, le=32)
     extract_images: bool = True
     extract_text: bool = True
+    # Crawl workers (and global in-flight page requests), plus per-host politeness limits
+    concurrency: int = Field(8, ge=1, le=64)
+    per_host_concurrency: int = Field(2, ge=1, le=16)
+    per_host_delay: float = Field(1.0, ge=0.0, le=60.0)
+    # Concurrent image downloads, and the size above which a download is abandoned
+    image_concurrency: int = Field(8, ge=1, le=64)
+    max_image_bytes: int = Field(MAX_IMAGE_BYTES, ge=1024)
 
 class RefineRequest(BaseModel):
     project_name: str
@@ -60,12 +81,40 @@ def search_query_urls(query: str, max_results: int = 3) -> List[str]:
         logger.error(f"Failed to search web for query '{query}': {e}")
     return urls
 
-async def process_scrape_task(task_id: str, request: ScrapeRequest):
+def read_doc_texts(text_dir: str, docs: List[str]) -> str:
+    """raw.txt entries for saved documents, e.g. those an interrupted crawl never appended."""
+    parts = []
+    for doc in docs:
+        try:
+            with open(os.path.join(text_dir, f"{doc}.json"), "r", encoding="utf-8") as f:
+                article = json.load(f)
+        except (OSError, ValueError):
+            continue
+        parts.append(f"{article.get('title', '')}\n\n{article.get('cleaned_text', '')}\n\n========================\n\n")
+    return "".join(parts)
+
+async def process_scrape_task(task_id: str, request: ScrapeRequest, resume: bool = False):
     """
-    Background worker function that runs the scraping pipeline.
+    Background worker function that runs the scraping pipeline. With resume,
+    continues the project's saved crawl (see CrawlFrontier) instead of
+    starting from the request's seeds. The project counts as crawling until
+    this returns, i.e. until the crawl state and indexes are saved.
     """
+    try:
+        await _run_scrape_task(task_id, request, resume)
+    except Exception as e:
+        job_state = active_scraping_jobs[task_id]
+        job_state["status"] = "failed"
+        job_state["error"] = str(e)
+        job_state["logs"].append(f"Error: {e}")
+        logger.error(f"Scrape task {task_id} failed: {e}")
+    finally:
+        crawling_projects.discard(request.project_name)
+
+async def _run_scrape_task(task_id: str, request: ScrapeRequest, resume: bool):
     job_state = active_scraping_jobs[task_id]
     job_state["status"] = "running"
+    track_connections(job_state.setdefault("connection_stats", new_connection_stats()))
     
     # Ensure dataset dirs exist inside the correct global project directory
     project_dir = str(get_project_path(request.project_name))
@@ -75,31 +124,46 @@ async def process_scrape_task(task_id: str, request: ScrapeRequest):
     
     os.makedirs(text_dir, exist_ok=True)
     os.makedirs(image_dir, exist_ok=True)
-
-    seen_hashes = set()
-    # Pre-populate hashes to avoid duplicate writes if scraper is run multiple times
-    # NOTE: To deduplicate properly, we simply assume filenames like `doc_<TEXT_HASH>.json`
-    # However, since previous implementation used `doc_<text_hash[:8]}.json`, we will track what we have saved
-    # by parsing the file contents OR relaxing the check. For the easiest fix: We will track the full text hash
-    # of any files saved during THIS RUN, and for old files, we assume the prefix is enough to block it.
-    
-    seen_hash_prefixes = set()
-    for f in os.listdir(text_dir):
-        if f.endswith('.json') and f.startswith('doc_'):
-             # e.g., doc_abcd1234.json -> abcd1234
-            seen_hash_prefixes.add(f.replace('doc_', '').replace('.json', ''))
+    cleaning_pipeline = load_scrape_pipeline(project_dir)
+    cleaning_profile = {}
+    extraction_tiers = job_state.setdefault("extraction_tiers", {tier: {"pages": 0, "ms": 0.0} for tier in EXTRACTION_TIERS})
+
+    # Exact hashes + near-duplicate sketches of everything this project has already scraped
+    dedup_store = await asyncio.to_thread(DedupStore.load, scraped_dir, request.near_duplicate_threshold)
+    if len(dedup_store):
+        job_state["logs"].append(f"Loaded dedup index with {len(dedup_store)} known documents.")
+    image_index = await asyncio.to_thread(ImageHashIndex.load, scraped_dir, request.image_duplicate_distance)
+    # Responses from earlier crawls, revalidated instead of re-downloaded
+    http_cache = open_http_cache(get_project_path(request.project_name))
+    if http_cache is not None:
+        job_state["http_cache"] = http_cache.stats
+    # Frontier, visited URLs and per-URL outcomes, persisted so the crawl can be resumed
+    frontier = await asyncio.to_thread(CrawlFrontier, scraped_dir, settings.SCRAPER_STREAM_FLUSH_SECONDS)
+    # Accepted documents stream into raw.txt; raw_txt_docs are the buffered ones not on disk yet
+    raw_txt = TextAppender(get_project_path(request.project_name) / "raw.txt", settings.SCRAPER_STREAM_FLUSH_SECONDS)
+    raw_txt_docs: List[str] = []
+    # Final status, published only once everything is saved; None if the task itself is interrupted
+    outcome = None
 
     try:
-        urls_to_scrape = [sanitize_url(u) for u in request.urls if is_safe_url(u)]
+        saved = None
+        if resume:
+            saved = await asyncio.to_thread(frontier.restore)
+            urls_to_scrape = saved["seeds"]
+            job_state["logs"].append(
+                f"Resuming crawl: {len(saved['visited'])} URLs already crawled, {len(saved['pending'])} still queued."
+            )
+        else:
+            urls_to_scrape = [sanitize_url(u) for u in request.urls if is_safe_url(u)]
         
         # If query or category, use search integrations
-        if request.query:
+        if request.query and not resume:
             job_state["logs"].append(f"Searching web for: {request.query}")
             search_urls = await asyncio.to_thread(search_query_urls, request.query, 3)
             urls_to_scrape.extend(search_urls)
             job_state["logs"].append(f"Found {len(search_urls)} links from search.")
             
-        if request.category:
+        if request.category and not resume:
             job_state["logs"].append(f"Searching web for category: {request.category}")
             search_urls = await asyncio.to_thread(search_query_urls, request.category + " articles", 3)
             urls_to_scrape.extend(search_urls)
@@ -109,7 +173,7 @@ async def process_scrape_task(task_id: str, request: ScrapeRequest):
         urls_to_scrape = list(dict.fromkeys(urls_to_scrape))
         
         if len(urls_to_scrape) == 0:
-            job_state["status"] = "completed"
+            outcome = "completed"
             job_state["logs"].append("No valid URLs found to scrape.")
             return
 
@@ -130,150 +194,284 @@ async def process_scrape_task(task_id: str, request: ScrapeRequest):
         # Initialize Priority Queue: items are (priority, depth, url)
         # We use negative score because PriorityQueue extracts lowest first
         queue = asyncio.PriorityQueue()
-        for u in urls_to_scrape:
-            queue.put_nowait((0.0, 0, u))
-            
-        visited_urls = set()
-        seen_vectors = []
-        crawl_graph = []
-        combined_run_text = ""
-        downloaded_pages = 0
-
-        async with aiohttp.ClientSession() as session:
-            while not queue.empty() and downloaded_pages < request.max_pages:
+        if saved is not None:
+            for item in saved["pending"]:
+                queue.put_nowait(item)
+            visited_urls = saved["visited"]
+            downloaded_pages = saved["pages_done"]
+            # Text appended after the last confirmed write belongs to documents that are
+            # re-appended below or to pages that are re-crawled, so it is dropped first
+            if saved["raw_txt_size"] is not None:
+                dropped = await asyncio.to_thread(raw_txt.truncate, saved["raw_txt_size"], saved["raw_txt_fingerprint"])
+                if dropped is None:
+                    job_state["logs"].append("raw.txt was replaced since the crawl was saved; appending to it as is.")
+                elif dropped:
+                    job_state["logs"].append(f"Dropped {dropped} bytes of raw.txt written after the last saved crawl state.")
+            # Text of documents the interrupted run saved but never confirmed in raw.txt
+            if saved["unwritten_docs"]:
+                raw_txt.append(await asyncio.to_thread(read_doc_texts, text_dir, saved["unwritten_docs"]))
+                raw_txt_docs.extend(saved["unwritten_docs"])
+        else:
+            raw_txt_mark = await asyncio.to_thread(raw_txt.mark)
+            await asyncio.to_thread(frontier.begin, request.model_dump(), urls_to_scrape, raw_txt_mark)
+            for u in urls_to_scrape:
+                queue.put_nowait((0.0, 0, u))
+            visited_urls = set()
+            downloaded_pages = 0
+        # Pages being processed right now; they may still count towards max_pages
+        in_flight = 0
+        capacity = asyncio.Condition()
+        limiter = HostLimiter(request.concurrency, request.per_host_concurrency, request.per_host_delay)
+        persist_lock = asyncio.Lock()
+        # Image downloads in flight across all crawl workers
+        image_slots = asyncio.Semaphore(request.image_concurrency)
+
+        async def persist(store, every: int):
+            # Snapshot on the event loop, write in a thread; the lock keeps snapshots in order
+            writer = store.snapshot_if_dirty(every)
+            if writer is not None:
+                # Crawl outcomes are committed ahead of any index: a resumed crawl must not
+                # re-crawl a page the dedup index knows and drop it as a duplicate of itself
+                writers = [writer] if store is frontier else [frontier.snapshot(), writer]
+                async with persist_lock:
+                    try:
+                        for write in writers:
+                            await asyncio.to_thread(write)
+                    except Exception as e:
+                        # A failed index write keeps its changes pending for the next batch or the final save
+                        job_state["logs"].append(f"Failed to persist crawl state: {e}")
+                        logger.warning(f"Scrape task {task_id} could not persist crawl state: {e}")
+
+        async def persist_raw_txt(every: int):
+            writer = raw_txt.snapshot_if_dirty(every)
+            if writer is not None:
+                docs = raw_txt_docs[:]
+                raw_txt_docs.clear()
+                async with persist_lock:
+                    try:
+                        await asyncio.to_thread(writer)
+                    except Exception as e:
+                        # Left unconfirmed, so a resumed crawl cuts raw.txt back and re-appends them
+                        job_state["logs"].append(f"Failed to append to raw.txt: {e}")
+                        logger.warning(f"Scrape task {task_id} could not append to raw.txt: {e}")
+                        return
+                    # Only text that reached the disk is recorded as written, with the size it ends at
+                    frontier.text_written(docs, await asyncio.to_thread(raw_txt.mark))
+                    await asyncio.to_thread(frontier.snapshot())
+
+        async def fetch_image(session: aiohttp.ClientSession, img: dict):
+            async with image_slots:
                 if job_state.get("is_cancelled", False):
-                    job_state["status"] = "cancelled"
-                    break
-                    
-                score_inv, depth, url = await queue.get()
-                
-                if url in visited_urls:
-                    continue
-                visited_urls.add(url)
-                
-                job_state["current_url"] = url
-                job_state["progress"] = min((downloaded_pages / max(1, request.max_pages)) * 100, 99.0)
-                job_state["total_urls"] = len(visited_urls) + queue.qsize()
-                
-                job_state["logs"].append(f"[{datetime.now().time()}] Fetching (score={abs(score_inv)}): {url}")
-                
+                    return
                 try:
-                    html_content = await fetch_html(url, session)
-                    if not html_content:
-                        job_state["logs"].append(f"Failed to retrieve HTML for {url}")
-                        continue
-                    
-                    job_state["logs"].append(f"Successfully fetched HTML. Extracting content...")
+                    saved_path = await download_image(img['url'], image_dir, session, image_index, request.max_image_bytes, http_cache)
+                    # Other downloads run concurrently, so credit every duplicate the index counted since the last one
+                    skipped = image_index.duplicates - job_state["image_duplicates_found"]
+                    job_state["duplicates_found"] += skipped
+                    job_state["image_duplicates_found"] += skipped
+                    if saved_path:
+                        job_state["downloaded_items"] += 1
+                        job_state["logs"].append(f"Downloaded image: {os.path.basename(saved_path)}")
+                    elif skipped:
+                        job_state["logs"].append(f"Ignored duplicate image: {img['url']}")
+                except Exception as e:
+                    pass
+
+        async def process_page(session: aiohttp.ClientSession, score_inv: float, depth: int, url: str) -> bool:
+            """Fetches and stores one page; returns True when it counts as a downloaded page."""
+            job_state["current_url"] = url
+            job_state["logs"].append(f"[{datetime.now().time()}] Fetching (score={abs(score_inv)}): {url}")
+
+            async with limiter.slot(url):
+                html_content = await fetch_html(url, session, http_cache)
+            if not html_content:
+                job_state["logs"].append(f"Failed to retrieve HTML for {url}")
+                frontier.finish(url, depth, None, "failed")
+                return False
+            
+            job_state["logs"].append(f"Successfully fetched HTML from {url}. Extracting content...")
+            
+            # Parsing, cleaning and scoring run in the page worker pool, off the event loop
+            page = await page_worker_pool.extract(
+                html_content, url, cleaning_pipeline, query_tokens,
+                want_links=depth < request.max_depth, want_images=request.extract_images,
+                sketch_params=(dedup_store.lsh.num_perm, dedup_store.lsh.shingle_size, dedup_store.lsh.seed),
+            )
+            article_data, title, raw_text = page["article"], page["title"], page["text"]
+            links, images = page["links"], page["images"]
+            if page["profile"]:
+                merge_profiles(cleaning_profile, page["profile"])
+            extraction = article_data.get("extraction")
+            if extraction:
+                tier_stats = extraction_tiers[extraction["tier"]]
+                tier_stats["pages"] += 1
+                tier_stats["ms"] += extraction["ms"]
+                
+            # Heuristic Scoring
+            score = page["score"]
+            if score < request.relevance_threshold:
+                 job_state["dropped_items"] += 1
+                 job_state["logs"].append(f"Dropped {url} below threshold ({score} < {request.relevance_threshold})")
+                 frontier.finish(url, depth, score, "below_threshold")
+                 return False
+                 
+            # Extract Links if we can go deeper
+            if depth < request.max_depth:
+                for link in links:
+                    if request.domain_restricted:
+                        link_domain = urlparse(link).netloc
+                        if link_domain not in seed_domains:
+                            continue
+                    if link not in visited_urls:
+                        # We assign a rough priority inherited from parent, minus depth penalty
+                        queue.put_nowait((-score + (depth * 0.5), depth + 1, link))
+                        frontier.enqueue(-score + (depth * 0.5), depth + 1, link)
+            
+            doc_status = "dropped"
+            base_name = None
+            
+            if request.extract_text and raw_text:
+                # Full 64-char hash
+                text_hash = get_text_hash(raw_text)
+                dedup_status, _ = dedup_store.check(text_hash, raw_text, page["sketch"])
+
+                if dedup_status == "new":
+                    doc_status = "scraped"
                     
-                    article_data = extract_article(html_content, url)
-                    title = article_data.get('title', '')
-                    raw_text = ""
-                    if article_data and article_data.get('text'):
-                        raw_text = clean_text_content(article_data['text'])
-                        
-                    # Heuristic Scoring
-                    score = compute_relevance_score(raw_text, title, url, query_tokens)
-                    if score < request.relevance_threshold:
-                         job_state["dropped_items"] += 1
-                         job_state["logs"].append(f"Dropped {url} below threshold ({score} < {request.relevance_threshold})")
-                         continue
-                         
-                    # Extract Links if we can go deeper
-                    if depth < request.max_depth:
-                        links = extract_links(html_content, url)
-                        for link in links:
-                            if request.domain_restricted:
-                                link_domain = urlparse(link).netloc
-                                if link_domain not in seed_domains:
-                                    continue
-                            if link not in visited_urls:
-                                # We assign a rough priority inherited from parent, minus depth penalty
-                                queue.put_nowait((-score + (depth * 0.5), depth + 1, link))
+                    article_data['cleaned_text'] = raw_text
                     
-                    doc_status = "dropped"
+                    # Save to scraped JSON collection
+                    base_name = f"doc_{text_hash[:8]}"
+                    json_path = os.path.join(text_dir, f"{base_name}.json")
+                    with open(json_path, 'w', encoding='utf-8') as f:
+                        json.dump(article_data, f, indent=2)
                     
-                    if request.extract_text and raw_text:
-                        # Full 64-char hash
-                        text_hash = get_text_hash(raw_text)
-                        hash_prefix = text_hash[:8]
+                    # Streamed into raw.txt for the project pipeline, flushed in batches
+                    raw_txt.append(f"{title}\n\n{raw_text}\n\n========================\n\n")
+                    raw_txt_docs.append(base_name)
                         
-                        # Check against BOTH lists (full hashes of new things, prefixes of old things)
-                        if text_hash not in seen_hashes and hash_prefix not in seen_hash_prefixes and not is_near_duplicate(raw_text, seen_vectors):
-                            seen_hashes.add(text_hash)
-                            seen_hash_prefixes.add(hash_prefix)
-                            doc_status = "scraped"
-                            
-                            article_data['cleaned_text'] = raw_text
-                            
-                            # Save to scraped JSON collection
-                            base_name = f"doc_{text_hash[:8]}"
-                            json_path = os.path.join(text_dir, f"{base_name}.json")
-                            with open(json_path, 'w', encoding='utf-8') as f:
-                                json.dump(article_data, f, indent=2)
-                            
-                            # Append to memory buffer so we can write it to raw.txt at the end
-                            combined_run_text += f"{title}\n\n{raw_text}\n\n========================\n\n"
-                                
-                            job_state["logs"].append(f"Saved text document -> {base_name}.json")
-                            job_state["downloaded_items"] += 1
-                        else:
-                            doc_status = "duplicate"
-                            job_state["duplicates_found"] += 1
-                            job_state["logs"].append(f"Ignored duplicate or near-duplicate content from {url}")
-
-                    crawl_graph.append({
-                        "url": url,
-                        "depth": depth,
-                        "score": score,
-                        "status": doc_status
-                    })
-
-                    if request.extract_images:
-                        images = extract_image_urls(html_content, url)
-                        job_state["logs"].append(f"Found {len(images)} images.")
-                        for img in images:
-                            if job_state.get("is_cancelled", False): break
-                            
-                            try:
-                                saved_path = await download_image(img['url'], image_dir, session)
-                                if saved_path:
-                                    job_state["downloaded_items"] += 1
-                                    job_state["logs"].append(f"Downloaded image: {os.path.basename(saved_path)}")
-                            except Exception as e:
-                                pass
-                                
-                    downloaded_pages += 1
-                except Exception as e:
-                    job_state["logs"].append(f"Error extracting {url}: {e}")
-                
-                # Rate limit delay
-                await asyncio.sleep(1.0) # Removed request.rate_limit_delay as it's now in RefineRequest
+                    job_state["logs"].append(f"Saved text document -> {base_name}.json")
+                    job_state["downloaded_items"] += 1
+                else:
+                    doc_status = "duplicate"
+                    job_state["duplicates_found"] += 1
+                    job_state["logs"].append(f"Ignored {dedup_status.replace('_', '-')} content from {url}")
+
+            # Recorded before the next await, so no index snapshot holds this page without its outcome
+            frontier.finish(url, depth, score, doc_status, base_name)
+            if doc_status == "scraped":
+                await persist(dedup_store, 25)
+
+            if request.extract_images:
+                job_state["logs"].append(f"Found {len(images)} images.")
+                await asyncio.gather(*(fetch_image(session, img) for img in images))
+                await persist(image_index, 25)
+
+            return True
+
+        async def worker(session: aiohttp.ClientSession):
+            nonlocal downloaded_pages, in_flight
+            while True:
+                score_inv, depth, url = await queue.get()
+                try:
+                    # Wait while the pages in flight could still fill max_pages on their own
+                    async with capacity:
+                        await capacity.wait_for(lambda: downloaded_pages + in_flight < request.max_pages or in_flight == 0)
+                        # Cancelled: drain the queue; pages in flight still finish
+                        if job_state.get("is_cancelled", False):
+                            continue
+                        # Budget spent or already crawled: drain the queue without fetching
+                        if downloaded_pages >= request.max_pages or url in visited_urls:
+                            continue
+                        visited_urls.add(url)
+                        in_flight += 1
+                    job_state["total_urls"] = len(visited_urls) + queue.qsize()
+
+                    counted = False
+                    try:
+                        counted = await process_page(session, score_inv, depth, url)
+                    except Exception as e:
+                        job_state["logs"].append(f"Error extracting {url}: {e}")
+                        frontier.finish(url, depth, None, "error")
+                    finally:
+                        async with capacity:
+                            in_flight -= 1
+                            if counted:
+                                downloaded_pages += 1
+                            job_state["progress"] = min((downloaded_pages / max(1, request.max_pages)) * 100, 99.0)
+                            capacity.notify_all()
+                    await persist(frontier, 25)
+                    await persist_raw_txt(settings.SCRAPER_STREAM_FLUSH_BYTES)
+                finally:
+                    queue.task_done()
+
+        session = http_client.session()
+        workers = [asyncio.create_task(worker(session)) for _ in range(request.concurrency)]
+        try:
+            # Every queued URL is either crawled or drained once the page budget is spent
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
         
-        # Finally, append the successfully scraped buffer into the single raw.txt for the project pipeline
-        if combined_run_text:
-            raw_txt_path = get_project_path(request.project_name) / "raw.txt"
-            mode = "a" if raw_txt_path.exists() else "w"
-            with open(raw_txt_path, mode, encoding="utf-8") as f:
-                f.write(combined_run_text)
+        # Flush the rest of the text streamed into the project's raw.txt
+        await persist_raw_txt(0)
+        if raw_txt.written:
             job_state["logs"].append("Pipeline Data Integration: Appended data to raw.txt")
             
-        # Write crawl graph report
-        if len(crawl_graph) > 0:
-            graph_path = os.path.join(scraped_dir, "crawl_graph.json")
-            with open(graph_path, "w", encoding="utf-8") as f:
-                json.dump(crawl_graph, f, indent=2)
-            job_state["logs"].append(f"Crawl graph generated with {len(crawl_graph)} edges.")
+        # Crawl graph lines are appended to crawl_graph.jsonl with each frontier batch
+        if downloaded_pages > 0:
+            job_state["logs"].append(f"Crawl graph generated with {downloaded_pages} edges.")
+
+        # Per-rule cleaning profile for this run
+        if cleaning_profile:
+            with open(os.path.join(scraped_dir, "cleaning_report.json"), "w", encoding="utf-8") as f:
+                json.dump(cleaning_profile, f, indent=2)
+            job_state["logs"].append(
+                f"Cleaned {cleaning_profile['documents']} documents in {cleaning_profile['seconds']:.2f}s."
+            )
+
+        if any(stats["pages"] for stats in extraction_tiers.values()):
+            job_state["logs"].append("Extraction tiers: " + ", ".join(
+                f"{tier} {stats['pages']} pages ({stats['ms'] / max(1, stats['pages']):.1f} ms avg)"
+                for tier, stats in extraction_tiers.items() if stats["pages"]
+            ) + ".")
+
+        if http_cache is not None and any(http_cache.stats.values()):
+            stats = http_cache.stats
+            job_state["logs"].append(
+                f"HTTP cache: {stats['hits']} fresh, {stats['not_modified']} not modified, "
+                f"{stats['misses']} downloaded ({stats['bytes_saved'] / 1e6:.1f} MB not re-downloaded)."
+            )
                 
-        if job_state["status"] == "running":
-            job_state["status"] = "completed"
-            job_state["progress"] = 100.0
-            job_state["logs"].append("Scraping completed successfully.")
+        outcome = "cancelled" if job_state.get("is_cancelled", False) else "completed"
             
     except Exception as e:
-        job_state["status"] = "failed"
+        outcome = "failed"
         job_state["error"] = str(e)
         job_state["logs"].append(f"Error: {e}")
         logger.error(f"Scrape task {task_id} failed: {e}")
+    finally:
+        job_state["status"] = "finishing"
+        # Text still buffered after a failure reaches raw.txt before the frontier records it as written
+        try:
+            await asyncio.to_thread(raw_txt.snapshot())
+            frontier.text_written(raw_txt_docs, await asyncio.to_thread(raw_txt.mark))
+        except Exception as e:
+            logger.warning(f"Scrape task {task_id} could not append to raw.txt: {e}")
+        # Final saves run after every worker has stopped mutating the indexes, the frontier first.
+        # No outcome here means the task itself was interrupted (e.g. server shutdown)
+        final_status = outcome or "interrupted"
+        try:
+            await asyncio.to_thread(frontier.close, final_status)
+            await asyncio.to_thread(dedup_store.save_if_dirty)
+            await asyncio.to_thread(image_index.save_if_dirty)
+        finally:
+            job_state["status"] = final_status
+            if final_status == "completed":
+                job_state["progress"] = 100.0
+                job_state["logs"].append("Scraping completed successfully.")
 
 async def process_refinement_task(task_id: str, request: RefineRequest):
     """
@@ -281,6 +479,7 @@ async def process_refinement_task(task_id: str, request: RefineRequest):
     """
     job_state = active_scraping_jobs[task_id]
     job_state["status"] = "running"
+    track_connections(job_state.setdefault("connection_stats", new_connection_stats()))
     job_state["logs"].append(f"Starting AI refinement for project: {request.project_name}")
 
     try:
@@ -390,25 +589,50 @@ class ScrapingManager:
     def __init__(self):
         self.active_jobs = active_scraping_jobs
         
-    def start_job(self, request: ScrapeRequest) -> str:
+    def start_job(self, request: ScrapeRequest, resume: bool = False) -> str:
         task_id = str(uuid.uuid4())
         self.active_jobs[task_id] = {
+            "project_name": request.project_name,
             "status": "queued",
             "progress": 0.0,
             "logs": ["Job initialized...", f"Config: {request.model_dump()}"],
             "total_urls": 0,
             "downloaded_items": 0,
             "duplicates_found": 0,
+            "image_duplicates_found": 0,
             "dropped_items": 0,
+            "connection_stats": new_connection_stats(),
+            # Pages and total milliseconds per article extraction tier
+            "extraction_tiers": {tier: {"pages": 0, "ms": 0.0} for tier in EXTRACTION_TIERS},
             "current_url": None,
             "is_cancelled": False,
             "start_time": datetime.utcnow().isoformat()
         }
+        # Marked before the task starts, so a second request for the project is rejected right away
+        crawling_projects.add(request.project_name)
         
         # Submit to internal event loop via asyncio.create_task
-        asyncio.create_task(process_scrape_task(task_id, request))
+        asyncio.create_task(process_scrape_task(task_id, request, resume))
         return task_id
 
+    def saved_crawl(self, project_name: str) -> Optional[Dict[str, Any]]:
+        """Request and status of the project's last crawl, or None if it has none."""
+        return CrawlFrontier.saved_crawl(get_project_path(project_name) / "scraped")
+
+    def is_crawling(self, project_name: str) -> bool:
+        """True from start_job until the crawl's final saves are done (also while cancelling)."""
+        return project_name in crawling_projects
+
+    def resume_job(self, project_name: str) -> Optional[str]:
+        """
+        Continues the project's last crawl from its saved frontier with the
+        original request; None when there is nothing to resume.
+        """
+        saved = self.saved_crawl(project_name)
+        if saved is None or saved["status"] == "completed":
+            return None
+        return self.start_job(ScrapeRequest.model_validate(saved["request"]), resume=True)
+
     def start_refinement_job(self, request: RefineRequest) -> str:
         task_id = str(uuid.uuid4())
         self.active_jobs[task_id] = {
@@ -419,6 +643,7 @@ class ScrapingManager:
             "downloaded_items": 0, # Used for processed files
             "duplicates_found": 0,
             "dropped_items": 0,
+            "connection_stats": new_connection_stats(),
             "current_url": None,
             "is_cancelled": False,
             "start_time": datetime.utcnow().isoformat()
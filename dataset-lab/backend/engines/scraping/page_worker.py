@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config import settings
+from backend.engines.processing.cleaner import clean_text_with_report
+from backend.engines.processing.deduplicator import MinHashLSH
+from backend.engines.processing.rules import RulePipeline
+from backend.engines.scraping.image_scraper import extract_image_urls
+from backend.engines.scraping.text_scraper import (
+    compute_relevance_score, extract_content, extract_links, looks_like_plain_text, parse_html,
+)
+
+logger = logging.getLogger(__name__)
+
+# ── Worker process side ───────────────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def _sketcher(num_perm: int, shingle_size: int, seed: int) -> MinHashLSH:
+    # Only used for MinHashLSH.sketch; the caller's index does the lookups
+    return MinHashLSH(num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+
+def extract_page(html_content: str, url: str, pipeline: RulePipeline, query_tokens: List[str],
+                 want_links: bool, want_images: bool,
+                 sketch_params: Optional[Tuple[int, int, int]] = None) -> Dict[str, Any]:
+    """
+    All CPU-bound work for one fetched page: a single parse, link and image
+    extraction, tiered article extraction, cleaning, relevance scoring and, with
+    sketch_params (num_perm, shingle_size, seed), the MinHash sketch of the
+    cleaned text. Takes and returns plain picklable data so it can run in a
+    worker process.
+    """
+    # Plain-text responses skip parsing; their links and images are empty
+    plain = looks_like_plain_text(html_content)
+    tree = None if plain else parse_html(html_content)
+    # Links and images are read before readability prunes the tree
+    links = extract_links(tree, url) if want_links else []
+    images = extract_image_urls(tree, url) if want_images else []
+    article_data = extract_content(html_content if plain else tree, url)
+    title = article_data.get('title', '')
+    raw_text, profile = "", {}
+    if article_data and article_data.get('text'):
+        raw_text, profile = clean_text_with_report(article_data['text'], pipeline)
+    sketch = _sketcher(*sketch_params).sketch(raw_text) if sketch_params and raw_text else None
+    return {
+        "article": article_data,
+        "title": title,
+        "text": raw_text,
+        "profile": profile,
+        "score": compute_relevance_score(raw_text, title, url, query_tokens),
+        "links": links,
+        "images": images,
+        "sketch": sketch,
+    }
+
+# ── API process side ──────────────────────────────────────────────────────────
+class PageWorkerPool:
+    """
+    Runs page extraction in worker processes so parsing never blocks the
+    event loop: fetches keep progressing and the API keeps answering while
+    pages are parsed. One pool is shared by every crawl.
+
+    At most max_pending pages are submitted at once; further callers wait
+    (backpressure), so a fast crawl cannot queue unbounded HTML in memory.
+    With processes=0 pages are extracted in a thread instead.
+    """
+
+    def __init__(self, processes: Optional[int] = None, max_pending: Optional[int] = None):
+        self.processes = settings.SCRAPER_PARSE_WORKERS if processes is None else processes
+        self.max_pending = max_pending or settings.SCRAPER_PARSE_MAX_PENDING or max(2, self.processes * 2)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    # spawn: never fork a process that already holds threads and sockets
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._loop = loop
+        return self._slots
+
+    async def extract(self, html_content: str, url: str, pipeline: RulePipeline, query_tokens: List[str],
+                      want_links: bool = True, want_images: bool = True,
+                      sketch_params: Optional[Tuple[int, int, int]] = None) -> Dict[str, Any]:
+        """extract_page off the event loop; see extract_page for the result."""
+        args = (html_content, url, pipeline, query_tokens, want_links, want_images, sketch_params)
+        async with self._get_slots():
+            if self.processes <= 0:
+                return await asyncio.to_thread(extract_page, *args)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), extract_page, *args)
+            except BrokenProcessPool:
+                logger.error("[Scraper] Page worker process died; the pool will be restarted.")
+                with self._lock:
+                    self._executor = None
+                raise
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+page_worker_pool = PageWorkerPool()
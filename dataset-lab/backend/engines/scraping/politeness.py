@@ -0,0 +1,45 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict
+from urllib.parse import urlparse
+
+class _HostState:
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+
+class HostLimiter:
+    """
+    Crawl politeness: at most per_host_concurrency requests in flight per
+    host, request starts to one host spaced at least per_host_delay seconds
+    apart, and at most global_concurrency requests in flight overall.
+
+    A request waiting out its host's delay does not hold a global slot, so
+    other hosts keep the crawl busy meanwhile.
+    """
+
+    def __init__(self, global_concurrency: int = 8, per_host_concurrency: int = 2, per_host_delay: float = 1.0):
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = per_host_delay
+        self._global = asyncio.Semaphore(global_concurrency)
+        self._hosts: Dict[str, _HostState] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = self._hosts.get(self.host_of(url))
+        if host is None:
+            host = self._hosts[self.host_of(url)] = _HostState(self.per_host_concurrency)
+        loop = asyncio.get_running_loop()
+        async with host.semaphore:
+            async with host.lock:
+                wait = host.next_start - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                host.next_start = loop.time() + self.per_host_delay
+            async with self._global:
+                yield
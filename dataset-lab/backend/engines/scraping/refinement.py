@@ -1,7 +1,8 @@
-import aiohttp
 import logging
 import json
 
+from backend.engines.scraping.http_client import http_client
+
 logger = logging.getLogger(__name__)
 
 async def refine_text_with_llm(
@@ -35,54 +36,55 @@ async def refine_text_with_llm(
         )
 
     try:
-        async with aiohttp.ClientSession() as session:
-            if provider == 'openai':
-                if not api_key:
-                    logger.error("OpenAI API key missing for refinement.")
-                    return raw_text
+        # Shared pool: keep-alive connections to the LLM endpoint across documents
+        session = http_client.session()
+        if provider == 'openai':
+            if not api_key:
+                logger.error("OpenAI API key missing for refinement.")
+                return raw_text
                 
-                async with session.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                    json={
-                        "model": model_name or "gpt-4o-mini",
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": truncated_text}
-                        ],
-                        "temperature": 0.1
-                    },
-                    timeout=120
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        response_text = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-                        if response_text:
-                            return response_text
-                    else:
-                        logger.error(f"OpenAI refinement failed with status {response.status}: {await response.text()}")
-            else:
-                # Default to Ollama local structure
-                async with session.post(
-                    "http://localhost:11434/api/generate",
-                    json={
-                        "model": model_name or "llama3.2",
-                        "system": system_prompt,
-                        "prompt": truncated_text,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.1 
-                        }
-                    },
-                    timeout=120 
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        response_text = data.get("response", "").strip()
-                        if response_text:
-                            return response_text
-                    else:
-                        logger.error(f"Ollama refinement failed with status {response.status}")
+            async with session.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+                json={
+                    "model": model_name or "gpt-4o-mini",
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": truncated_text}
+                    ],
+                    "temperature": 0.1
+                },
+                timeout=120
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    response_text = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+                    if response_text:
+                        return response_text
+                else:
+                    logger.error(f"OpenAI refinement failed with status {response.status}: {await response.text()}")
+        else:
+            # Default to Ollama local structure
+            async with session.post(
+                "http://localhost:11434/api/generate",
+                json={
+                    "model": model_name or "llama3.2",
+                    "system": system_prompt,
+                    "prompt": truncated_text,
+                    "stream": False,
+                    "options": {
+                        "temperature": 0.1 
+                    }
+                },
+                timeout=120 
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    response_text = data.get("response", "").strip()
+                    if response_text:
+                        return response_text
+                else:
+                    logger.error(f"Ollama refinement failed with status {response.status}")
     except Exception as e:
         logger.error(f"Error during LLM refinement connection: {e}")
         
@@ -1,16 +1,38 @@
 import aiohttp
-from bs4 import BeautifulSoup
+import copy
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
 from readability import Document
-from typing import Optional, Dict, Any, List
+from readability.htmls import get_title
+from typing import Optional, Dict, Any, List, Union
 import logging
-import ssl
 import re
+import time
 from urllib.parse import urljoin
 
+from backend.config import settings
+from backend.engines.scraping.http_cache import HttpCache
+from backend.engines.scraping.http_client import SCRAPER_SSL_CONTEXT
+
 logger = logging.getLogger(__name__)
 
-async def fetch_html(url: str, session: aiohttp.ClientSession) -> Optional[str]:
+async def fetch_html(url: str, session: aiohttp.ClientSession, cache: Optional[HttpCache] = None,
+                     conditional: bool = True) -> Optional[str]:
+    """
+    Page HTML, or None on failure. With a cache, a fresh copy is returned
+    without a request and a stale one is revalidated conditionally.
+    conditional=False ignores any cached copy and fetches the page in full.
+    """
     try:
+        cached = cache.lookup(url) if cache is not None and conditional else None
+        if cached is not None and cached.fresh:
+            body = await cache.read(cached)
+            if body is not None:
+                return body.decode(cached.charset, errors="replace")
+            # Unreadable and deleted: nothing left to revalidate
+            cached = None
+
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
@@ -19,43 +41,79 @@ async def fetch_html(url: str, session: aiohttp.ClientSession) -> Optional[str]:
             "Connection": "keep-alive",
             "Upgrade-Insecure-Requests": "1"
         }
+        if cached is not None:
+            headers.update(cached.validators())
         
-        # Bypass strict SSL checking for scraper
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        async with session.get(url, headers=headers, timeout=25, allow_redirects=True, ssl=ssl_context) as response:
-            if response.status == 200:
-                return await response.text()
+        async with session.get(url, headers=headers, timeout=25, allow_redirects=True, ssl=SCRAPER_SSL_CONTEXT) as response:
+            if response.status == 304 and cached is not None:
+                body = await cache.revalidated(cached, response.headers)
+                if body is not None:
+                    return body.decode(cached.charset, errors="replace")
+            elif response.status == 200:
+                html = await response.text()
+                if cache is not None:
+                    await cache.store(url, response.headers, await response.read(), response.get_encoding())
+                return html
             elif response.status in (403, 401, 400):
                 logger.warning(f"Blocked by {url}, status code: {response.status}")
                 return None
             else:
                 logger.warning(f"Failed to fetch {url}, status code: {response.status}")
                 return None
+        # Confirmed by a 304, but the stored body is unreadable (and now deleted)
+        return await fetch_html(url, session, cache, conditional=False)
     except Exception as e:
         logger.error(f"Error fetching {url}: {e}")
         return None
 
-def extract_article(html_content: str, url: str) -> Dict[str, Any]:
+# Same tree building as readability, which gets the parsed page directly
+UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+# Text nodes BeautifulSoup's get_text() returns: none from scripts, styles or templates
+VISIBLE_TEXT = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+def parse_html(html_content: str) -> Optional[HtmlElement]:
+    """
+    Parses a page once with lxml. The tree is shared by extract_links,
+    extract_image_urls and extract_article / extract_content; run those
+    last, as readability drops hidden elements from the tree it is given.
+    """
+    try:
+        return lxml.html.document_fromstring(html_content.encode("utf-8", "replace"), parser=UTF8_PARSER)
+    except (etree.ParserError, ValueError) as e:
+        logger.debug(f"Unparseable HTML: {e}")
+        return None
+
+def node_text(node: HtmlElement, separator: str) -> str:
+    """Stripped, non-empty text nodes joined by separator, like get_text(separator, strip=True)."""
+    return separator.join(s for s in (text.strip() for text in VISIBLE_TEXT(node)) if s)
+
+def _as_tree(page: Union[str, HtmlElement]) -> Optional[HtmlElement]:
+    return parse_html(page) if isinstance(page, str) else page
+
+def extract_article(page: Union[str, HtmlElement], url: str) -> Dict[str, Any]:
     """
     Extracts the main article body, title, and metadata using Readability.
+    page is raw HTML or the tree from parse_html.
     """
     try:
-        doc = Document(html_content)
+        tree = _as_tree(page)
+        if tree is None:
+            return {}
+        doc = Document(tree)
         title = doc.title()
         
         # Get simplified HTML retaining only readable content
         readable_html = doc.summary()
         
-        # Parse it with BeautifulSoup to get pure text and clean up
-        soup = BeautifulSoup(readable_html, "html.parser")
+        # readability leaves the sanitized article tree in doc.html, so its text needs no re-parse
+        summary = doc.html if isinstance(doc.html, HtmlElement) else parse_html(readable_html)
+        if summary is None:
+            return {}
         
         # Extract headings for structure
-        headings = [h.get_text(strip=True) for h in soup.find_all(['h1', 'h2', 'h3', 'h4'])]
+        headings = [node_text(h, "") for h in summary.iter('h1', 'h2', 'h3', 'h4')]
         
-        text_content = soup.get_text(separator="\n", strip=True)
+        text_content = node_text(summary, "\n")
         
         return {
             "url": url,
@@ -68,17 +126,143 @@ def extract_article(html_content: str, url: str) -> Dict[str, Any]:
         logger.error(f"Failed to extract article from {url}: {e}")
         return {}
 
-def extract_links(html_content: str, base_url: str) -> List[str]:
+# ── Tiered extraction ────────────────────────────────────────────────────────
+# Readability scores every block of the page and is by far the slowest step
+# per page, so cheaper tiers are tried first:
+#   plain       the response is not HTML at all
+#   semantic    one <article>/<main>-style container clearly holds the content
+#   readability everything else
+EXTRACTION_TIERS = ("plain", "semantic", "readability")
+
+# Any tag-like markup near the start means the body is parsed as HTML
+MARKUP = re.compile(r"<[a-zA-Z!/?]")
+# Preferred content containers, most specific first
+SEMANTIC_CONTAINERS = (
+    etree.XPath("//*[@itemprop='articleBody']"),
+    etree.XPath("//article"),
+    etree.XPath("//main"),
+    etree.XPath("//*[@role='main']"),
+)
+# Page chrome that may sit inside a container but is never article text
+BOILERPLATE_TAGS = ("script", "style", "noscript", "template", "nav", "aside", "footer",
+                    "form", "button", "iframe", "svg")
+# Confidence thresholds for the semantic tier
+SEMANTIC_MIN_CHARS = 500
+SEMANTIC_MAX_LINK_DENSITY = 0.3
+SEMANTIC_MIN_PAGE_SHARE = 0.25
+
+def looks_like_plain_text(content: str) -> bool:
+    return MARKUP.search(content, 0, 4096) is None
+
+def extract_plain_text(content: str, url: str) -> Dict[str, Any]:
+    """Article fields for a non-HTML response; the first line serves as title."""
+    lines = [line.strip() for line in content.splitlines()]
+    text = "\n".join(line for line in lines if line)
+    return {
+        "url": url,
+        "title": next((line for line in lines if line), "")[:200],
+        "headings": [],
+        "text": text,
+        "html_summary": "",
+    }
+
+# Text walks below use itertext: per-node XPath queries get slow on very large pages
+def _strings(node: HtmlElement) -> List[str]:
+    return [s for s in (text.strip() for text in node.itertext(etree.Element)) if s]
+
+def _visible_length(node: HtmlElement) -> int:
+    length = sum(map(len, _strings(node)))
+    for hidden in node.iter('script', 'style', 'template'):
+        length -= sum(len(text.strip()) for text in hidden.itertext(etree.Element, with_tail=False))
+    return length
+
+def _semantic_container(tree: HtmlElement) -> Optional[HtmlElement]:
+    for xpath in SEMANTIC_CONTAINERS:
+        found = xpath(tree)
+        if len(found) == 1:
+            return found[0]
+        if found:
+            # Several articles (a listing page) or mains: let readability decide
+            return None
+    return None
+
+def extract_semantic(tree: HtmlElement, url: str) -> Optional[Dict[str, Any]]:
+    """
+    Article fields from the page's single semantic content container, or
+    None when there is none or it does not look like the main content:
+    too little text, mostly links, or a small share of the page's text.
+    The tree itself is left untouched for a readability fallback.
+    """
+    container = _semantic_container(tree)
+    if container is None:
+        return None
+    # A copy without scripts, styles or chrome, so all of its text is visible text
+    content = copy.deepcopy(container)
+    etree.strip_elements(content, *BOILERPLATE_TAGS, with_tail=False)
+    etree.strip_elements(content, etree.Comment, with_tail=False)
+
+    strings = _strings(content)
+    text_length = sum(map(len, strings))
+    if text_length < SEMANTIC_MIN_CHARS:
+        return None
+    link_length = sum(len(s) for a in content.iter('a') for s in _strings(a))
+    if link_length > SEMANTIC_MAX_LINK_DENSITY * text_length:
+        return None
+    body = tree.find('body')
+    if body is not None and text_length < SEMANTIC_MIN_PAGE_SHARE * _visible_length(body):
+        return None
+
+    return {
+        "url": url,
+        "title": get_title(tree),
+        "headings": ["".join(_strings(h)) for h in content.iter('h1', 'h2', 'h3', 'h4')],
+        "text": "\n".join(strings),
+        "html_summary": lxml.html.tostring(content, encoding="unicode"),
+    }
+
+def extract_content(page: Union[str, HtmlElement], url: str) -> Dict[str, Any]:
+    """
+    extract_article with cheaper tiers tried first (see EXTRACTION_TIERS).
+    page is raw HTML or the tree from parse_html; a plain-text response must
+    be passed as the raw string. The result records the tier used and its
+    time under "extraction"; it is empty when nothing could be extracted.
+    """
+    start = time.perf_counter()
+    article, tier = None, "readability"
+    if isinstance(page, str) and looks_like_plain_text(page):
+        article, tier = extract_plain_text(page, url), "plain"
+    elif settings.SCRAPER_FAST_EXTRACTION:
+        tree = _as_tree(page)
+        if tree is None:
+            return {}
+        page = tree
+        try:
+            article, tier = extract_semantic(tree, url), "semantic"
+        except Exception as e:
+            logger.debug(f"Semantic extraction failed for {url}: {e}")
+    if article is None:
+        article, tier = extract_article(page, url), "readability"
+    if not article:
+        return {}
+    article["extraction"] = {"tier": tier, "ms": round((time.perf_counter() - start) * 1000, 2)}
+    return article
+
+def extract_links(page: Union[str, HtmlElement], base_url: str) -> List[str]:
     """
     Extracts heuristic-filtered URLs from anchor tags.
     Ignores common structural boundaries like login, cart, and sorting modifiers.
+    page is raw HTML or the tree from parse_html.
     """
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
+        tree = _as_tree(page)
+        if tree is None:
+            return []
         links = []
         skip_patterns = ['/login', '?sort=', '/cart', 'signup', 'register', '#', 'javascript:']
-        for a in soup.find_all('a', href=True):
-            href = a['href']
+        for a in tree.iter('a'):
+            href = a.get('href')
+            if href is None:
+                continue
             
             # Filter structural endpoints
             if any(skip in href.lower() for skip in skip_patterns):
@@ -1,9 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routes import projects, pipeline, export, llm, prompt, scrape
+from backend.engines.embedding_refiner import embedding_refiner
+from backend.engines.scraping.http_client import http_client
+from backend.engines.scraping.page_worker import page_worker_pool
 from backend.config import settings
 
-app = FastAPI(title="Dataset Lab API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the embedding model off the event loop; requests are served meanwhile
+    if settings.EMBEDDING_WARMUP:
+        embedding_refiner.warmup()
+    yield
+    await http_client.close()
+    page_worker_pool.shutdown()
+    embedding_refiner.shutdown()
+
+app = FastAPI(title="Dataset Lab API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -14,8 +28,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def health():
+    return {
+        "status": "ok",
+        "message": "Dataset Lab API Running",
+        "embedding_model_ready": embedding_refiner.is_ready,
+        "embedding_backend": embedding_refiner.backend,
+        "embedding_model_error": embedding_refiner.load_error,
+    }
+
 # Include Routers
-app.add_api_route("/", lambda: {"status": "ok", "message": "Dataset Lab API Running"}, methods=["GET"])
+app.add_api_route("/", health, methods=["GET"])
 app.include_router(projects.router, prefix="/projects", tags=["Projects"])
 app.include_router(pipeline.router, prefix="/projects", tags=["Pipeline"])
 app.include_router(export.router, prefix="/projects", tags=["Export"])
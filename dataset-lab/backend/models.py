@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
+# Question cosine similarity above which two QA pairs count as duplicates
+QA_DEDUP_THRESHOLD = 0.95
+
 class ProjectCreate(BaseModel):
     name: str = Field(..., min_length=1, pattern="^[a-zA-Z0-9_-]+$")
 
@@ -8,6 +11,16 @@ class PipelineConfig(BaseModel):
     chunk_size: int = Field(default=800, ge=200, le=2000)
     chunk_overlap: int = Field(default=100, ge=0)
     similarity_threshold: float = Field(default=0.92, ge=0.0, le=1.0)
+    merge_mode: str = Field(default="exact", pattern="^(exact|incremental)$")
+    # None = merges are not capped
+    max_merged_tokens: Optional[int] = Field(default=None, ge=200, le=8000)
+    # "recursive" = token-count chunking followed by embedding refinement,
+    # "semantic" = sentence-embedding topic boundaries in one pass (no refinement)
+    chunking_strategy: str = Field(default="recursive", pattern="^(recursive|semantic)$")
+    semantic_breakpoint_percentile: float = Field(default=10.0, ge=1.0, le=50.0)
+    # Exact / near-duplicate chunks before generation: "drop" them, "flag" them (kept but skipped) or "off"
+    chunk_dedup: str = Field(default="off", pattern="^(off|drop|flag)$")
+    chunk_dedup_threshold: float = Field(default=0.95, ge=0.5, le=1.0)
     
 class GenerationConfig(BaseModel):
     model_name: str
@@ -21,6 +34,9 @@ class GenerationConfig(BaseModel):
     format: str = "alpaca"
     api_key: Optional[str] = None  # User-supplied key (takes priority over OPENAI_API_KEY env var)
     qa_density_factor: float = Field(default=1.0, ge=0.5, le=3.0)
+    # Near-identical questions after generation: "drop" them, "cluster" them (tagged, kept) or "off"
+    qa_dedup: str = Field(default="off", pattern="^(off|drop|cluster)$")
+    qa_dedup_threshold: float = Field(default=QA_DEDUP_THRESHOLD, ge=0.5, le=1.0)
     
 class Chunk(BaseModel):
     chunk_id: int
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, File, UploadFile, BackgroundTasks, HTTPException
+from fastapi import APIRouter, File, UploadFile, BackgroundTasks, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
+import numpy as np
 from pathlib import Path
 from backend.utils.filesystem import get_project_path, save_raw_text
 from backend.engines.cleaning import cleaning_engine
 from backend.engines.chunking import chunking_engine
 from backend.engines.embedding_refiner import embedding_refiner
+from backend.engines.chunk_dedup import chunk_deduplicator
+from backend.engines.qa_dedup import qa_deduplicator
 from backend.engines.generation import generation_engine
-from backend.models import GenerationConfig, PipelineConfig
+from backend.models import QA_DEDUP_THRESHOLD, GenerationConfig, PipelineConfig
 import json
 import logging
 
@@ -46,6 +49,45 @@ def _get_chunk_count(project_path: Path) -> int:
             return 0
     return 0
 
+def _get_report_summary(report_path: Path, details_key: str) -> Optional[dict]:
+    if report_path.exists():
+        try:
+            report = json.loads(report_path.read_text(encoding="utf-8"))
+            return {k: v for k, v in report.items() if k != details_key}
+        except Exception:
+            return None
+    return None
+
+
+def run_qa_dedup(project_path: Path, threshold: float, mode: str) -> Optional[dict]:
+    """Semantic dedup of qa_v1.json in place; writes qa_dedup_report.json."""
+    qa_path = project_path / "qa_v1.json"
+    if not qa_path.exists():
+        return None
+    with open(qa_path, 'r', encoding='utf-8') as f:
+        qa_pairs = json.load(f)
+    qa_pairs, report = qa_deduplicator.deduplicate(qa_pairs, threshold=threshold, mode=mode, work_dir=project_path)
+    tmp_path = qa_path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(qa_pairs, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(qa_path)
+    with open(project_path / "qa_dedup_report.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"[{project_path.name}] QA dedup: {report['pairs_in']} -> {report['pairs_out']} pairs")
+    return report
+
+
+def run_qa_dedup_task(project_path: Path, threshold: float, mode: str):
+    """Background QA dedup started by the dedup endpoint, which created .running for it."""
+    running_file = project_path / ".running"
+    try:
+        run_qa_dedup(project_path, threshold, mode)
+    except Exception as e:
+        logger.error(f"[{project_path.name}] QA Dedup Failed: {e}")
+    finally:
+        if running_file.exists():
+            running_file.unlink()
+
 
 def run_pipeline_task(project_name: str, config: PipelineRunRequest):
     project_path = get_project_path(project_name)
@@ -88,7 +130,7 @@ def run_pipeline_task(project_name: str, config: PipelineRunRequest):
         else:
             # ── FRESH RUN ─────────────────────────────────────────────────────
             # Pre-run cleanup: Delete old results
-            for f_name in ["qa_v1.json", "qa_partial.json", "error.log", ".stop"]:
+            for f_name in ["qa_v1.json", "qa_partial.json", "qa_dedup_report.json", "error.log", ".stop"]:
                 path = project_path / f_name
                 if path.exists():
                     path.unlink()
@@ -103,26 +145,77 @@ def run_pipeline_task(project_name: str, config: PipelineRunRequest):
             with open(raw_path, 'r', encoding='utf-8') as f:
                 raw_text = f.read()
 
-            cleaned_text = cleaning_engine.process(raw_text)
+            cleaned_text, cleaning_report = cleaning_engine.process_with_report(raw_text, project_path)
+            logger.info(
+                f"[{project_name}] Cleaning: {cleaning_report['lines_in']} -> {cleaning_report['lines_out']} lines "
+                f"in {cleaning_report['seconds']:.2f}s"
+            )
+            with open(project_path / "cleaning_report.json", 'w', encoding='utf-8') as f:
+                json.dump(cleaning_report, f, indent=2)
 
             cleaned_path = project_path / "cleaned.txt"
             with open(cleaned_path, 'w', encoding='utf-8') as f:
                 f.write(cleaned_text)
 
-            # 2. Chunk
-            logger.info(f"[{project_name}] Starting Chunking...")
-            chunks = chunking_engine.chunk(
-                cleaned_text,
-                chunk_size=config.pipeline_config.chunk_size,
-                chunk_overlap=config.pipeline_config.chunk_overlap
-            )
-
-            # 3. Refine
-            logger.info(f"[{project_name}] Starting Refinement...")
-            chunks = embedding_refiner.refine(
-                chunks,
-                threshold=config.pipeline_config.similarity_threshold
-            )
+            embedding_cache = embedding_refiner.get_cache(project_path)
+            pipeline_config = config.pipeline_config
+
+            if pipeline_config.chunking_strategy == "semantic":
+                # 2+3. Semantic chunking already groups by topic, so there is no refine pass
+                logger.info(f"[{project_name}] Starting Semantic Chunking...")
+                chunks = chunking_engine.semantic_chunk(
+                    cleaned_text,
+                    min_tokens=max(50, pipeline_config.chunk_size // 4),
+                    max_tokens=pipeline_config.chunk_size,
+                    breakpoint_percentile=pipeline_config.semantic_breakpoint_percentile,
+                )
+                # A refine-threshold sweep does not apply to these chunks
+                similarity_path = project_path / "similarity.json"
+                if similarity_path.exists():
+                    similarity_path.unlink()
+            else:
+                # 2. Chunk
+                logger.info(f"[{project_name}] Starting Chunking...")
+                chunks = chunking_engine.chunk(
+                    cleaned_text,
+                    chunk_size=pipeline_config.chunk_size,
+                    chunk_overlap=pipeline_config.chunk_overlap
+                )
+
+                # 3. Refine
+                logger.info(f"[{project_name}] Starting Refinement...")
+                unrefined_chunks = chunks
+                chunks = embedding_refiner.refine(
+                    chunks,
+                    threshold=pipeline_config.similarity_threshold,
+                    merge_mode=pipeline_config.merge_mode,
+                    max_merged_tokens=pipeline_config.max_merged_tokens,
+                    cache=embedding_cache,
+                )
+                if embedding_cache is not None:
+                    # Vectors are cached now, so this only stores hashes and adjacent scores
+                    embedding_refiner.save_similarity_profile(
+                        project_path, unrefined_chunks, embedding_cache,
+                        pipeline_config.max_merged_tokens, pipeline_config.merge_mode,
+                    )
+
+            # Dedup: every chunk left here costs one LLM call
+            dedup_report_path = project_path / "chunk_dedup_report.json"
+            if pipeline_config.chunk_dedup != "off":
+                chunks, dedup_report = chunk_deduplicator.deduplicate(
+                    chunks,
+                    threshold=pipeline_config.chunk_dedup_threshold,
+                    mode=pipeline_config.chunk_dedup,
+                    cache=embedding_cache,
+                )
+                logger.info(
+                    f"[{project_name}] Chunk dedup: {dedup_report['exact_duplicates']} exact, "
+                    f"{dedup_report['near_duplicates']} near duplicates ({dedup_report['llm_calls_saved']} LLM calls saved)"
+                )
+                with open(dedup_report_path, 'w', encoding='utf-8') as f:
+                    json.dump(dedup_report, f, indent=2)
+            elif dedup_report_path.exists():
+                dedup_report_path.unlink()
 
             chunks_path = project_path / "chunks.json"
             with open(chunks_path, 'w', encoding='utf-8') as f:
@@ -136,6 +229,14 @@ def run_pipeline_task(project_name: str, config: PipelineRunRequest):
             resume_from=resume_from,
             existing_qa=existing_qa,
         )
+
+        # 5. QA dedup, only once generation ran to the end (not stopped or failed)
+        generation_config = config.generation_config
+        progress_path = project_path / "progress.json"
+        generation_done = progress_path.exists() and json.loads(progress_path.read_text(encoding="utf-8")).get("status") == "done"
+        if generation_config.qa_dedup != "off" and generation_done:
+            logger.info(f"[{project_name}] Starting QA Dedup...")
+            run_qa_dedup(project_path, generation_config.qa_dedup_threshold, generation_config.qa_dedup)
         logger.info(f"[{project_name}] Pipeline Complete.")
 
     except Exception as e:
@@ -168,6 +269,24 @@ def run_pipeline(project_name: str, config: PipelineRunRequest, background_tasks
     background_tasks.add_task(run_pipeline_task, project_name, config)
     return {"message": "Pipeline started in background"}
 
+@router.post("/{project_name}/qa/dedup")
+def dedup_qa_pairs(
+    project_name: str,
+    background_tasks: BackgroundTasks,
+    threshold: float = Query(default=QA_DEDUP_THRESHOLD, ge=0.5, le=1.0),
+    mode: str = Query(default="drop", pattern="^(drop|cluster)$"),
+):
+    """Run semantic QA dedup over an existing qa_v1.json (report in qa_dedup_report.json)."""
+    project_path = get_project_path(project_name)
+    if (project_path / ".running").exists():
+        raise HTTPException(status_code=409, detail="Pipeline already running for this project")
+    if not (project_path / "qa_v1.json").exists():
+        raise HTTPException(status_code=404, detail="qa_v1.json not found. Run generation first.")
+    # Marked running right away, so a pipeline started meanwhile cannot write qa_v1.json
+    (project_path / ".running").touch()
+    background_tasks.add_task(run_qa_dedup_task, project_path, threshold, mode)
+    return {"message": "QA dedup started in background"}
+
 @router.post("/{project_name}/stop")
 def stop_pipeline(project_name: str):
     project_path = get_project_path(project_name)
@@ -209,6 +328,10 @@ def get_project_status(project_name: str):
         except Exception:
             pass
 
+    # ── Optional dedup reports (summaries only) ──────────────────────────
+    chunk_dedup = _get_report_summary(project_path / "chunk_dedup_report.json", "removed")
+    qa_dedup = _get_report_summary(project_path / "qa_dedup_report.json", "examples")
+
     return {
         # ── canonical aliases ─────────────────────────────────────────────
         "raw":       has_raw,
@@ -231,6 +354,69 @@ def get_project_status(project_name: str):
         "qa_count":    _get_qa_count(project_path),
         "chunk_count": _get_chunk_count(project_path),
         "progress":    progress,
+        "chunk_dedup": chunk_dedup,
+        "qa_dedup":    qa_dedup,
+    }
+
+
+@router.get("/{project_name}/refine/sweep")
+def sweep_similarity_threshold(
+    project_name: str,
+    start: float = Query(default=0.80, ge=0.0, le=1.0),
+    stop: float = Query(default=0.99, ge=0.0, le=1.0),
+    step: float = Query(default=0.01, gt=0.0, le=1.0),
+    max_merged_tokens: Optional[int] = Query(default=None, ge=1),
+):
+    """
+    Chunk counts and token distributions the refiner would produce for a range
+    of similarity thresholds, computed from cached embeddings (no re-run needed).
+    max_merged_tokens defaults to the cap of the pipeline run that saved the profile.
+    Counts replay incremental merging; for a run in exact mode they are an estimate.
+    """
+    project_path = get_project_path(project_name)
+    profile_path = project_path / "similarity.json"
+    if not profile_path.exists():
+        raise HTTPException(status_code=404, detail="Similarity profile not available yet. Run the pipeline first.")
+    if stop < start:
+        raise HTTPException(status_code=400, detail="stop must be greater than or equal to start")
+    thresholds = np.round(np.arange(start, stop + step / 2, step), 4).tolist()
+    if len(thresholds) > 200:
+        raise HTTPException(status_code=400, detail="Too many thresholds requested (max 200)")
+
+    profile = json.loads(profile_path.read_text(encoding="utf-8"))
+    if not embedding_refiner.produces(profile["model"]):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Similarity profile was computed with '{profile['model']}'. Re-run the pipeline with the current model.",
+        )
+    # Keyed by the stored model id so a sweep never waits for the model to load
+    cache = embedding_refiner.get_cache(project_path, profile["model"])
+    vectors, missing = cache.get(profile["keys"]) if cache is not None else (None, profile["keys"])
+    if missing:
+        raise HTTPException(
+            status_code=409,
+            detail="Chunk embeddings are not cached for this project. Enable EMBEDDING_CACHE and re-run the pipeline.",
+        )
+
+    if max_merged_tokens is None:
+        max_merged_tokens = profile.get("max_merged_tokens")
+    merge_mode = profile.get("merge_mode", "exact")
+
+    adjacent = np.asarray(profile["adjacent_similarity"], dtype=np.float32)
+    histogram, edges = np.histogram(adjacent, bins=20, range=(0.0, 1.0))
+    return {
+        "chunk_count": len(profile["keys"]),
+        "max_merged_tokens": max_merged_tokens,
+        "merge_mode": merge_mode,
+        # Exact mode re-encodes merged text, which a sweep over cached vectors cannot replay
+        "estimated": merge_mode != "incremental",
+        "results": embedding_refiner.sweep_thresholds(
+            vectors, profile["token_counts"], thresholds, max_merged_tokens=max_merged_tokens
+        ),
+        "adjacent_similarity_histogram": {
+            "counts": histogram.tolist(),
+            "edges": np.round(edges, 2).tolist(),
+        },
     }
 
 
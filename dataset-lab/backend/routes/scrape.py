@@ -16,10 +16,35 @@ async def start_scraping_job(request: ScrapeRequest):
     """
     if not request.urls and not request.query and not request.category:
         raise HTTPException(status_code=400, detail="Must provide at least one of: urls, query, or category.")
+    # A new crawl replaces the project's crawl state, which a running crawl is still writing
+    if manager.is_crawling(request.project_name):
+        raise HTTPException(status_code=409, detail="A crawl is already running for this project.")
         
     task_id = manager.start_job(request)
     return {"message": "Scraping job started successfully.", "task_id": task_id}
 
+@router.post("/resume/{project_name}")
+async def resume_scraping_job(project_name: str):
+    """
+    Resume the project's last crawl where it stopped (after a restart, crash,
+    failure or cancellation), skipping every URL it already crawled.
+    """
+    saved = manager.saved_crawl(project_name)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="No saved crawl found for this project.")
+    if saved["status"] == "completed":
+        raise HTTPException(status_code=400, detail="The last crawl for this project already completed.")
+    if manager.is_crawling(project_name):
+        raise HTTPException(status_code=409, detail="A crawl is already running for this project.")
+
+    task_id = manager.resume_job(project_name)
+    return {
+        "message": "Scraping job resumed successfully.",
+        "task_id": task_id,
+        "pages_done": saved["pages_done"],
+        "pending_urls": saved["pending_urls"],
+    }
+
 @router.post("/refine")
 async def start_refining_job(request: RefineRequest):
     """
@@ -1,7 +1,10 @@
+import hashlib
 import os
 import shutil
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 import json
 from datetime import datetime
 from backend.config import settings
@@ -66,3 +69,102 @@ def save_raw_text(project_name: str, content: str):
     path.mkdir(parents=True, exist_ok=True)
     with open(path / "raw.txt", "w", encoding="utf-8") as f:
         f.write(content)
+
+class TextAppender:
+    """
+    Appends text to a file through an in-memory buffer, for long-running
+    writers such as a crawl streaming into raw.txt: memory stays bounded by
+    the buffer and a crash loses at most the unflushed part.
+
+    snapshot_if_dirty() hands the buffered text to a writer that appends,
+    flushes and fsyncs it (to run in a thread), once `every` characters are
+    buffered or the oldest buffered text is flush_interval seconds old.
+    """
+
+    # Bytes before a recorded size that mark() hashes
+    FINGERPRINT_BYTES = 64 * 1024
+
+    def __init__(self, path, flush_interval: float = 5.0):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        # Characters written to the file so far
+        self.written = 0
+        self._parts: List[str] = []
+        self._size = 0
+        self._since = 0.0
+        self._lock = threading.Lock()
+
+    def append(self, text: str):
+        if not self._parts:
+            self._since = time.monotonic()
+        self._parts.append(text)
+        self._size += len(text)
+
+    def snapshot_if_dirty(self, every: int = 1) -> Optional[Callable[[], None]]:
+        if self._parts and (self._size >= every or time.monotonic() - self._since >= self.flush_interval):
+            return self.snapshot()
+        return None
+
+    def snapshot(self) -> Callable[[], None]:
+        data = "".join(self._parts)
+        self._parts, self._size = [], 0
+        return lambda: self._write(data)
+
+    def _write(self, data: str):
+        if not data:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self.written += len(data)
+
+    def file_size(self) -> int:
+        """Current size of the file in bytes (0 when it does not exist yet)."""
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def fingerprint(self, size: int) -> str:
+        """
+        Hash of the FINGERPRINT_BYTES that end at offset size. Appends leave
+        it unchanged, so it tells whether the file still holds the text a
+        recorded size referred to ("" when the file is shorter than size).
+        """
+        start = max(0, size - self.FINGERPRINT_BYTES)
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                window = f.read(size - start)
+        except FileNotFoundError:
+            window = b""
+        if len(window) < size - start:
+            return ""
+        return hashlib.sha1(window).hexdigest()
+
+    def mark(self) -> Tuple[int, str]:
+        """Current size of the file and its fingerprint, for truncate() after a crash."""
+        with self._lock:
+            size = self.file_size()
+            return size, self.fingerprint(size)
+
+    def truncate(self, size: int, fingerprint: Optional[str] = None) -> Optional[int]:
+        """
+        Cuts the file back to size bytes, dropping text appended after a
+        recorded point (see CrawlFrontier), and returns the bytes removed.
+        A file that was replaced since (smaller than size, or whose text up
+        to size no longer matches fingerprint) is left alone and None is returned.
+        """
+        with self._lock:
+            current = self.file_size()
+            if current < size or (fingerprint is not None and self.fingerprint(size) != fingerprint):
+                return None
+            if current == size:
+                return 0
+            with open(self.path, "r+b") as f:
+                f.truncate(size)
+                os.fsync(f.fileno())
+            return current - size
@@ -0,0 +1,45 @@
+"""
+Benchmark: API cold-start time.
+
+Measures how long a fresh interpreter takes to import backend.main (what
+uvicorn does before it can serve requests) and whether the embedding model
+was loaded as part of that import.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_api_cold_start.py --runs 3
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import time
+start = time.perf_counter()
+import backend.main
+from backend.engines.embedding_refiner import embedding_refiner
+print(f"{time.perf_counter() - start:.3f} {embedding_refiner.is_ready}")
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    timings = []
+    for i in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        secs, ready = out.split()
+        timings.append(float(secs))
+        print(f"run {i + 1}: import backend.main took {float(secs):.2f}s (model loaded at import: {ready})")
+
+    print(f"best: {min(timings):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: API-side latency while embeddings are being computed.
+
+Simulates a /status poll (small pure-Python work) in a loop while another
+thread embeds a few thousand chunks, once with inference inside the API
+process and once with the dedicated embedding worker process.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_api_latency_during_refine.py --chunks 3000
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.engines.embedding_refiner import EmbeddingRefiner
+from bench_embedding_refiner import make_chunks
+
+
+def status_poll():
+    """Roughly the work get_project_status does per request."""
+    payload = {f"flag_{i}": bool(i % 2) for i in range(50)}
+    return json.loads(json.dumps(payload))
+
+
+def measure(refiner, texts):
+    refiner.embed(texts[:8])
+    done = threading.Event()
+
+    def work():
+        refiner.embed(texts)
+        done.set()
+
+    worker = threading.Thread(target=work)
+    worker.start()
+    latencies = []
+    while not done.is_set():
+        start = time.perf_counter()
+        status_poll()
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    worker.join()
+    return np.asarray(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = [c['text'] for c in make_chunks(args.chunks)]
+    for workers in (0, args.workers):
+        refiner = EmbeddingRefiner(workers=workers)
+        lat = measure(refiner, texts)
+        refiner.shutdown()
+        label = "in-process" if workers == 0 else f"{workers} worker(s)"
+        print(f"{label:<12} polls={len(lat):5d} p50={np.percentile(lat, 50):7.3f}ms "
+              f"p99={np.percentile(lat, 99):7.3f}ms max={lat.max():7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: CleaningEngine throughput and golden-output check.
+
+Runs the original multi-pass cleaner (kept below as the reference) and the
+current CleaningEngine over a corpus, asserts byte-identical output and
+prints speed plus the per-rule report.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_cleaning.py                 # synthetic corpus
+    python benchmarks/bench_cleaning.py --corpus DIR    # every *.txt in DIR
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.engines.cleaning import cleaning_engine
+
+
+def reference_process(text: str) -> str:
+    """The original CleaningEngine.process, used as the golden reference."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
+    lines = [line for line in lines if not re.match(r'^\s*\d+\s*$', line)]
+    stripped_lines = [l.strip() for l in lines if l.strip()]
+    if stripped_lines:
+        line_counts = Counter(stripped_lines)
+        repeated_headers = {line for line, count in line_counts.items() if count > 3 and len(line.split()) < 10}
+        lines = [line for line in lines if line.strip() not in repeated_headers]
+    cleaned_lines = []
+    short_line_buffer = []
+    for line in lines:
+        line = line.strip()
+        line = "".join(ch for ch in line if ch.isprintable())
+        if re.match(r'^[•\-\*]\s+', line):
+            line = re.sub(r'^[•\-\*]\s+', '* ', line)
+        words = line.split()
+        if len(words) < 3:
+            if re.search(r'[a-zA-Z0-9]', line):
+                short_line_buffer.append(line)
+            continue
+        if short_line_buffer:
+            line = " ".join(short_line_buffer) + " " + line
+            short_line_buffer = []
+        cleaned_lines.append(line)
+    if short_line_buffer:
+        if cleaned_lines:
+            cleaned_lines[-1] += " " + " ".join(short_line_buffer)
+        else:
+            cleaned_lines.append(" ".join(short_line_buffer))
+    text = '\n'.join(cleaned_lines)
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+WORDS = "the quick brown fox jumps over lazy dog data set model token chunk página naïve".split()
+ODDITIES = ["\x00", "\x0b", "​", "﻿", "\t\t", "   ", " ", "\x7f", " "]
+
+
+def synthetic_document(rng: random.Random, lines: int) -> str:
+    out = []
+    for i in range(lines):
+        kind = rng.random()
+        if kind < 0.05:
+            out.append(f"  {rng.randint(1, 400)} ")
+        elif kind < 0.12:
+            out.append("Chapter Header — Confidential")
+        elif kind < 0.2:
+            out.append(rng.choice(["• ", "- ", "* ", "-"]) + " ".join(rng.choices(WORDS, k=rng.randint(1, 8))))
+        elif kind < 0.3:
+            out.append(" ".join(rng.choices(WORDS, k=rng.randint(1, 2))))
+        elif kind < 0.35:
+            out.append(rng.choice(["", " ", "---", "***"]))
+        else:
+            words = rng.choices(WORDS, k=rng.randint(3, 25))
+            if rng.random() < 0.3:
+                words.insert(rng.randint(0, len(words)), rng.choice(ODDITIES))
+            out.append(" ".join(words))
+    return rng.choice(["\n", "\r\n"]).join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=None)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.corpus:
+        docs = [p.read_text(encoding="utf-8") for p in sorted(args.corpus.glob("*.txt"))]
+    else:
+        rng = random.Random(0)
+        docs = [synthetic_document(rng, args.lines) for _ in range(args.docs)]
+
+    start = time.perf_counter()
+    expected = [reference_process(d) for d in docs]
+    reference_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [cleaning_engine.process(d) for d in docs]
+    engine_secs = time.perf_counter() - start
+
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    size_mb = sum(len(d.encode('utf-8')) for d in docs) / 1e6
+    print(f"documents: {len(docs)} ({size_mb:.1f} MB)")
+    print(f"reference: {size_mb / reference_secs:7.2f} MB/s ({reference_secs:.2f}s)")
+    print(f"engine:    {size_mb / engine_secs:7.2f} MB/s ({engine_secs:.2f}s)  speedup {reference_secs / engine_secs:.2f}x")
+    print(f"byte-identical: {not mismatches} ({len(mismatches)} mismatching documents)")
+
+    _, report = cleaning_engine.process_with_report(docs[0])
+    print(json.dumps(report, indent=2))
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: PyTorch vs quantized ONNX Runtime embedding backends on CPU.
+
+Checks parity of the cosine similarities the refiner relies on (adjacent
+chunk pairs) between the two backends, and reports CPU throughput.
+
+Run from the dataset-lab directory (needs `pip install "optimum[onnxruntime]"`):
+    python benchmarks/bench_embedding_backends.py --chunks 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.config import settings
+from backend.engines.embedding_refiner import EmbeddingRefiner
+from bench_embedding_refiner import make_chunks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=settings.DEFAULT_SIMILARITY_THRESHOLD)
+    parser.add_argument("--onnx-file", default=settings.EMBEDDING_ONNX_FILE)
+    args = parser.parse_args()
+
+    settings.EMBEDDING_ONNX_FILE = args.onnx_file
+    texts = [c['text'] for c in make_chunks(args.chunks)]
+
+    results = {}
+    for backend in ("torch", "onnx"):
+        refiner = EmbeddingRefiner(backend=backend, workers=0)
+        refiner.embed(texts[:8])
+        if refiner.backend != backend:
+            print(f"{backend}: not available (fell back to {refiner.backend}); skipping")
+            continue
+        start = time.perf_counter()
+        vectors = refiner.embed(texts)
+        secs = time.perf_counter() - start
+        results[backend] = vectors
+        print(f"{backend:<6} {len(texts) / secs:8.1f} texts/sec ({secs:.2f}s)")
+
+    if len(results) < 2:
+        return
+
+    torch_vecs, onnx_vecs = results["torch"], results["onnx"]
+    self_cos = np.einsum('ij,ij->i', torch_vecs, onnx_vecs)
+    torch_adj = np.einsum('ij,ij->i', torch_vecs[:-1], torch_vecs[1:])
+    onnx_adj = np.einsum('ij,ij->i', onnx_vecs[:-1], onnx_vecs[1:])
+    diff = np.abs(torch_adj - onnx_adj)
+    flips = int(np.sum((torch_adj > args.threshold) != (onnx_adj > args.threshold)))
+
+    print(f"torch vs onnx vector cosine: min={self_cos.min():.4f} mean={self_cos.mean():.4f}")
+    print(f"adjacent similarity abs diff: max={diff.max():.4f} mean={diff.mean():.5f}")
+    print(f"merge decisions flipped at threshold {args.threshold}: {flips}/{len(diff)}")
+
+
+if __name__ == "__main__":
+    main()
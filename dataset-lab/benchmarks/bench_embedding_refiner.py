@@ -0,0 +1,96 @@
+"""
+Benchmark: EmbeddingRefiner.refine throughput (chunks/sec).
+
+Compares the original one-encode-per-chunk loop against the batched refiner
+and checks that both produce the same merge decisions.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_embedding_refiner.py --chunks 3000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sentence_transformers import util
+from backend.engines.embedding_refiner import EmbeddingRefiner
+
+# In-process model so both variants pay the same inference cost
+embedding_refiner = EmbeddingRefiner(workers=0)
+
+TOPICS = [
+    "The mitochondria is the powerhouse of the cell and produces ATP through respiration.",
+    "Interest rates set by the central bank influence mortgage costs and business lending.",
+    "The transformer architecture relies on self-attention to model long range dependencies.",
+    "Volcanic eruptions release ash and sulfur dioxide that can cool the global climate.",
+    "Medieval castles were built with thick stone walls, moats and defensive towers.",
+]
+
+
+def make_chunks(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    chunks = []
+    topic = rng.choice(TOPICS)
+    for i in range(n):
+        # Runs of related chunks followed by topic switches, like real documents
+        if rng.random() < 0.2:
+            topic = rng.choice(TOPICS)
+        words = topic.split()
+        rng.shuffle(words)
+        text = topic + " " + " ".join(words[: rng.randint(5, len(words))])
+        chunks.append({"chunk_id": i, "text": text, "token_count": len(text) // 4})
+    return chunks
+
+
+def legacy_refine(chunks, threshold):
+    """The pre-batching implementation, kept here as the baseline."""
+    model = embedding_refiner.model
+    refined = []
+    buffer_chunk = chunks[0].copy()
+    buffer_emb = model.encode(buffer_chunk['text'], convert_to_tensor=True)
+    for next_chunk in chunks[1:]:
+        next_emb = model.encode(next_chunk['text'], convert_to_tensor=True)
+        sim = util.pytorch_cos_sim(buffer_emb, next_emb).item()
+        if sim > threshold:
+            buffer_chunk['text'] += " " + next_chunk['text']
+            buffer_emb = model.encode(buffer_chunk['text'], convert_to_tensor=True)
+        else:
+            refined.append(buffer_chunk)
+            buffer_chunk = next_chunk.copy()
+            buffer_emb = next_emb
+    refined.append(buffer_chunk)
+    return refined
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=3000)
+    parser.add_argument("--threshold", type=float, default=0.92)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    embedding_refiner.embed(["warmup"])
+
+    start = time.perf_counter()
+    before = legacy_refine([c.copy() for c in chunks], args.threshold)
+    legacy_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = embedding_refiner.refine([c.copy() for c in chunks], args.threshold, batch_size=args.batch_size)
+    batched_secs = time.perf_counter() - start
+
+    print(f"chunks:            {len(chunks)}")
+    print(f"per-chunk encode:  {len(chunks) / legacy_secs:8.1f} chunks/sec ({legacy_secs:.2f}s)")
+    print(f"batched encode:    {len(chunks) / batched_secs:8.1f} chunks/sec ({batched_secs:.2f}s)")
+    print(f"speedup:           {legacy_secs / batched_secs:.2f}x")
+
+    same = [c['text'] for c in before] == [c['text'] for c in after]
+    print(f"identical merges:  {same} ({len(before)} vs {len(after)} refined chunks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: tiered article extraction against readability alone.
+
+Runs extract_content (plain text / semantic container / readability
+fallback) and extract_article (always readability) over a saved page
+corpus (every *.html file under --corpus) or synthetic pages. Reports the
+tier mix, per-page time, and how closely the fast tiers' text matches
+readability's (word-set Jaccard), listing the pages that differ most.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_extraction_tiers.py --corpus path/to/saved/pages
+    python benchmarks/bench_extraction_tiers.py --pages 200
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.engines.scraping.text_scraper import extract_article, extract_content, parse_html
+
+BASE_URL = "https://example.com/docs/page.html"
+
+
+def make_pages(n, seed=0):
+    """Mix of <article> pages, listing pages with several articles, div soup and plain text."""
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(5000)]
+
+    def para(k=120):
+        return " ".join(rng.choices(vocab, k=k))
+
+    nav = "".join(f'<li><a href="/section/{j}">Section {j}</a></li>' for j in range(40))
+    pages = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            body = "<article><h1>Page {}</h1>{}</article>".format(
+                i, "".join(f"<h2>Heading {k}</h2><p>{para()}</p>" for k in range(8)))
+        elif kind == 1:
+            body = "".join(f"<article><h2><a href='/post/{k}'>Post {k}</a></h2><p>{para(30)}</p></article>"
+                           for k in range(10))
+        elif kind == 2:
+            body = "<div class='content'>{}</div>".format("".join(f"<div><p>{para()}</p></div>" for _ in range(8)))
+        else:
+            pages.append("\n\n".join(para() for _ in range(8)))
+            continue
+        pages.append(
+            f"<html><head><title>Page {i}</title><script>var x = {i};</script></head><body>"
+            f"<nav><ul>{nav}</ul></nav><main>{body}</main>"
+            f'<footer><a href="/about">About</a></footer></body></html>'
+        )
+    return pages
+
+
+def tiered(html):
+    return extract_content(html if "<" not in html[:4096] else parse_html(html), BASE_URL)
+
+
+def readability_only(html):
+    return extract_article(parse_html(html), BASE_URL)
+
+
+def time_pages(extract, pages):
+    results, times = [], []
+    for html in pages:
+        start = time.perf_counter()
+        results.append(extract(html))
+        times.append(time.perf_counter() - start)
+    return results, times
+
+
+def summarize(name, times):
+    ms = sorted(t * 1000 for t in times)
+    print(f"{name:<12} mean {statistics.mean(ms):7.2f} ms/page  p50 {ms[len(ms) // 2]:7.2f}  "
+          f"p95 {ms[int(len(ms) * 0.95)]:7.2f}  total {sum(ms) / 1000:.2f}s")
+
+
+def jaccard(a, b):
+    a, b = set(a.split()), set(b.split())
+    return len(a & b) / max(1, len(a | b))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, help="directory of saved *.html pages")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages when no corpus is given")
+    parser.add_argument("--limit", type=int, default=0, help="use at most this many corpus pages")
+    parser.add_argument("--show", type=int, default=5, help="list this many least similar pages")
+    args = parser.parse_args()
+
+    if args.corpus:
+        paths = sorted(args.corpus.rglob("*.html"))
+        if args.limit:
+            paths = paths[:args.limit]
+        names = [str(p.relative_to(args.corpus)) for p in paths]
+        pages = [p.read_text(encoding="utf-8", errors="replace") for p in paths]
+    else:
+        pages = make_pages(args.pages)
+        names = [f"synthetic #{i}" for i in range(len(pages))]
+    print(f"pages: {len(pages)}  total size: {sum(len(p) for p in pages) / 1e6:.1f} MB")
+
+    fast, fast_times = time_pages(tiered, pages)
+    slow, slow_times = time_pages(readability_only, pages)
+    summarize("tiered", fast_times)
+    summarize("readability", slow_times)
+    print(f"speedup: {sum(slow_times) / sum(fast_times):.2f}x")
+
+    tiers = Counter(a.get("extraction", {}).get("tier", "failed") for a in fast)
+    print("tiers: " + ", ".join(f"{tier} {count}" for tier, count in tiers.most_common()))
+
+    similarity = sorted(
+        (jaccard(a.get("text", ""), b.get("text", "")), name, a["extraction"]["tier"])
+        for a, b, name in zip(fast, slow, names) if a and a["extraction"]["tier"] != "readability"
+    )
+    if similarity:
+        scores = [s for s, _, _ in similarity]
+        print(f"fast-tier text vs readability (word Jaccard): median {statistics.median(scores):.3f}  "
+              f"min {scores[0]:.3f}  >=0.9 on {sum(s >= 0.9 for s in scores)}/{len(scores)}")
+        for score, name, tier in similarity[:args.show]:
+            print(f"  {score:.3f}  {tier:<8} {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: per-page HTML parsing for article, link and image extraction.
+
+Compares the original path (readability on the raw string, plus separate
+BeautifulSoup html.parser trees for the summary text, links and images)
+with one lxml parse per page shared by all three extractors, over a saved
+page corpus (every *.html file under --corpus) or synthetic pages. Reports
+per-page time and how many pages give identical text, links and images.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_html_parsing.py --corpus path/to/saved/pages
+    python benchmarks/bench_html_parsing.py --pages 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+from readability import Document
+
+from backend.engines.scraping.image_scraper import MIN_IMAGE_SIZE, extract_image_urls, is_valid_image_url
+from backend.engines.scraping.text_scraper import extract_article, extract_links, parse_html
+
+BASE_URL = "https://example.com/docs/page.html"
+
+
+def legacy_extract(html, url):
+    """The three-tree path this benchmark replaces (bs4 must be installed)."""
+    doc = Document(html)
+    title = doc.title()
+    readable_html = doc.summary()
+    soup = BeautifulSoup(readable_html, "html.parser")
+    article = {
+        "title": title,
+        "headings": [h.get_text(strip=True) for h in soup.find_all(['h1', 'h2', 'h3', 'h4'])],
+        "text": soup.get_text(separator="\n", strip=True),
+    }
+
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
+    skip_patterns = ['/login', '?sort=', '/cart', 'signup', 'register', '#', 'javascript:']
+    for a in soup.find_all('a', href=True):
+        href = a['href']
+        if any(skip in href.lower() for skip in skip_patterns):
+            continue
+        full_url = urljoin(url, href)
+        if full_url.startswith('http'):
+            links.append(full_url)
+    links = list(dict.fromkeys(links))
+
+    soup = BeautifulSoup(html, 'html.parser')
+    images = []
+    for img in soup.find_all('img'):
+        src = img.get('src')
+        if not src:
+            continue
+        full_url = urljoin(url, src)
+        if not is_valid_image_url(full_url):
+            continue
+        context_parts = []
+        if img.get('alt', ''): context_parts.append(f"Alt: {img.get('alt', '')}")
+        if img.get('title', ''): context_parts.append(f"Title: {img.get('title', '')}")
+        filename = os.path.basename(urlparse(full_url).path)
+        if filename: context_parts.append(f"Filename: {filename}")
+        parent_text = img.parent.get_text(separator=" ", strip=True)[:200]
+        if parent_text: context_parts.append(f"Paragraph: {parent_text}")
+        try:
+            if int(img.get('width', 999)) < MIN_IMAGE_SIZE[0] or int(img.get('height', 999)) < MIN_IMAGE_SIZE[1]:
+                continue
+        except ValueError:
+            pass
+        images.append({'url': full_url, 'heuristic_label': " | ".join(context_parts)})
+    return article, links, images
+
+
+def single_parse_extract(html, url):
+    tree = parse_html(html)
+    links = extract_links(tree, url)
+    images = extract_image_urls(tree, url)
+    article = extract_article(tree, url)
+    return {k: article.get(k) for k in ("title", "headings", "text")}, links, images
+
+
+def make_pages(n, seed=0):
+    rng = random.Random(seed)
+    vocab = [f"word{i}" for i in range(5000)]
+    pages = []
+    for i in range(n):
+        nav = "".join(f'<li><a href="/section/{j}">Section {j}</a></li>' for j in range(40))
+        paragraphs = "".join(
+            f"<h2>Heading {k}</h2><p>{' '.join(rng.choices(vocab, k=120))}</p>"
+            f'<figure><img src="/img/{i}_{k}.jpg" alt="figure {k}" width="640" height="480">'
+            f"<figcaption>{' '.join(rng.choices(vocab, k=12))}</figcaption></figure>"
+            for k in range(8)
+        )
+        pages.append(
+            f"<html><head><title>Page {i}</title><script>var x = {i};</script></head><body>"
+            f"<nav><ul>{nav}</ul></nav><main><article><h1>Page {i}</h1>{paragraphs}</article></main>"
+            f'<footer><a href="/login">Log in</a> <a href="/about">About</a></footer></body></html>'
+        )
+    return pages
+
+
+def time_pages(extract, pages):
+    results, times = [], []
+    for html in pages:
+        start = time.perf_counter()
+        results.append(extract(html, BASE_URL))
+        times.append(time.perf_counter() - start)
+    return results, times
+
+
+def summarize(name, times):
+    ms = sorted(t * 1000 for t in times)
+    print(f"{name:<16} mean {statistics.mean(ms):7.2f} ms/page  p50 {ms[len(ms) // 2]:7.2f}  "
+          f"p95 {ms[int(len(ms) * 0.95)]:7.2f}  total {sum(ms) / 1000:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, help="directory of saved *.html pages")
+    parser.add_argument("--pages", type=int, default=200, help="synthetic pages when no corpus is given")
+    parser.add_argument("--limit", type=int, default=0, help="use at most this many corpus pages")
+    args = parser.parse_args()
+
+    if args.corpus:
+        paths = sorted(args.corpus.rglob("*.html"))
+        if args.limit:
+            paths = paths[:args.limit]
+        pages = [p.read_text(encoding="utf-8", errors="replace") for p in paths]
+    else:
+        pages = make_pages(args.pages)
+    print(f"pages: {len(pages)}  total size: {sum(len(p) for p in pages) / 1e6:.1f} MB")
+
+    legacy, legacy_times = time_pages(legacy_extract, pages)
+    single, single_times = time_pages(single_parse_extract, pages)
+    summarize("bs4 x3 + string", legacy_times)
+    summarize("lxml x1", single_times)
+    print(f"speedup: {sum(legacy_times) / sum(single_times):.2f}x")
+
+    for i, part in enumerate(("article", "links", "images")):
+        same = sum(a[i] == b[i] for a, b in zip(legacy, single))
+        print(f"identical {part:<8} {same}/{len(pages)}")
+
+
+if __name__ == "__main__":
+    main()
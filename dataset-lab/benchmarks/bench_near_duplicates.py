@@ -0,0 +1,89 @@
+"""
+Benchmark: near-duplicate detection while crawling.
+
+Streams synthetic pages (with planted near-duplicates: earlier pages with a
+few words edited) through the original is_near_duplicate scan and through
+MinHashLSH, reporting throughput and how many planted duplicates each finds.
+The original scan is O(n^2), so it only runs on the first --legacy-docs pages.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_near_duplicates.py --docs 10000
+    python benchmarks/bench_near_duplicates.py --docs 100000 --legacy-docs 500
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.engines.processing.deduplicator import MinHashLSH, is_near_duplicate
+
+
+def make_pages(n: int, words_per_page: int, dup_rate: float, seed: int = 0):
+    """Returns (pages, planted) where planted[i] is True for edited copies of earlier pages."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(20000)]
+    pages, planted = [], []
+    for i in range(n):
+        if pages and rng.random() < dup_rate:
+            words = rng.choice(pages).split()
+            for _ in range(max(1, len(words) // 50)):
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+            pages.append(" ".join(words))
+            planted.append(True)
+        else:
+            pages.append(" ".join(rng.choices(vocab, k=words_per_page)))
+            planted.append(False)
+    return pages, planted
+
+
+def run_legacy(pages):
+    seen_vectors = []
+    return [is_near_duplicate(p, seen_vectors) for p in pages]
+
+
+def run_lsh(pages, threshold):
+    index = MinHashLSH(threshold=threshold)
+    return [index.check_and_add(i, p) is not None for i, p in enumerate(pages)], index
+
+
+def summarize(name, flags, planted, secs):
+    found = sum(f and p for f, p in zip(flags, planted))
+    false_pos = sum(f and not p for f, p in zip(flags, planted))
+    print(f"{name:<22} {len(flags) / secs:9.0f} pages/sec ({secs:.2f}s)  "
+          f"planted found {found}/{sum(planted)}  false positives {false_pos}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--legacy-docs", type=int, default=500)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--dup-rate", type=float, default=0.1)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    pages, planted = make_pages(args.docs, args.words, args.dup_rate)
+    print(f"pages: {len(pages)}  planted near-duplicates: {sum(planted)}")
+
+    legacy_n = min(args.legacy_docs, len(pages))
+    start = time.perf_counter()
+    legacy_flags = run_legacy(pages[:legacy_n])
+    legacy_secs = time.perf_counter() - start
+    summarize(f"cosine scan ({legacy_n})", legacy_flags, planted[:legacy_n], legacy_secs)
+    # Quadratic: every page is compared with every novel page before it
+    projected = legacy_secs * (len(pages) / legacy_n) ** 2
+    print(f"{'':<22} projected for {len(pages)} pages: {projected:.0f}s")
+
+    start = time.perf_counter()
+    lsh_flags, index = run_lsh(pages, args.threshold)
+    lsh_secs = time.perf_counter() - start
+    summarize(f"minhash lsh ({len(pages)})", lsh_flags, planted, lsh_secs)
+    print(f"{'':<22} bands x rows: {index.bands} x {index.rows}  indexed: {len(index)}")
+    print(f"projected speedup: {projected / lsh_secs:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: QA question dedup index at scale.
+
+Builds synthetic L2-normalized question embeddings with planted
+near-duplicates (noisy copies of earlier rows) in an on-disk memmap, runs
+QADeduplicator.cluster_vectors and reports time, peak RSS and how many
+planted duplicates were clustered with their source.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_qa_dedup.py --pairs 500000
+    python benchmarks/bench_qa_dedup.py --pairs 50000 --index chroma
+"""
+import argparse
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.engines.qa_dedup import qa_deduplicator
+
+
+def make_vectors(path: Path, n: int, dim: int, dup_rate: float, noise: float, seed: int = 0):
+    """Returns (memmap vectors, source) where source[i] is the planted original of row i, or -1."""
+    rng = np.random.default_rng(seed)
+    vectors = np.memmap(path, dtype=np.float32, mode="w+", shape=(n, dim))
+    source = np.full(n, -1, dtype=np.int64)
+    for start in range(0, n, 50000):
+        stop = min(start + 50000, n)
+        block = rng.standard_normal((stop - start, dim)).astype(np.float32)
+        for row in range(start, stop):
+            if row > 0 and rng.random() < dup_rate:
+                src = int(rng.integers(0, row))
+                original = vectors[src] if src < start else block[src - start]
+                block[row - start] = original + noise * rng.standard_normal(dim).astype(np.float32)
+                source[row] = src
+            block[row - start] /= np.linalg.norm(block[row - start])
+        vectors[start:stop] = block
+    vectors.flush()
+    return vectors, source
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=500000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dup-rate", type=float, default=0.05)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--threshold", type=float, default=0.95)
+    parser.add_argument("--index", default="numpy", choices=["numpy", "chroma"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vectors, source = make_vectors(Path(tmp) / "vectors.f32", args.pairs, args.dim, args.dup_rate, args.noise)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        start = time.perf_counter()
+        roots = qa_deduplicator.cluster_vectors(vectors, args.threshold, index=args.index, work_dir=Path(tmp))
+        secs = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        planted = np.flatnonzero(source >= 0)
+        found = int(np.sum(roots[planted] == roots[source[planted]]))
+        removed = int(np.sum(roots != np.arange(len(roots))))
+        print(f"pairs: {args.pairs}  dim: {args.dim}  index: {args.index}")
+        print(f"time: {secs:.1f}s ({args.pairs / secs:.0f} pairs/sec)")
+        print(f"peak RSS: {rss_after:.0f} MB (before dedup {rss_before:.0f} MB, vectors on disk "
+              f"{vectors.nbytes / 1e6:.0f} MB)")
+        print(f"planted duplicates clustered: {found}/{len(planted)}  removed: {removed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: exact vs incremental merge modes of EmbeddingRefiner.refine.
+
+Reports wall time, the number of tokens sent through the model and how closely
+the incremental chunk boundaries match the exact (re-encoding) ones.
+
+Run from the dataset-lab directory:
+    python benchmarks/bench_refiner_merge_modes.py --chunks 2000 --threshold 0.8
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.engines.embedding_refiner import embedding_refiner
+from bench_embedding_refiner import make_chunks
+
+
+def boundaries(refined):
+    """Cumulative token offsets at which each refined chunk ends."""
+    offsets, total = set(), 0
+    for c in refined[:-1]:
+        total += len(c['text'].split())
+        offsets.add(total)
+    return offsets
+
+
+def run(chunks, mode, threshold, max_merged_tokens):
+    encoded_tokens = 0
+    original_embed = embedding_refiner.embed
+
+    def counting_embed(texts, batch_size=None):
+        nonlocal encoded_tokens
+        encoded_tokens += sum(len(t.split()) for t in texts)
+        return original_embed(texts, batch_size=batch_size)
+
+    embedding_refiner.embed = counting_embed
+    try:
+        start = time.perf_counter()
+        refined = embedding_refiner.refine(
+            [c.copy() for c in chunks], threshold,
+            merge_mode=mode, max_merged_tokens=max_merged_tokens,
+        )
+        secs = time.perf_counter() - start
+    finally:
+        embedding_refiner.embed = original_embed
+    return refined, secs, encoded_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--max-merged-tokens", type=int, default=None)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    embedding_refiner.embed(["warmup"])
+
+    exact, exact_secs, exact_tokens = run(chunks, "exact", args.threshold, args.max_merged_tokens)
+    incr, incr_secs, incr_tokens = run(chunks, "incremental", args.threshold, args.max_merged_tokens)
+
+    b_exact, b_incr = boundaries(exact), boundaries(incr)
+    shared = len(b_exact & b_incr)
+    precision = shared / len(b_incr) if b_incr else 1.0
+    recall = shared / len(b_exact) if b_exact else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+    print(f"{'mode':<12} {'secs':>8} {'tokens encoded':>15} {'chunks out':>11}")
+    print(f"{'exact':<12} {exact_secs:8.2f} {exact_tokens:15d} {len(exact):11d}")
+    print(f"{'incremental':<12} {incr_secs:8.2f} {incr_tokens:15d} {len(incr):11d}")
+    print(f"boundary agreement: precision={precision:.3f} recall={recall:.3f} f1={f1:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ export const projectApi = {
     },
     runPipeline: (name, config, resume = false) => api.post(`/projects/${name}/run`, { ...config, resume }).then(res => res.data),
     stopPipeline: (name) => api.post(`/projects/${name}/stop`).then(res => res.data),
+    sweepThreshold: (name, params = {}) => api.get(`/projects/${name}/refine/sweep`, { params }).then(res => res.data),
     export: (name, format) => api.get(`/projects/${name}/export`, {
         params: { format },
         responseType: 'blob'
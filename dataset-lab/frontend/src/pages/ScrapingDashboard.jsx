@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
 import { useToast } from '../components/Toast';
-import { Globe, Search, Play, Square, Settings, RefreshCw, FileText, Image as ImageIcon, Download, Database, Check, Loader2, Zap, X, Cpu } from 'lucide-react';
+import { Globe, Search, Play, Square, Settings, RefreshCw, RotateCcw, FileText, Image as ImageIcon, Download, Database, Check, Loader2, Zap, X, Cpu } from 'lucide-react';
 import { Slider } from '../components/SettingsPanel';
 import { ProviderBtn, LocalSection, ApiSection } from '../components/LLMSetup';
 
@@ -129,6 +129,26 @@ export default function ScrapingDashboard() {
         }
     };
 
+    // Continue the project's last unfinished crawl from its saved frontier
+    const handleResumeScrape = async () => {
+        setIsScraping(true);
+        try {
+            const response = await fetch(`http://localhost:8000/scrape/resume/${encodeURIComponent(name)}`, { method: 'POST' });
+            const data = await response.json();
+            if (response.ok) {
+                toast.success(`Resuming crawl: ${data.pages_done} pages done, ${data.pending_urls} URLs queued.`);
+                setTaskId(data.task_id);
+                setActiveJobId(data.task_id);
+            } else {
+                toast.error(data.detail || 'Nothing to resume.');
+                setIsScraping(false);
+            }
+        } catch {
+            toast.error('Could not connect to server.');
+            setIsScraping(false);
+        }
+    };
+
     const handleStartRefinement = async () => {
         setIsRefining(true);
         toast.info("Starting AI Refinement Pipeline...");
@@ -260,18 +280,28 @@ export default function ScrapingDashboard() {
 
                 <div className="flex items-center gap-4">
                     {!isScraping ? (
-                        <button
-                            onClick={handleStartScrape}
-                            className={`group relative flex items-center gap-3 px-8 py-3.5 rounded-[20px] font-bold tracking-widest text-[13px] uppercase touch-manipulation select-none outline-none bg-neu-base text-neu-text shadow-[6px_6px_14px_#111315,-6px_-6px_14px_#2e343b] hover:shadow-[8px_8px_18px_#111315,-8px_-8px_18px_#2e343b] hover:-translate-y-0.5 border border-white/5 active:bg-neu-dark active:text-neu-accent active:shadow-[inset_4px_4px_10px_#0e1012,inset_-4px_-4px_10px_#272d33] active:border-black/40 active:scale-[0.98]`}
-                            style={{ transition: 'transform 0.1s cubic-bezier(0.4, 0, 0.2, 1), box-shadow 0.1s cubic-bezier(0.4, 0, 0.2, 1), background 0.15s ease' }}
-                        >
-                            <div className={`flex items-center justify-center p-2 rounded-[12px] bg-[#15181b] text-neu-accent shadow-[inset_2px_2px_4px_#0e1012,inset_-2px_-2px_4px_#272d33,0_0_12px_rgba(255,107,0,0.15)] ring-1 ring-neu-accent/20 group-active:drop-shadow-[0_0_8px_rgba(255,107,0,0.8)] transition-all duration-150`}>
-                                <Play size={16} fill="currentColor" />
-                            </div>
-                            <span className="group-hover:text-neu-accent group-active:text-neu-accent group-active:drop-shadow-[0_0_8px_rgba(255,107,0,0.4)] transition-colors">
-                                Start Scraping
-                            </span>
-                        </button>
+                        <>
+                            <button
+                                onClick={handleResumeScrape}
+                                title="Continue the last interrupted crawl"
+                                className="flex items-center gap-2 px-6 py-3.5 rounded-[20px] text-xs font-bold text-neu-dim bg-neu-base shadow-[4px_4px_10px_#111315,-4px_-4px_10px_#2e343b] hover:text-neu-accent border border-white/5 active:scale-[0.98] transition-all tracking-widest uppercase"
+                            >
+                                <RotateCcw size={13} />
+                                Resume
+                            </button>
+                            <button
+                                onClick={handleStartScrape}
+                                className={`group relative flex items-center gap-3 px-8 py-3.5 rounded-[20px] font-bold tracking-widest text-[13px] uppercase touch-manipulation select-none outline-none bg-neu-base text-neu-text shadow-[6px_6px_14px_#111315,-6px_-6px_14px_#2e343b] hover:shadow-[8px_8px_18px_#111315,-8px_-8px_18px_#2e343b] hover:-translate-y-0.5 border border-white/5 active:bg-neu-dark active:text-neu-accent active:shadow-[inset_4px_4px_10px_#0e1012,inset_-4px_-4px_10px_#272d33] active:border-black/40 active:scale-[0.98]`}
+                                style={{ transition: 'transform 0.1s cubic-bezier(0.4, 0, 0.2, 1), box-shadow 0.1s cubic-bezier(0.4, 0, 0.2, 1), background 0.15s ease' }}
+                            >
+                                <div className={`flex items-center justify-center p-2 rounded-[12px] bg-[#15181b] text-neu-accent shadow-[inset_2px_2px_4px_#0e1012,inset_-2px_-2px_4px_#272d33,0_0_12px_rgba(255,107,0,0.15)] ring-1 ring-neu-accent/20 group-active:drop-shadow-[0_0_8px_rgba(255,107,0,0.8)] transition-all duration-150`}>
+                                    <Play size={16} fill="currentColor" />
+                                </div>
+                                <span className="group-hover:text-neu-accent group-active:text-neu-accent group-active:drop-shadow-[0_0_8px_rgba(255,107,0,0.4)] transition-colors">
+                                    Start Scraping
+                                </span>
+                            </button>
+                        </>
                     ) : (
                         <div className="flex items-center gap-4">
                             <div className="flex items-center gap-3 bg-neu-dark px-5 py-3 rounded-2xl border border-black/40 shadow-[inset_3px_3px_8px_#0e1012,inset_-3px_-3px_8px_#272d33]">
@@ -465,10 +495,16 @@ export default function ScrapingDashboard() {
                                     <div className="flex flex-col items-center justify-center p-3 neu-inset rounded-xl border border-black/20 text-center">
                                         <div className="text-neu-text text-xl font-light mb-1">{status.total_urls || 0}</div>
                                         <div className="text-[9px] uppercase font-bold tracking-widest text-neu-dim">Discovered</div>
+                                        {status.connection_stats?.requests > 0 && (
+                                            <div className="text-[9px] text-neu-dim/60 mt-0.5">{Math.round(status.connection_stats.reuse_rate * 100)}% conn reuse</div>
+                                        )}
                                     </div>
                                     <div className="flex flex-col items-center justify-center p-3 neu-inset rounded-xl border border-black/20 text-center">
                                         <div className="text-neu-text text-xl font-light mb-1">{status.duplicates_found || 0}</div>
                                         <div className="text-[9px] uppercase font-bold tracking-widest text-neu-dim">Skipped (Dup)</div>
+                                        {status.image_duplicates_found > 0 && (
+                                            <div className="text-[9px] text-neu-dim/60 mt-0.5">{status.image_duplicates_found} images</div>
+                                        )}
                                     </div>
                                     <div className="flex flex-col items-center justify-center p-3 neu-inset rounded-xl border border-black/20 text-center">
                                         <div className="text-neu-text text-xl font-light mb-1">{status.dropped_items || 0}</div>
@@ -0,0 +1,68 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiohttp import web
+
+from backend.config import settings
+from backend.engines.scraping import manager as scrape_manager
+from backend.engines.scraping.http_client import http_client
+from backend.engines.scraping.page_worker import page_worker_pool
+
+VOCAB = [f"word{i}" for i in range(5000)]
+
+
+def make_page(port: int, n: int, pages: int) -> str:
+    """An article with its own vocabulary (never a near-duplicate of another page) linking to three more pages."""
+    rng = random.Random(n)
+    text = " ".join(rng.choices(VOCAB, k=300))
+    links = "".join(f'<a href="http://127.0.0.1:{port}/p{(n * 3 + k) % pages}">next</a>' for k in range(1, 4))
+    return (f"<html><head><title>Page {n}</title></head><body><article><h1>Page {n}</h1>"
+            f"<p>{text}</p>{links}</article></body></html>")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def projects_dir(tmp_path, monkeypatch):
+    """Projects under tmp_path; crawls may fetch 127.0.0.1, extract pages in threads and skip the HTTP cache."""
+    monkeypatch.setattr(settings, "PROJECTS_DIR", tmp_path)
+    monkeypatch.setattr(settings, "SCRAPER_HTTP_CACHE", "off")
+    monkeypatch.setattr(scrape_manager, "is_safe_url", lambda url: True)
+    monkeypatch.setattr(page_worker_pool, "processes", 0)
+    return tmp_path
+
+
+@pytest.fixture
+async def site():
+    """Local site of 60 linked article pages; set site.delay to slow every response down."""
+    pages = 60
+
+    async def handler(request):
+        await asyncio.sleep(handler.delay)
+        handler.fetched.append(request.path)
+        return web.Response(text=make_page(handler.port, int(request.match_info["n"]), pages),
+                            content_type="text/html")
+
+    handler.delay = 0.0
+    handler.fetched = []
+    app = web.Application()
+    app.router.add_get("/p{n:\\d+}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    server = web.TCPSite(runner, "127.0.0.1", 0)
+    await server.start()
+    handler.port = server._server.sockets[0].getsockname()[1]
+    handler.url = f"http://127.0.0.1:{handler.port}/p0"
+    yield handler
+    # The shared session belongs to this test's event loop
+    await http_client.close()
+    await runner.cleanup()
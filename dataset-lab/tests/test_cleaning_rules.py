@@ -0,0 +1,129 @@
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from backend.engines.cleaning import cleaning_engine
+from backend.engines.processing.cleaner import BOILERPLATE_FRAGMENTS, clean_text_content
+
+# ── The cleaners the rule pipelines replaced, kept as golden references ───────
+
+def legacy_process(text: str) -> str:
+    """The original CleaningEngine.process for uploaded text."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [line for line in text.split('\n') if not re.match(r'^\s*\d+\s*$', line)]
+    stripped_lines = [l.strip() for l in lines if l.strip()]
+    if stripped_lines:
+        line_counts = Counter(stripped_lines)
+        repeated_headers = {line for line, count in line_counts.items() if count > 3 and len(line.split()) < 10}
+        lines = [line for line in lines if line.strip() not in repeated_headers]
+    cleaned_lines = []
+    short_line_buffer = []
+    for line in lines:
+        line = "".join(ch for ch in line.strip() if ch.isprintable())
+        if re.match(r'^[•\-\*]\s+', line):
+            line = re.sub(r'^[•\-\*]\s+', '* ', line)
+        if len(line.split()) < 3:
+            if re.search(r'[a-zA-Z0-9]', line):
+                short_line_buffer.append(line)
+            continue
+        if short_line_buffer:
+            line = " ".join(short_line_buffer) + " " + line
+            short_line_buffer = []
+        cleaned_lines.append(line)
+    if short_line_buffer:
+        if cleaned_lines:
+            cleaned_lines[-1] += " " + " ".join(short_line_buffer)
+        else:
+            cleaned_lines.append(" ".join(short_line_buffer))
+    text = re.sub(r'[ \t]+', ' ', '\n'.join(cleaned_lines))
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+LEGACY_NOISE = [
+    re.compile(r'^[\w\s\-]+(\s*[\|›•·]\s*[\w\s\-]+){2,}$'),
+    re.compile(r'^\d+[\.,]?\d*\s*(min read|views?|comments?|shares?|likes?|claps?|reactions?|reads?)$', re.IGNORECASE),
+    re.compile(r'^[^a-zA-Z0-9\s]{4,}$'),
+    re.compile(r'^https?://\S+$'),
+    re.compile(r'^\W{0,2}$|^\d{1,4}\W{0,2}$'),
+    re.compile(r'^[-=_*]{3,}$'),
+]
+
+
+def legacy_clean_text_content(text: str) -> str:
+    """The original scraped-text cleaner."""
+    if not text:
+        return ""
+    text = re.sub(r'<[^>]+>', ' ', text)
+    text = re.sub(r'&[a-z]{2,8};|&#\d{1,6};', ' ', text, flags=re.IGNORECASE)
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+
+    def keep(line):
+        stripped = line.strip()
+        if len(stripped) < 15 or any(p.match(stripped) for p in LEGACY_NOISE):
+            return False
+        return not any(fragment in stripped.lower() for fragment in BOILERPLATE_FRAGMENTS)
+
+    seen, kept = set(), []
+    for line in filter(keep, text.split('\n')):
+        key = re.sub(r'\W+', '', line.lower())[:80]
+        if key not in seen:
+            seen.add(key)
+            kept.append(line)
+    return '\n\n'.join(line.strip() for line in kept).strip()
+
+# ── Synthetic documents ───────────────────────────────────────────────────────
+
+WORDS = "the quick brown fox jumps over lazy dog data set model token chunk página naïve".split()
+ODDITIES = ["\x00", "\x0b", "​", "﻿", "\t\t", "   ", "\xa0", "\x7f", " "]
+NOISE = [
+    "Home | About | Contact | Blog", "Home › News › Science", "5 min read", "1.2K views", "https://example.com/page",
+    "Accept cookies to continue browsing", "Subscribe to our newsletter today", "© 2024 All rights reserved",
+    "-----", "***", "====", "12.", "§§§§", "<b>bold</b> text inside tags here", "caf&eacute; &#8212; menu and more",
+]
+
+
+def document(seed: int, lines: int = 200) -> str:
+    rng = random.Random(seed)
+    out = []
+    for _ in range(lines):
+        kind = rng.random()
+        if kind < 0.05:
+            out.append(f"  {rng.randint(1, 400)} ")
+        elif kind < 0.12:
+            out.append("Chapter Header — Confidential")
+        elif kind < 0.2:
+            out.append(rng.choice(["• ", "- ", "* ", "-"]) + " ".join(rng.choices(WORDS, k=rng.randint(1, 8))))
+        elif kind < 0.3:
+            out.append(" ".join(rng.choices(WORDS, k=rng.randint(1, 2))))
+        elif kind < 0.35:
+            out.append(rng.choice(["", " ", "\t", "---"]))
+        elif kind < 0.5:
+            out.append(rng.choice(NOISE))
+        else:
+            words = rng.choices(WORDS, k=rng.randint(3, 25))
+            if rng.random() < 0.3:
+                words.insert(rng.randint(0, len(words)), rng.choice(ODDITIES))
+            out.append(" ".join(words))
+    return rng.choice(["\n", "\r\n", "\n\n\n"]).join(out)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_upload_pipeline_matches_the_original_cleaner(seed):
+    text = document(seed)
+    assert cleaning_engine.process(text) == legacy_process(text)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_scrape_pipeline_matches_the_original_cleaner(seed):
+    text = document(seed)
+    assert clean_text_content(text) == legacy_clean_text_content(text)
+
+
+@pytest.mark.parametrize("text", ["", "   ", "12", "Short line", "\r\n\r\n", "<p></p>"])
+def test_edge_cases_match(text):
+    assert cleaning_engine.process(text) == legacy_process(text)
+    assert clean_text_content(text) == legacy_clean_text_content(text)
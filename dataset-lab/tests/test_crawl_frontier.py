@@ -0,0 +1,53 @@
+from backend.engines.scraping.frontier import CrawlFrontier
+from backend.utils.filesystem import TextAppender
+
+
+def write(appender, text):
+    appender.append(text)
+    appender.snapshot()()
+
+
+def test_restore_cuts_raw_txt_back_to_the_last_committed_write(tmp_path):
+    raw_txt = TextAppender(tmp_path / "raw.txt")
+    write(raw_txt, "existing\n")
+    frontier = CrawlFrontier(tmp_path / "scraped")
+    frontier.begin({}, ["http://a/"], raw_txt.mark())
+
+    frontier.finish("http://a/", 0, 1.0, "scraped", "a.json")
+    frontier.finish("http://b/", 1, 1.0, "scraped", "b.json")
+    frontier.snapshot()()
+    write(raw_txt, "page a\n")
+    frontier.text_written(["a.json"], raw_txt.mark())
+    frontier.snapshot()()
+    # Crash after b's text reached raw.txt but before the frontier recorded it
+    write(raw_txt, "page b\n")
+
+    saved = CrawlFrontier(tmp_path / "scraped").restore()
+    assert saved["unwritten_docs"] == ["b.json"]
+    assert saved["pages_done"] == 2
+    assert raw_txt.truncate(saved["raw_txt_size"], saved["raw_txt_fingerprint"]) == len("page b\n")
+    assert raw_txt.path.read_text() == "existing\npage a\n"
+    # Cutting back again is a no-op
+    assert raw_txt.truncate(saved["raw_txt_size"], saved["raw_txt_fingerprint"]) == 0
+
+
+def test_truncate_skips_a_replaced_file(tmp_path):
+    raw_txt = TextAppender(tmp_path / "raw.txt")
+    write(raw_txt, "crawled text\n")
+    size, fingerprint = raw_txt.mark()
+
+    raw_txt.path.write_text("refined text, longer than the crawl\n")
+    assert raw_txt.truncate(size, fingerprint) is None
+    assert raw_txt.path.read_text() == "refined text, longer than the crawl\n"
+
+    raw_txt.path.write_text("short\n")
+    assert raw_txt.truncate(size, fingerprint) is None
+    assert raw_txt.path.read_text() == "short\n"
+
+
+def test_fingerprint_only_covers_text_before_the_mark(tmp_path):
+    raw_txt = TextAppender(tmp_path / "raw.txt")
+    write(raw_txt, "x" * (TextAppender.FINGERPRINT_BYTES + 10))
+    size, fingerprint = raw_txt.mark()
+    write(raw_txt, "appended later")
+    assert raw_txt.fingerprint(size) == fingerprint
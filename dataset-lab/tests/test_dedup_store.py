@@ -0,0 +1,104 @@
+import json
+import random
+
+import pytest
+
+from backend.engines.processing import dedup_store as dedup_store_module
+from backend.engines.processing.dedup_store import DedupStore
+from backend.engines.processing.deduplicator import get_text_hash
+
+VOCAB = [f"word{i}" for i in range(5000)]
+
+
+def document(n: int) -> str:
+    rng = random.Random(n)
+    return " ".join(rng.choices(VOCAB, k=200))
+
+
+def add(store, n):
+    text = document(n)
+    return store.check(get_text_hash(text), text)
+
+
+def segment_names(scraped_dir):
+    return sorted(p.name for p in scraped_dir.glob("dedup_index.0*.npz"))
+
+
+def test_segments_hold_only_new_documents_and_save_compacts_them(tmp_path):
+    store = DedupStore.load(tmp_path)
+    assert (tmp_path / "dedup_index.npz").exists()
+    for n in range(3):
+        add(store, n)
+    store.snapshot()()
+    add(store, 3)
+    store.snapshot_if_dirty()()
+    assert store.snapshot_if_dirty() is None
+    assert segment_names(tmp_path) == ["dedup_index.000001.npz", "dedup_index.000002.npz"]
+
+    # Base file plus segments load as one index
+    reloaded = DedupStore.load(tmp_path)
+    assert len(reloaded) == 4
+    assert add(reloaded, 2)[0] == "duplicate"
+    assert reloaded._next_segment == 3
+
+    store.save_if_dirty()
+    assert segment_names(tmp_path) == []
+    compacted = DedupStore.load(tmp_path)
+    assert len(compacted) == 4
+    assert compacted.hashes == store.hashes
+
+
+def test_near_duplicates_are_found_after_reload(tmp_path):
+    store = DedupStore.load(tmp_path)
+    add(store, 0)
+    store.save()
+
+    edited = document(0) + " one more sentence"
+    status, match = DedupStore.load(tmp_path).check(get_text_hash(edited), edited)
+    assert status == "near_duplicate"
+    assert match == get_text_hash(document(0))
+
+
+def test_documents_in_base_and_segment_load_once(tmp_path):
+    # A crash between compaction and segment cleanup leaves documents in both
+    store = DedupStore.load(tmp_path)
+    add(store, 0)
+    segment = store.snapshot()
+    segment()
+    kept = (tmp_path / "dedup_index.000001.npz").read_bytes()
+    store.save()
+    (tmp_path / "dedup_index.000001.npz").write_bytes(kept)
+
+    reloaded = DedupStore.load(tmp_path)
+    assert len(reloaded) == 1 and len(reloaded.lsh) == 1
+
+
+def test_failed_segment_write_keeps_documents_pending(tmp_path, monkeypatch):
+    store = DedupStore.load(tmp_path)
+    add(store, 0)
+
+    def fail(path, write, mode="wb"):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(dedup_store_module, "_atomic_write", fail)
+        with pytest.raises(OSError):
+            store.snapshot()()
+    assert store._dirty == 1
+
+    store.snapshot()()
+    assert len(DedupStore.load(tmp_path)) == 1
+
+
+def test_bootstrap_indexes_existing_documents(tmp_path):
+    text_dir = tmp_path / "text"
+    text_dir.mkdir()
+    for n in range(2):
+        (text_dir / f"doc_{n}.json").write_text(json.dumps({"cleaned_text": document(n)}), encoding="utf-8")
+
+    store = DedupStore.load(tmp_path)
+    assert len(store) == 2
+    assert add(store, 1)[0] == "duplicate"
+    # Later documents are not picked up from text/ again once the index exists
+    (text_dir / "doc_2.json").write_text(json.dumps({"cleaned_text": document(2)}), encoding="utf-8")
+    assert len(DedupStore.load(tmp_path)) == 2
@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+
+from backend.engines.processing.deduplicator import (
+    BKTree, MinHashLSH, hamming_distance, jaccard, shingle_hashes,
+)
+
+VOCAB = [f"word{i}" for i in range(5000)]
+
+
+def document(n: int, words: int = 300) -> str:
+    rng = random.Random(n)
+    return " ".join(rng.choices(VOCAB, k=words))
+
+
+def edit(text: str, fraction: float, seed: int = 0) -> str:
+    """text with about `fraction` of its words replaced."""
+    rng = random.Random(seed)
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * fraction)):
+        words[i] = "changed"
+    return " ".join(words)
+
+
+def test_minhash_finds_near_duplicates_and_skips_distinct_documents():
+    lsh = MinHashLSH(threshold=0.8)
+    for n in range(200):
+        assert lsh.check_and_add(n, document(n)) is None
+    assert len(lsh) == 200
+
+    match = lsh.query(edit(document(7), 0.01))
+    assert match is not None and match[0] == 7 and match[1] >= 0.8
+    assert lsh.query(edit(document(7), 0.3)) is None
+    assert lsh.query(document(1000)) is None
+
+
+def test_minhash_agrees_with_exact_jaccard():
+    lsh = MinHashLSH(threshold=0.7)
+    base = document(1)
+    lsh.insert("base", base)
+    for seed, fraction in enumerate([0.0, 0.02, 0.05, 0.2, 0.5]):
+        variant = edit(base, fraction, seed)
+        exact = jaccard(shingle_hashes(variant), shingle_hashes(base))
+        match = lsh.query(variant)
+        # Candidates are verified, so a reported match is always above the threshold
+        if match is not None:
+            assert match[1] == exact >= 0.7
+        elif exact >= 0.9:
+            raise AssertionError(f"missed a near-duplicate with jaccard {exact:.2f}")
+
+
+def test_sketches_match_across_instances_with_the_same_parameters():
+    text = document(3)
+    signature, shingles = MinHashLSH(threshold=0.8).sketch(text)
+    other = MinHashLSH(threshold=0.8)
+    other.add("doc", signature, shingles)
+    assert other.query(text)[0] == "doc"
+    assert np.array_equal(other.sketch(text)[0], signature)
+
+
+def test_bktree_find_matches_a_linear_scan():
+    rng = random.Random(0)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    tree = BKTree()
+    for i, h in enumerate(hashes):
+        tree.add(h, i)
+    assert len(tree) == 2000
+
+    for _ in range(50):
+        probe = hashes[rng.randrange(len(hashes))] ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64))
+        for radius in (0, 2, 6):
+            found = tree.find(probe, radius)
+            best = min(hamming_distance(probe, h) for h in hashes)
+            if best > radius:
+                assert found is None
+            else:
+                assert found is not None and found[1] == best
+                assert hamming_distance(probe, hashes[found[0]]) == best
+
+
+def test_bktree_empty_and_exact():
+    tree = BKTree()
+    assert tree.find(123, 10) is None
+    tree.add(0xFFFF, "a")
+    assert tree.find(0xFFFF, 0) == ("a", 0)
+    assert tree.find(0xFFFE, 0) is None
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from backend.config import settings
+from backend.engines.embedding_cache import text_key
+from backend.engines.embedding_refiner import EmbeddingRefiner
+
+
+def test_cache_for_stored_vectors_does_not_load_the_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE", "project")
+    refiner = EmbeddingRefiner(model_name="some-model", backend="torch", workers=0)
+    cache = refiner.get_cache(tmp_path, "some-model")
+    cache.add([text_key("a")], np.ones((1, 4), dtype=np.float32) / 2)
+
+    vectors, missing = refiner.get_cache(tmp_path, "some-model").get([text_key("a")])
+    assert missing == [] and vectors.shape == (1, 4)
+    assert not refiner.is_ready and refiner._model is None
+
+
+def test_produces_compares_model_ids_without_loading():
+    torch_refiner = EmbeddingRefiner(model_name="some-model", backend="torch", workers=0)
+    assert torch_refiner.produces("some-model")
+    assert not torch_refiner.produces("some-model@onnx")
+    assert not torch_refiner.produces("other-model")
+
+    onnx_refiner = EmbeddingRefiner(model_name="some-model", backend="onnx", workers=0)
+    assert onnx_refiner.produces("some-model@onnx")
+    assert onnx_refiner.produces("some-model")
+    assert not torch_refiner.is_ready and not onnx_refiner.is_ready
+
+
+def test_sweep_merges_more_at_lower_thresholds():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(30, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    refiner = EmbeddingRefiner(model_name="some-model", workers=0)
+    results = refiner.sweep_thresholds(vectors, [10] * 30, [-1.0, 0.5, 1.0])
+    counts = [r["chunk_count"] for r in results]
+    assert counts[0] == 1 and counts[0] <= counts[1] <= counts[2] == 30
+    assert results[0]["tokens"]["max"] == 300
+
+    capped = refiner.sweep_thresholds(vectors, [10] * 30, [-1.0], max_merged_tokens=50)
+    assert capped[0]["chunk_count"] == 6
+
+
+def test_model_is_not_loaded_in_process_when_workers_are_enabled():
+    refiner = EmbeddingRefiner(model_name="some-model", workers=2)
+    with pytest.raises(RuntimeError):
+        refiner.model
+    assert refiner._model is None and refiner._pool is None
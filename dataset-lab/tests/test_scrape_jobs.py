@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.engines.processing.dedup_store import DedupStore
+from backend.engines.scraping.frontier import CrawlFrontier
+from backend.engines.scraping.manager import manager
+from backend.routes import scrape
+
+pytestmark = pytest.mark.anyio
+
+TERMINAL = ("completed", "cancelled", "failed")
+
+
+def crawl_request(site, **overrides):
+    return {"project_name": "proj", "urls": [site.url], "max_pages": 40, "max_depth": 5,
+            "relevance_threshold": 0.0, "extract_images": False, "concurrency": 4,
+            "per_host_concurrency": 4, "per_host_delay": 0.0, **overrides}
+
+
+@pytest.fixture
+async def api():
+    app = FastAPI()
+    app.include_router(scrape.router, prefix="/scrape")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def wait_for(predicate, timeout=30.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_start_is_rejected_until_a_cancelled_crawl_has_saved(projects_dir, site, api):
+    site.delay = 0.1
+    response = await api.post("/scrape/start", json=crawl_request(site))
+    assert response.status_code == 200
+    job = manager.get_job_status(response.json()["task_id"])
+    await wait_for(lambda: job["downloaded_items"] >= 5)
+
+    await api.post(f"/scrape/cancel/{response.json()['task_id']}")
+    # Pages in flight keep the crawl alive after the cancel
+    while job["status"] not in TERMINAL:
+        assert (await api.post("/scrape/start", json=crawl_request(site))).status_code == 409
+        assert (await api.post("/scrape/resume/proj")).status_code == 409
+        await asyncio.sleep(0.02)
+
+    # A terminal status is only shown once the crawl state and the dedup index are saved
+    assert job["status"] == "cancelled"
+    scraped_dir = projects_dir / "proj" / "scraped"
+    assert CrawlFrontier.saved_crawl(scraped_dir)["status"] == "cancelled"
+    assert len(DedupStore.load(scraped_dir)) == job["downloaded_items"]
+    assert not manager.is_crawling("proj")
+
+    response = await api.post("/scrape/resume/proj")
+    assert response.status_code == 200
+    resumed = manager.get_job_status(response.json()["task_id"])
+    await wait_for(lambda: resumed["status"] in TERMINAL)
+    assert resumed["status"] == "completed"
+    assert job["downloaded_items"] + resumed["downloaded_items"] == 40
+    assert resumed["duplicates_found"] == 0
+
+
+async def cancelled_crawl(api, site):
+    """A crawl of the local site cancelled after a few pages, once its final saves are done."""
+    site.delay = 0.05
+    response = await api.post("/scrape/start", json=crawl_request(site))
+    job = manager.get_job_status(response.json()["task_id"])
+    await wait_for(lambda: job["downloaded_items"] >= 5)
+    await api.post(f"/scrape/cancel/{response.json()['task_id']}")
+    await wait_for(lambda: job["status"] in TERMINAL)
+    site.delay = 0.0
+    return job
+
+
+async def resume(api):
+    response = await api.post("/scrape/resume/proj")
+    assert response.status_code == 200
+    job = manager.get_job_status(response.json()["task_id"])
+    await wait_for(lambda: job["status"] in TERMINAL)
+    assert job["status"] == "completed"
+    return job
+
+
+def raw_titles(raw_path):
+    return [entry.strip().split("\n", 1)[0] for entry in raw_path.read_text(encoding="utf-8").split("========================") if entry.strip()]
+
+
+async def test_resume_appends_every_page_to_raw_txt_exactly_once(projects_dir, site, api):
+    await cancelled_crawl(api, site)
+    raw_path = projects_dir / "proj" / "raw.txt"
+    # Text that reached raw.txt after the last saved crawl state, as after a crash
+    with open(raw_path, "a", encoding="utf-8") as f:
+        f.write("Page 59\n\nwritten after the last commit\n\n========================\n\n")
+
+    job = await resume(api)
+    titles = raw_titles(raw_path)
+    assert len(titles) == len(set(titles)) == 40
+    assert "written after the last commit" not in raw_path.read_text(encoding="utf-8")
+    assert any("Dropped" in line for line in job["logs"])
+
+
+async def test_resume_leaves_a_replaced_raw_txt_alone(projects_dir, site, api):
+    await cancelled_crawl(api, site)
+    raw_path = projects_dir / "proj" / "raw.txt"
+    replaced = "Refined\n\n" + "rewritten text " * 20000 + "\n\n========================\n\n"
+    raw_path.write_text(replaced, encoding="utf-8")
+
+    job = await resume(api)
+    assert raw_path.read_text(encoding="utf-8").startswith(replaced)
+    assert any("replaced" in line for line in job["logs"])